@@ -0,0 +1,75 @@
+import threading
+import time
+
+import numpy as np
+
+SIMILARITY_THRESHOLD = 0.93
+TTL_SECONDS = 24 * 60 * 60
+MAX_ENTRIES = 500
+
+# Only history-free or short conversations are answered from the cache
+MAX_CONTEXT_MESSAGES = 2
+
+
+class AnswerCache:
+    # Semantic cache of answers to frequent questions, keyed by an embedding of the visitor's turns
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, ttl=TTL_SECONDS, max_entries=MAX_ENTRIES):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Bumped on every invalidation, so answers computed from older knowledge are not stored
+        self.generation = 0
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.entries = []
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def key_text(self, message, history):
+        # The first user turn, or all user turns of a short conversation; None when not cacheable
+        if len(history) > MAX_CONTEXT_MESSAGES:
+            return None
+        turns = [item.get("content") or "" for item in history if item["role"] == "user"] + [message]
+        return "\n".join(str(turn) for turn in turns)
+
+    def invalidate(self):
+        # Called from the knowledge watcher's callback when me/ changed, so lookups never touch the disk
+        with self.lock:
+            print(f"Knowledge changed, clearing {len(self.entries)} cached answers", flush=True)
+            self.generation += 1
+            self.vectors = np.zeros((0, 0), dtype=np.float32)
+            self.entries = []
+
+    def _expire(self):
+        now = time.time()
+        keep = [i for i, entry in enumerate(self.entries) if now - entry["created_at"] <= self.ttl]
+        if len(keep) != len(self.entries):
+            self.entries = [self.entries[i] for i in keep]
+            self.vectors = self.vectors[keep] if keep else np.zeros((0, 0), dtype=np.float32)
+
+    def lookup(self, key, vector):
+        with self.lock:
+            self._expire()
+            if not self.entries:
+                self.misses += 1
+                return None
+            similarities = self.vectors @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry = self.entries[best]
+        print(f"Answer cache HIT ({similarities[best]:.3f}): {key!r} ~ {entry['key']!r}", flush=True)
+        return entry["answer"]
+
+    def store(self, key, vector, answer, generation=None):
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.entries.append({"key": key, "answer": answer, "created_at": time.time()})
+            self.vectors = np.vstack([self.vectors, vector[None, :]]) if len(self.vectors) else vector[None, :].copy()
+            if len(self.entries) > self.max_entries:
+                self.entries = self.entries[-self.max_entries:]
+                self.vectors = self.vectors[-self.max_entries:]
@@ -1,24 +1,30 @@
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+import asyncio
 import json
 import os
-import requests
-from pypdf import PdfReader
+import threading
+import time
 import gradio as gr
+from concurrent.futures import ThreadPoolExecutor
 import csv
-import pandas as pd
+from knowledge import KnowledgeIndex, KnowledgeState, format_chunks, embed
+from knowledge_snapshot import ensure_snapshot, SnapshotWatcher, SNAPSHOT_DIR
+from notifier import Notifier
+from history_compactor import HistoryCompactor, clean_message
+from answer_cache import AnswerCache
+from router import CascadeRouter, TRIVIAL, TOOL, CACHE, TRIVIAL_MODEL, TRIVIAL_MAX_TOKENS, TRIVIAL_INSTRUCTIONS
 
 load_dotenv(override=True)
 
+MODEL = "gpt-4o-mini"
+
+notifier = Notifier()
+
+
 def push(text):
-    requests.post(
-        "https://api.pushover.net/1/messages.json",
-        data={
-            "token": os.getenv("PUSHOVER_TOKEN"),
-            "user": os.getenv("PUSHOVER_USER"),
-            "message": text,
-        }
-    )
+    # Queued for the background notifier; the chat reply never waits on Pushover
+    notifier.notify(text)
 
 
 def record_user_details(email, name="Name not provided", notes="not provided"):
@@ -73,68 +79,241 @@ record_unknown_question_json = {
 tools = [{"type": "function", "function": record_user_details_json},
         {"type": "function", "function": record_unknown_question_json}]
 
+# Only tools listed here can be invoked by the model
+TOOL_REGISTRY = {
+    "record_user_details": record_user_details,
+    "record_unknown_question": record_unknown_question,
+}
+
+# Tool calls from one model turn run concurrently on this pool
+tool_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool")
+
 
 class Me:
 
-    def __init__(self):
+    def __init__(self, watch_knowledge=True, snapshot_dir=SNAPSHOT_DIR):
         self.openai = OpenAI()
+        self.async_openai = AsyncOpenAI()
         self.name = "Johannes Geberlin"
-        reader = PdfReader("./me/linkedin.pdf")
         self.linkedin = "https://www.linkedin.com/in/johannes-g-063b71113/"
-        self.linkedin_text = ""
-        for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                self.linkedin_text += text
-        with open("./me/summary.txt", "r", encoding="utf-8") as f:
-            self.summary = f.read()
-        ex = pd.read_excel("./me/Johannes_RAG.xlsx")
-        self.rag_json = ex.to_json(orient="records", indent=2, force_ascii=False)
-        print(self.rag_json)
+        # Precompiled me/ snapshot; rebuilt only when a source file changed
+        snapshot = ensure_snapshot(self.openai, snapshot_dir=snapshot_dir)
+        self.knowledge = self.load_knowledge(snapshot)
+        print(f"Loaded knowledge snapshot {snapshot.version} with {len(snapshot.chunks)} chunks")
+        # Frequent opening questions are answered from here at zero token cost
+        self.answer_cache = AnswerCache()
+        # Edits to me/ are picked up without a restart
+        self.watcher = SnapshotWatcher(self.openai, self.on_knowledge_change, snapshot, snapshot_dir=snapshot_dir)
+        if watch_knowledge:
+            self.watcher.start()
+        # Long conversations keep their last turns verbatim and the rest as a running summary
+        self.compactor = HistoryCompactor(self.openai)
+        # Small talk is answered by the cheapest model, everything else by MODEL with retrieval
+        self.router = CascadeRouter()
+        self.usage = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0}
+        self._usage_lock = threading.Lock()
+
+    def run_tool_call(self, tool_call):
+        # tool_call is a dict in the API's tool-call shape, so calls assembled from a stream work too
+        tool_name = tool_call["function"]["name"]
+        print(f"Tool called: {tool_name}", flush=True)
+        tool = TOOL_REGISTRY.get(tool_name)
+        try:
+            arguments = json.loads(tool_call["function"]["arguments"] or "{}")
+            result = tool(**arguments) if tool else {"error": f"unknown tool {tool_name}"}
+        except Exception as e:
+            result = {"error": str(e)}
+        return {"role": "tool","content": json.dumps(result),"tool_call_id": tool_call["id"]}
 
     def handle_tool_call(self, tool_calls):
-        results = []
-        for tool_call in tool_calls:
-            tool_name = tool_call.function.name
-            arguments = json.loads(tool_call.function.arguments)
-            print(f"Tool called: {tool_name}", flush=True)
-            tool = globals().get(tool_name)
-            result = tool(**arguments) if tool else {}
-            results.append({"role": "tool","content": json.dumps(result),"tool_call_id": tool_call.id})
-        return results
+        return list(tool_executor.map(self.run_tool_call, tool_calls))
+
+    async def handle_tool_call_async(self, tool_calls):
+        return await asyncio.gather(*(asyncio.to_thread(self.run_tool_call, call) for call in tool_calls))
     
+    def load_knowledge(self, snapshot):
+        # LinkedIn, resume and RAG rows are retrieved per turn instead of being put in the prompt.
+        # The system prompt is built once per knowledge version and reused verbatim, so every request
+        # starts with the same bytes (system prompt, then tools) and provider-side prompt caching can hit.
+        # Nothing per-turn (dates, names, retrieved context) may be added to this prefix.
+        index = KnowledgeIndex(snapshot.chunks, snapshot.embeddings, self.openai)
+        return KnowledgeState(snapshot.version, snapshot.summary, index, self.build_system_prompt(snapshot.summary))
+
+    def on_knowledge_change(self, snapshot):
+        # Called from the watcher thread; a single assignment swaps the whole state atomically
+        self.knowledge = self.load_knowledge(snapshot)
+        # Cached answers were given from the old knowledge
+        self.answer_cache.invalidate()
+
     def system_prompt(self):
+        return self.knowledge.system_prompt
+
+    def build_system_prompt(self, summary):
         system_prompt = f"You are acting as {self.name}. You are answering questions on {self.name}'s website, \
 particularly questions related to {self.name}'s career, background, skills and experience. \
 Your responsibility is to represent {self.name} for interactions on the website as faithfully as possible. \
-You are given a summary of {self.name}'s background and LinkedIn profile which you can use to answer questions. \
+You are given a summary of {self.name}'s background, and with every question the most relevant excerpts from {self.name}'s LinkedIn profile, resume and notes, which you can use to answer questions. \
 Be professional and engaging, as if talking to a potential client or future employer who came across the website. \
 If you don't know the answer to any question, use your record_unknown_question tool to record the question that you couldn't answer, even if it's about something trivial or unrelated to career. \
 Ask the user for contact email and name stating, that the question will be answered via email later. If the user is engaging in discussion, try to steer them towards getting in touch via email; ask for their email and record it using your record_user_details tool. "
 
-        system_prompt += f"\n\n## Summary:\n{self.summary}\n\n## LinkedIn Profile:\n{self.linkedin}\n\n## LinkedIn Profile Text:\n{self.linkedin_text}\n\n"
-        system_prompt += f"\n\n## RAG:\n{self.rag_json}\n\n"
+        system_prompt += f"\n\n## Summary:\n{summary}\n\n## LinkedIn Profile:\n{self.linkedin}\n\n"
         system_prompt += f"With this context, please chat with the user, always staying in character as {self.name}."
         return system_prompt
     
+    def record_usage(self, response):
+        usage = response.usage
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", None) or 0) if details else 0
+        with self._usage_lock:
+            self.usage["calls"] += 1
+            self.usage["prompt_tokens"] += usage.prompt_tokens
+            self.usage["cached_tokens"] += cached
+        print(f"Prompt tokens: {usage.prompt_tokens}, cached: {cached}", flush=True)
+
+    def cache_stats(self):
+        with self._usage_lock:
+            stats = dict(self.usage)
+        stats["cached_ratio"] = stats["cached_tokens"] / stats["prompt_tokens"] if stats["prompt_tokens"] else 0.0
+        return stats
+
+    def retrieved_context(self, knowledge, message, query_vector=None):
+        # Goes after the history, so the cached system prompt prefix stays byte-stable
+        chunks = knowledge.index.search(message, query_vector=query_vector)
+        return {"role": "system", "content": f"## Relevant background:\n{format_chunks(chunks)}"}
+
+    def chat_messages(self, knowledge, message, history, query_vector=None):
+        # The request layout of a knowledge turn, shared by chat, chat_stream and judgeagents.py
+        context = self.retrieved_context(knowledge, message, query_vector)
+        return [{"role": "system", "content": knowledge.system_prompt}] + history + [context, {"role": "user", "content": message}]
+
+    def cached_answer(self, message, history):
+        # Returns (answer, key, vector); answer is None on a miss and key is None if the turn is not cacheable
+        key = self.answer_cache.key_text(message, history)
+        if key is None:
+            return None, None, None
+        vector = embed(self.openai, [key])[0]
+        return self.answer_cache.lookup(key, vector), key, vector
+
+    def trivial_messages(self, message, history):
+        # No retrieval and no tools; the last exchange is enough context for small talk
+        recent = [clean_message(item) for item in history[-2:] if item["role"] in ("user", "assistant")]
+        return [{"role": "system", "content": TRIVIAL_INSTRUCTIONS.format(name=self.name)}] + recent + [{"role": "user", "content": message}]
+
     def chat(self, message, history):
-        messages = [{"role": "system", "content": self.system_prompt()}] + history + [{"role": "user", "content": message}]
+        started = time.monotonic()
+        route = self.router.route(message)
+        if route == TRIVIAL:
+            response = self.openai.chat.completions.create(
+                model=TRIVIAL_MODEL, messages=self.trivial_messages(message, history), max_tokens=TRIVIAL_MAX_TOKENS
+            )
+            self.router.record(route, message, time.monotonic() - started)
+            return response.choices[0].message.content
+        # Answers computed while me/ is reloaded are not cached
+        generation = self.answer_cache.generation
+        # Turns that will call a tool are never answered from the cache
+        answer, cache_key, cache_vector = self.cached_answer(message, history) if route != TOOL else (None, None, None)
+        if answer is not None:
+            self.router.record(CACHE, message, time.monotonic() - started)
+            return answer
+        knowledge = self.knowledge
+        history = self.compactor.compact(history)
+        messages = self.chat_messages(knowledge, message, history, cache_vector if cache_key == message else None)
+        used_tools = False
         done = False
         while not done:
-            response = self.openai.chat.completions.create(model="gpt-4o-mini", messages=messages, tools=tools)
+            response = self.openai.chat.completions.create(model=MODEL, messages=messages, tools=tools)
+            self.record_usage(response)
             if response.choices[0].finish_reason=="tool_calls":
-                message = response.choices[0].message
-                tool_calls = message.tool_calls
-                results = self.handle_tool_call(tool_calls)
-                messages.append(message)
+                used_tools = True
+                reply = response.choices[0].message
+                tool_calls = reply.tool_calls
+                results = self.handle_tool_call([call.model_dump() for call in tool_calls])
+                messages.append(reply)
                 messages.extend(results)
             else:
                 done = True
-        return response.choices[0].message.content
+        answer = response.choices[0].message.content
+        self.router.record(route, message, time.monotonic() - started)
+        # Turns that called a tool had side effects (e.g. recording a question) and must not be replayed
+        if cache_key is not None and not used_tools:
+            self.answer_cache.store(cache_key, cache_vector, answer, generation)
+        return answer
+
+    async def chat_stream(self, message, history):
+        # Async counterpart of chat: yields the growing reply as deltas arrive, so one event loop
+        # serves many conversations and visitors see the first tokens right away
+        started = time.monotonic()
+        route = self.router.route(message)
+        if route == TRIVIAL:
+            stream = await self.async_openai.chat.completions.create(
+                model=TRIVIAL_MODEL, messages=self.trivial_messages(message, history), max_tokens=TRIVIAL_MAX_TOKENS, stream=True
+            )
+            reply = ""
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    reply += chunk.choices[0].delta.content
+                    yield reply
+            self.router.record(route, message, time.monotonic() - started)
+            return
+        # Answers computed while me/ is reloaded are not cached
+        generation = self.answer_cache.generation
+        if route == TOOL:
+            answer, cache_key, cache_vector = None, None, None
+        else:
+            answer, cache_key, cache_vector = await asyncio.to_thread(self.cached_answer, message, history)
+        if answer is not None:
+            self.router.record(CACHE, message, time.monotonic() - started)
+            yield answer
+            return
+        knowledge = self.knowledge
+        history = await asyncio.to_thread(self.compactor.compact, history)
+        messages = await asyncio.to_thread(self.chat_messages, knowledge, message, history, cache_vector if cache_key == message else None)
+        reply = ""
+        used_tools = False
+        while True:
+            stream = await self.async_openai.chat.completions.create(
+                model=MODEL, messages=messages, tools=tools, stream=True, stream_options={"include_usage": True}
+            )
+            content = ""
+            tool_calls = {}
+            finish_reason = None
+            async for chunk in stream:
+                if chunk.usage:
+                    self.record_usage(chunk)
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.delta.content:
+                    content += choice.delta.content
+                    yield reply + content
+                # Tool calls arrive in fragments keyed by index: id and name once, arguments piecewise
+                for delta in choice.delta.tool_calls or []:
+                    call = tool_calls.setdefault(delta.index, {"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+                    if delta.id:
+                        call["id"] = delta.id
+                    if delta.function and delta.function.name:
+                        call["function"]["name"] += delta.function.name
+                    if delta.function and delta.function.arguments:
+                        call["function"]["arguments"] += delta.function.arguments
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+            reply += content
+            if finish_reason != "tool_calls":
+                self.router.record(route, message, time.monotonic() - started)
+                if cache_key is not None and not used_tools:
+                    self.answer_cache.store(cache_key, cache_vector, reply, generation)
+                return
+            used_tools = True
+            calls = [tool_calls[index] for index in sorted(tool_calls)]
+            messages.append({"role": "assistant", "content": content or None, "tool_calls": calls})
+            messages.extend(await self.handle_tool_call_async(calls))
 
 
 
 if __name__ == "__main__":
     me = Me()
-    gr.ChatInterface(me.chat, type="messages").launch()
+    gr.ChatInterface(me.chat_stream, type="messages").launch()
     
\ No newline at end of file
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from router import TRIVIAL_MODEL
+
+# Summaries run on the cheap tier, not the main chat model
+SUMMARY_MODEL = TRIVIAL_MODEL
+KEEP_TURNS = 6
+TOKEN_BUDGET = 3000
+CHARS_PER_TOKEN = 4
+MAX_SUMMARIES = 1000
+
+SUMMARY_INSTRUCTIONS = "You maintain a running summary of a conversation between a website visitor and an assistant \
+representing a person's career. Update the existing summary with the new messages. Keep every fact the visitor shared \
+about themselves (name, email, company, interests), every question they asked and the gist of each answer. \
+Be concise: at most 200 words. Reply with the updated summary only."
+
+
+def estimate_tokens(messages):
+    # Rough estimate (about 4 characters per token) is enough to decide when to compact
+    return sum(len(str(message.get("content") or "")) // CHARS_PER_TOKEN + 4 for message in messages)
+
+
+def clean_message(message):
+    # Gradio adds keys such as metadata/options that the chat completions API does not accept
+    return {"role": message["role"], "content": message.get("content") or ""}
+
+
+def is_tool_record(message):
+    metadata = message.get("metadata") or {}
+    return message["role"] == "tool" or bool(message.get("tool_calls")) or bool(metadata.get("title"))
+
+
+def describe_tool_record(message):
+    metadata = message.get("metadata") or {}
+    if metadata.get("title"):
+        return f"{metadata['title']}: {message.get('content') or ''}".strip()
+    if message.get("tool_calls"):
+        return "; ".join(f"{call['function']['name']}({call['function']['arguments']})" for call in message["tool_calls"])
+    return str(message.get("content") or "")
+
+
+class HistoryCompactor:
+    # Keeps the last turns verbatim and folds older ones into a running summary. Summaries are cached
+    # by a hash of the folded messages, so each turn only summarizes the messages folded since the last one.
+
+    def __init__(self, openai, keep_turns=KEEP_TURNS, token_budget=TOKEN_BUDGET, model=SUMMARY_MODEL):
+        self.openai = openai
+        self.keep_turns = keep_turns
+        self.token_budget = token_budget
+        self.model = model
+        self.summaries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def compact(self, history):
+        if estimate_tokens(history) <= self.token_budget:
+            return [clean_message(message) for message in history]
+        split = self.split_index(history)
+        folded, recent = history[:split], history[split:]
+        if not folded:
+            return [clean_message(message) for message in recent]
+        summary = self.summarize(folded)
+        tool_records = [describe_tool_record(message) for message in folded if is_tool_record(message)]
+        content = f"## Summary of the earlier conversation:\n{summary}"
+        if tool_records:
+            content += "\n\n## Tool calls earlier in the conversation:\n" + "\n".join(f"- {record}" for record in tool_records)
+        return [{"role": "system", "content": content}] + [clean_message(message) for message in recent]
+
+    def split_index(self, history):
+        # Start of the last keep_turns user turns, moved later while those turns alone exceed the budget
+        user_turns = [i for i, message in enumerate(history) if message["role"] == "user"]
+        starts = user_turns[-self.keep_turns:] or [len(history)]
+        for start in starts:
+            if estimate_tokens(history[start:]) <= self.token_budget:
+                return start
+        return starts[-1]
+
+    def summarize(self, folded):
+        # Running digests of every prefix let us find the longest prefix that was summarized before
+        digests = []
+        digest = hashlib.sha256()
+        for message in folded:
+            digest.update(json.dumps(clean_message(message), sort_keys=True).encode("utf-8"))
+            digests.append(digest.hexdigest())
+        with self.lock:
+            if digests[-1] in self.summaries:
+                self.summaries.move_to_end(digests[-1])
+                return self.summaries[digests[-1]]
+            previous, start = "", 0
+            for i in range(len(digests) - 2, -1, -1):
+                if digests[i] in self.summaries:
+                    previous, start = self.summaries[digests[i]], i + 1
+                    break
+        new_messages = "\n".join(f"{message['role']}: {message.get('content') or ''}" for message in folded[start:])
+        response = self.openai.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                {"role": "user", "content": f"Existing summary:\n{previous or '(none)'}\n\nNew messages:\n{new_messages}"},
+            ],
+        )
+        summary = response.choices[0].message.content
+        with self.lock:
+            self.summaries[digests[-1]] = summary
+            while len(self.summaries) > MAX_SUMMARIES:
+                self.summaries.popitem(last=False)
+        return summary
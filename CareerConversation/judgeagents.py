@@ -1,8 +1,310 @@
-import os
+import argparse
+import asyncio
+import hashlib
 import json
+import os
+import random
+import re
+import time
+from dataclasses import dataclass
 from dotenv import load_dotenv
-from openai import OpenAI
-from anthropic import Anthropic
-from IPython.display import Markdown, display
+from openai import AsyncOpenAI
+from anthropic import AsyncAnthropic
+
+load_dotenv(override=True)
+
+# Evaluation harness: sends the same prompts to several models concurrently, lets a judge model rank
+# the answers in batches and reports quality against latency and cost. Answers and verdicts are cached
+# in CACHE_FILE, so a rerun only calls the models for new (prompt, model) pairs. Candidates get the same
+# request the chat app sends (system prompt, retrieved background, question); the judge sees the answers
+# in a shuffled order per batch, so no model profits from always being competitor 1.
+#
+#   python judgeagents.py --prompts prompts.txt --models gpt-4o-mini,claude-3-5-haiku-latest
+CACHE_FILE = "./.judge_cache.jsonl"
+JUDGE_MODEL = "o3-mini"
+JUDGE_BATCH_SIZE = 5
+MAX_TOKENS = 1000
+
+
+@dataclass
+class ModelSpec:
+    name: str
+    provider: str
+    # USD per million input / output tokens
+    input_price: float
+    output_price: float
+    base_url: str = None
+    api_key_env: str = None
+
+
+# Providers without their own SDK are reached through their OpenAI-compatible endpoints
+MODELS = {
+    spec.name: spec for spec in [
+        ModelSpec("gpt-4o-mini", "openai", 0.15, 0.60),
+        ModelSpec("gpt-4o", "openai", 2.50, 10.00),
+        ModelSpec("gpt-4.1-mini", "openai", 0.40, 1.60),
+        ModelSpec("claude-3-5-haiku-latest", "anthropic", 0.80, 4.00),
+        ModelSpec("claude-3-7-sonnet-latest", "anthropic", 3.00, 15.00),
+        ModelSpec("gemini-2.0-flash", "gemini", 0.10, 0.40, "https://generativelanguage.googleapis.com/v1beta/openai/", "GOOGLE_API_KEY"),
+        ModelSpec("deepseek-chat", "deepseek", 0.27, 1.10, "https://api.deepseek.com/v1", "DEEPSEEK_API_KEY"),
+        ModelSpec("llama-3.3-70b-versatile", "groq", 0.59, 0.79, "https://api.groq.com/openai/v1", "GROQ_API_KEY"),
+        ModelSpec("o3-mini", "openai", 1.10, 4.40),
+    ]
+}
+
+# Per provider: concurrent requests and requests per minute
+RATE_LIMITS = {
+    "openai": (16, 500),
+    "anthropic": (8, 50),
+    "gemini": (8, 15),
+    "deepseek": (8, 60),
+    "groq": (4, 30),
+}
+
+DEFAULT_PROMPTS = [
+    "What is your experience leading DevOps teams?",
+    "Which programming languages do you know best?",
+    "Are you open to new job opportunities?",
+    "Describe a difficult project you delivered and what you learned.",
+    "How do you handle conflicts in a team?",
+]
+
+JUDGE_INSTRUCTIONS = """You are judging answers from competing models. For each question below you get the answers \
+of several competitors, numbered from 1. Rank the competitors of each question from best to worst on clarity, \
+correctness and strength of argument. Respond with JSON only, in this format:
+{"results": [{"question": <question number>, "ranking": [<best competitor number>, <second best>, ...]}]}"""
+
+
+def cache_key(*parts):
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    # Append-only JSON lines file; the last line for a key wins
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, **values):
+        entry = {"key": key, **values}
+        self.entries[key] = entry
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return entry
+
+
+class RateLimiter:
+    # Caps concurrent requests and spaces request starts evenly to stay under a per-minute quota
+
+    def __init__(self, concurrency, per_minute):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.interval = 60.0 / per_minute
+        self.next_start = 0.0
+        self.lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        async with self.lock:
+            now = time.monotonic()
+            wait = self.next_start - now
+            self.next_start = max(now, self.next_start) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+class Evaluator:
+
+    def __init__(self, models, judge=JUDGE_MODEL, cache=None, batch_size=JUDGE_BATCH_SIZE, build_messages=None):
+        # build_messages(prompt) -> chat messages; without it candidates get the bare prompt
+        self.build_messages = build_messages or (lambda prompt: [{"role": "user", "content": prompt}])
+        self.models = [MODELS[name] for name in models]
+        self.judge = MODELS[judge]
+        self.cache = cache or ResultCache()
+        self.batch_size = batch_size
+        self.clients = {}
+        self.limiters = {}
+
+    def client(self, spec):
+        if spec.provider not in self.clients:
+            if spec.provider == "anthropic":
+                self.clients[spec.provider] = AsyncAnthropic()
+            elif spec.base_url:
+                self.clients[spec.provider] = AsyncOpenAI(base_url=spec.base_url, api_key=os.getenv(spec.api_key_env))
+            else:
+                self.clients[spec.provider] = AsyncOpenAI()
+            self.limiters[spec.provider] = RateLimiter(*RATE_LIMITS[spec.provider])
+        return self.clients[spec.provider]
+
+    async def complete(self, spec, messages):
+        client = self.client(spec)
+        async with self.limiters[spec.provider]:
+            started = time.monotonic()
+            if spec.provider == "anthropic":
+                # Anthropic takes the system messages as a separate parameter
+                system = "\n\n".join(message["content"] for message in messages if message["role"] == "system")
+                turns = [message for message in messages if message["role"] != "system"]
+                response = await client.messages.create(model=spec.name, max_tokens=MAX_TOKENS, messages=turns,
+                                                        **({"system": system} if system else {}))
+                text = response.content[0].text
+                input_tokens, output_tokens = response.usage.input_tokens, response.usage.output_tokens
+            else:
+                response = await client.chat.completions.create(model=spec.name, messages=messages)
+                text = response.choices[0].message.content
+                input_tokens, output_tokens = response.usage.prompt_tokens, response.usage.completion_tokens
+            latency = time.monotonic() - started
+        cost = (input_tokens * spec.input_price + output_tokens * spec.output_price) / 1e6
+        return {"answer": text, "latency": latency, "input_tokens": input_tokens, "output_tokens": output_tokens, "cost": cost}
+
+    async def answer(self, spec, prompt, messages):
+        # Keyed on the full request, so a changed system prompt or knowledge base asks again
+        key = cache_key("answer", spec.name, json.dumps(messages, sort_keys=True))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            result = await self.complete(spec, messages)
+        except Exception as e:
+            # Failures are not cached, so the pair is retried on the next run
+            print(f"{spec.name} failed: {e}", flush=True)
+            return None
+        return self.cache.put(key, kind="answer", model=spec.name, prompt=prompt, **result)
+
+    async def rank_batch(self, batch):
+        # batch: list of (prompt, [(model, answer), ...]); one judge call ranks all of them.
+        # Returns (rankings, judge cost); the cost of a cached verdict is counted again for the report
+        key = cache_key("judge", self.judge.name, json.dumps(batch, sort_keys=True))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached["rankings"], cached["cost"]
+        # Seeded from the batch, so a rerun shows the judge the same order and hits the cache
+        rng = random.Random(key)
+        batch = [(prompt, rng.sample(answers, len(answers))) for prompt, answers in batch]
+        sections = []
+        for number, (prompt, answers) in enumerate(batch, start=1):
+            competitors = "\n\n".join(f"# Competitor {i}\n{answer}" for i, (_, answer) in enumerate(answers, start=1))
+            sections.append(f"## Question {number}\n{prompt}\n\n{competitors}")
+        judge_prompt = JUDGE_INSTRUCTIONS + "\n\n" + "\n\n".join(sections)
+        try:
+            result = await self.complete(self.judge, [{"role": "user", "content": judge_prompt}])
+            verdict = json.loads(re.search(r"\{.*\}", result["answer"], re.DOTALL).group(0))
+        except Exception as e:
+            print(f"Judge failed on a batch of {len(batch)}: {e}", flush=True)
+            return {}, 0.0
+        rankings = {}
+        for item in verdict.get("results", []):
+            # A malformed item only loses its own question, not the verdicts on the rest of the batch
+            try:
+                index = int(item["question"]) - 1
+                ranking = [int(i) for i in item["ranking"]]
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Skipping malformed judge verdict {item!r}: {e!r}", flush=True)
+                continue
+            if 0 <= index < len(batch):
+                answers = batch[index][1]
+                rankings[batch[index][0]] = [answers[i - 1][0] for i in ranking if 0 < i <= len(answers)]
+        self.cache.put(key, kind="judge", rankings=rankings, cost=result["cost"], latency=result["latency"])
+        return rankings, result["cost"]
+
+    async def evaluate(self, prompts):
+        # All (prompt, model) pairs at once; the rate limiters decide how many actually run
+        # Retrieval runs once per prompt, so every model answers the identical request
+        messages = dict(zip(prompts, await asyncio.gather(*(asyncio.to_thread(self.build_messages, prompt) for prompt in prompts))))
+        pairs = [(prompt, spec) for prompt in prompts for spec in self.models]
+        started = time.monotonic()
+        results = await asyncio.gather(*(self.answer(spec, prompt, messages[prompt]) for prompt, spec in pairs))
+        print(f"Collected {len(pairs)} answers in {time.monotonic() - started:.1f}s", flush=True)
+
+        answers = {prompt: [] for prompt in prompts}
+        records = []
+        for (prompt, spec), result in zip(pairs, results):
+            if result is not None:
+                answers[prompt].append((spec.name, result["answer"]))
+                records.append(result)
+        ranked = [(prompt, answers[prompt]) for prompt in prompts if len(answers[prompt]) > 1]
+        batches = [ranked[i:i + self.batch_size] for i in range(0, len(ranked), self.batch_size)]
+        rankings = {}
+        judge_cost = 0.0
+        for batch_rankings, cost in await asyncio.gather(*(self.rank_batch(batch) for batch in batches)):
+            rankings.update(batch_rankings)
+            judge_cost += cost
+        return report(self.models, records, rankings, self.judge, len(batches), judge_cost)
+
+
+def report(models, records, rankings, judge=None, judge_calls=0, judge_cost=0.0):
+    rows = []
+    for spec in models:
+        own = [record for record in records if record["model"] == spec.name]
+        ranks = [ranking.index(spec.name) + 1 for ranking in rankings.values() if spec.name in ranking]
+        latencies = sorted(record["latency"] for record in own)
+        rows.append({
+            "model": spec.name,
+            "answers": len(own),
+            "mean_rank": sum(ranks) / len(ranks) if ranks else None,
+            "wins": sum(1 for rank in ranks if rank == 1),
+            "p50_latency": latencies[len(latencies) // 2] if latencies else None,
+            "p95_latency": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else None,
+            "cost": sum(record["cost"] for record in own),
+        })
+    rows.sort(key=lambda row: (row["mean_rank"] is None, row["mean_rank"] or 0))
+    # The judge's own spend goes last; its answers column counts judge calls
+    if judge is not None:
+        rows.append({"model": f"{judge.name} (judge)", "answers": judge_calls, "mean_rank": None, "wins": None,
+                     "p50_latency": None, "p95_latency": None, "cost": judge_cost})
+    return rows
+
+
+def print_report(rows):
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else "-"
+
+    print(f"\n{'model':<28} {'answers':>7} {'mean rank':>9} {'wins':>5} {'p50 s':>7} {'p95 s':>7} {'cost $':>9}")
+    for row in rows:
+        print(f"{row['model']:<28} {row['answers']:>7} {fmt(row['mean_rank'], '.2f'):>9} {fmt(row['wins'], 'd'):>5} "
+              f"{fmt(row['p50_latency'], '.2f'):>7} {fmt(row['p95_latency'], '.2f'):>7} {row['cost']:>9.4f}")
+
+
+def load_prompts(path):
+    if path is None:
+        return DEFAULT_PROMPTS
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        return [line.strip() for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare models on a prompt set with a judge model")
+    parser.add_argument("--prompts", help="text file with one prompt per line, or a JSON list")
+    parser.add_argument("--models", default="gpt-4o-mini,gpt-4.1-mini,claude-3-5-haiku-latest")
+    parser.add_argument("--judge", default=JUDGE_MODEL)
+    parser.add_argument("--batch-size", type=int, default=JUDGE_BATCH_SIZE)
+    parser.add_argument("--cache", default=CACHE_FILE)
+    parser.add_argument("--bare", action="store_true", help="send the bare prompt, without the chat app's system prompt and background")
+    args = parser.parse_args()
+
+    build_messages = None
+    if not args.bare:
+        # Imported here: the chat app loads the knowledge base and its embeddings
+        from app import Me
+        me = Me(watch_knowledge=False)
+        build_messages = lambda prompt: me.chat_messages(me.knowledge, prompt, [])
+    evaluator = Evaluator(args.models.split(","), args.judge, ResultCache(args.cache), args.batch_size, build_messages)
+    rows = asyncio.run(evaluator.evaluate(load_prompts(args.prompts)))
+    print_report(rows)
+
 
-load_dotenv(override=True)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+
+ME_DIR = "./me"
+KNOWLEDGE_SOURCES = ["summary.txt", "linkedin.pdf", "resume.pdf", "Johannes_RAG.xlsx"]
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_BATCH = 64
+
+# Prose sources are split into overlapping word windows; every xlsx row is its own chunk
+CHUNK_WORDS = 180
+CHUNK_OVERLAP = 40
+TOP_K = 5
+
+# Reciprocal rank fusion constant used to merge the BM25 and embedding rankings
+RRF_K = 60
+
+
+@dataclass(frozen=True)
+class Chunk:
+    source: str
+    text: str
+
+
+def tokenize(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def chunk_text(text, source, size=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    words = text.split()
+    chunks = []
+    step = size - overlap
+    for start in range(0, max(len(words) - overlap, 1), step):
+        window = words[start:start + size]
+        if window:
+            chunks.append(Chunk(source, " ".join(window)))
+    return chunks
+
+
+# pypdf and pandas are imported lazily: workers that load a prebuilt snapshot never need them
+def read_pdf(path):
+    from pypdf import PdfReader
+    reader = PdfReader(path)
+    return "".join(page.extract_text() or "" for page in reader.pages)
+
+
+def read_rag_rows(path):
+    import pandas as pd
+    ex = pd.read_excel(path)
+    rows = []
+    for record in ex.to_dict(orient="records"):
+        fields = [f"{key}: {value}" for key, value in record.items() if pd.notna(value)]
+        rows.append("; ".join(fields))
+    return rows
+
+
+def load_source(name, me_dir=ME_DIR):
+    path = f"{me_dir}/{name}"
+    if name.endswith(".pdf"):
+        return chunk_text(read_pdf(path), name)
+    if name.endswith(".xlsx"):
+        return [Chunk(name, row) for row in read_rag_rows(path)]
+    with open(path, "r", encoding="utf-8") as f:
+        return chunk_text(f.read(), name)
+
+
+def load_chunks(me_dir=ME_DIR, sources=KNOWLEDGE_SOURCES):
+    chunks = []
+    for name in sources:
+        chunks.extend(load_source(name, me_dir))
+    return chunks
+
+
+class BM25:
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(documents)
+        term_freqs = [Counter(tokenize(doc)) for doc in documents]
+        lengths = np.array([sum(tf.values()) for tf in term_freqs], dtype=np.float32)
+        avg_length = float(lengths.mean()) if self.size else 1.0
+        self.norm = k1 * (1 - b + b * lengths / (avg_length or 1.0))
+        # Inverted index: term -> (document ids, term frequencies), so scoring only touches matching docs
+        postings = {}
+        for doc_id, tf in enumerate(term_freqs):
+            for term, count in tf.items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(doc_id)
+                postings[term][1].append(count)
+        self.postings = {}
+        for term, (doc_ids, counts) in postings.items():
+            idf = math.log(1 + (self.size - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            self.postings[term] = (np.array(doc_ids), np.array(counts, dtype=np.float32), idf)
+
+    def scores(self, query):
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            doc_ids, tf, idf = self.postings[term]
+            scores[doc_ids] += idf * tf * (self.k1 + 1) / (tf + self.norm[doc_ids])
+        return scores
+
+
+def embed(openai, texts):
+    vectors = []
+    for start in range(0, len(texts), EMBEDDING_BATCH):
+        response = openai.embeddings.create(model=EMBEDDING_MODEL, input=texts[start:start + EMBEDDING_BATCH])
+        vectors.extend(item.embedding for item in response.data)
+    matrix = np.array(vectors, dtype=np.float32)
+    # Normalized rows make cosine similarity a plain dot product
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+class KnowledgeIndex:
+    # Hybrid retrieval: BM25 catches exact names and keywords, embeddings catch paraphrases
+
+    def __init__(self, chunks, embeddings, openai=None):
+        self.chunks = chunks
+        self.embeddings = embeddings
+        self.openai = openai
+        self.bm25 = BM25([chunk.text for chunk in chunks])
+
+    @classmethod
+    def build(cls, chunks, openai):
+        embeddings = embed(openai, [chunk.text for chunk in chunks]) if chunks else np.zeros((0, 0), dtype=np.float32)
+        return cls(chunks, embeddings, openai)
+
+    def search(self, query, k=TOP_K, query_vector=None):
+        if not self.chunks:
+            return []
+        rankings = [np.argsort(-self.bm25.scores(query))]
+        if self.openai is not None and len(self.embeddings):
+            if query_vector is None:
+                query_vector = embed(self.openai, [query])[0]
+            rankings.append(np.argsort(-(self.embeddings @ query_vector)))
+        fused = np.zeros(len(self.chunks), dtype=np.float32)
+        for ranking in rankings:
+            fused[ranking] += 1.0 / (RRF_K + np.arange(1, len(ranking) + 1))
+        return [self.chunks[i] for i in np.argsort(-fused)[:k]]
+
+
+@dataclass(frozen=True)
+class KnowledgeState:
+    # Everything a chat turn reads from the knowledge base; replaced as a whole on reload, so a turn
+    # that grabbed one state keeps a consistent view even if a newer one is swapped in meanwhile
+    version: str
+    summary: str
+    index: KnowledgeIndex
+    system_prompt: str
+
+
+def format_chunks(chunks):
+    return "\n\n".join(f"[{chunk.source}] {chunk.text}" for chunk in chunks)
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from knowledge import ME_DIR, KNOWLEDGE_SOURCES, EMBEDDING_MODEL, CHUNK_WORDS, CHUNK_OVERLAP, Chunk, embed, load_source
+
+# Compiled form of me/: extracted chunks, their embeddings (memory-mappable .npy) and a manifest
+# holding per-source mtimes and content hashes. Workers load it in milliseconds and share the
+# embedding pages through the OS cache; PDFs and Excel are only parsed when a source changed.
+#
+#   python knowledge_snapshot.py     # build step, run at deploy time or after editing me/
+SNAPSHOT_DIR = "./.knowledge_snapshot"
+WATCH_INTERVAL = 5.0
+SNAPSHOT_FORMAT = 1
+SUMMARY_SOURCE = "summary.txt"
+
+
+@dataclass
+class Snapshot:
+    version: str
+    manifest: dict
+    chunks: list
+    embeddings: np.ndarray
+    summary: str
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_states(me_dir=ME_DIR, sources=KNOWLEDGE_SOURCES, previous=None):
+    # mtime and size decide whether a source must be re-hashed at all
+    previous = previous or {}
+    states = {}
+    for name in sources:
+        stat = os.stat(os.path.join(me_dir, name))
+        state = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        old = previous.get(name)
+        if old and old["mtime_ns"] == state["mtime_ns"] and old["size"] == state["size"]:
+            state["sha256"] = old["sha256"]
+        else:
+            state["sha256"] = file_hash(os.path.join(me_dir, name))
+        states[name] = state
+    return states
+
+
+def snapshot_version(states):
+    digest = hashlib.sha256(f"{SNAPSHOT_FORMAT}:{EMBEDDING_MODEL}:{CHUNK_WORDS}:{CHUNK_OVERLAP}".encode("utf-8"))
+    for name in sorted(states):
+        digest.update(f"{name}:{states[name]['sha256']}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def current_version(snapshot_dir=SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(snapshot_dir, "CURRENT"), "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def load_snapshot(snapshot_dir=SNAPSHOT_DIR, version=None):
+    version = version or current_version(snapshot_dir)
+    if version is None:
+        return None
+    path = os.path.join(snapshot_dir, version)
+    with open(os.path.join(path, "manifest.json"), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    with open(os.path.join(path, "chunks.json"), "r", encoding="utf-8") as f:
+        chunks = [Chunk(item["source"], item["text"]) for item in json.load(f)]
+    # Memory-mapped, so every worker process shares the same pages (empty arrays cannot be mapped)
+    embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r" if manifest["chunks"] else None)
+    return Snapshot(version, manifest, chunks, embeddings, manifest["summary"])
+
+
+def build_snapshot(openai, me_dir=ME_DIR, snapshot_dir=SNAPSHOT_DIR, sources=KNOWLEDGE_SOURCES):
+    previous = load_snapshot(snapshot_dir) if current_version(snapshot_dir) else None
+    states = source_states(me_dir, sources, previous.manifest["sources"] if previous else None)
+    version = snapshot_version(states)
+    if previous is not None and previous.version == version:
+        return previous
+
+    chunks, vectors = [], []
+    for name in sources:
+        unchanged = previous is not None and previous.manifest["sources"].get(name, {}).get("sha256") == states[name]["sha256"]
+        if unchanged:
+            # Reuse extracted chunks and embeddings of sources that did not change
+            rows = [i for i, chunk in enumerate(previous.chunks) if chunk.source == name]
+            source_chunks = [previous.chunks[i] for i in rows]
+            source_vectors = np.asarray(previous.embeddings[rows])
+        else:
+            print(f"Extracting {name}", flush=True)
+            source_chunks = load_source(name, me_dir)
+            source_vectors = embed(openai, [chunk.text for chunk in source_chunks]) if source_chunks else None
+        chunks.extend(source_chunks)
+        if source_vectors is not None and len(source_vectors):
+            vectors.append(source_vectors)
+    embeddings = np.vstack(vectors).astype(np.float32) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+    with open(os.path.join(me_dir, SUMMARY_SOURCE), "r", encoding="utf-8") as f:
+        summary = f.read()
+    manifest = {"format": SNAPSHOT_FORMAT, "version": version, "embedding_model": EMBEDDING_MODEL,
+                "sources": states, "chunks": len(chunks), "summary": summary}
+
+    # Written to a temporary directory and renamed into place, so readers never see a partial snapshot
+    os.makedirs(snapshot_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=snapshot_dir, prefix=".build-")
+    with open(os.path.join(staging, "chunks.json"), "w", encoding="utf-8") as f:
+        json.dump([{"source": chunk.source, "text": chunk.text} for chunk in chunks], f, ensure_ascii=False)
+    np.save(os.path.join(staging, "embeddings.npy"), embeddings)
+    with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    target = os.path.join(snapshot_dir, version)
+    if os.path.exists(target):
+        # Another worker built the same version concurrently
+        shutil.rmtree(staging)
+    else:
+        os.rename(staging, target)
+    pointer = os.path.join(snapshot_dir, f".CURRENT-{os.getpid()}")
+    with open(pointer, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(snapshot_dir, "CURRENT"))
+    # Keep the new and the previous snapshot; older ones are no longer referenced
+    keep = {version, previous.version if previous else None}
+    for name in os.listdir(snapshot_dir):
+        if not name.startswith(".") and name != "CURRENT" and name not in keep:
+            shutil.rmtree(os.path.join(snapshot_dir, name), ignore_errors=True)
+    print(f"Built knowledge snapshot {version} with {len(chunks)} chunks", flush=True)
+    return load_snapshot(snapshot_dir, version)
+
+
+def ensure_snapshot(openai, me_dir=ME_DIR, snapshot_dir=SNAPSHOT_DIR):
+    # Fast path: load the current snapshot if no source changed (stat calls only, no hashing)
+    snapshot = load_snapshot(snapshot_dir) if current_version(snapshot_dir) else None
+    if snapshot is not None and snapshot_version(source_states(me_dir, previous=snapshot.manifest["sources"])) == snapshot.version:
+        return snapshot
+    return build_snapshot(openai, me_dir, snapshot_dir)
+
+
+class SnapshotWatcher:
+    # Polls me/ for changed sources and rebuilds the snapshot in a background thread (only the changed
+    # sources are re-extracted), then hands the new snapshot to on_change
+
+    def __init__(self, openai, on_change, snapshot, me_dir=ME_DIR, snapshot_dir=SNAPSHOT_DIR, interval=WATCH_INTERVAL):
+        self.openai = openai
+        self.on_change = on_change
+        self.version = snapshot.version
+        self.sources = snapshot.manifest["sources"]
+        self.me_dir = me_dir
+        self.snapshot_dir = snapshot_dir
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="knowledge-watcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self):
+        # Only stat calls unless a source's mtime or size changed
+        states = source_states(self.me_dir, previous=self.sources)
+        if snapshot_version(states) == self.version:
+            self.sources = states
+            return False
+        started = time.monotonic()
+        snapshot = build_snapshot(self.openai, self.me_dir, self.snapshot_dir)
+        self.version = snapshot.version
+        self.sources = snapshot.manifest["sources"]
+        self.on_change(snapshot)
+        print(f"Reloaded knowledge snapshot {snapshot.version} in {time.monotonic() - started:.2f}s", flush=True)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                # A half-saved file or a failed embedding call; try again on the next tick
+                print(f"Knowledge reload failed: {e}", flush=True)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from openai import OpenAI
+
+    load_dotenv(override=True)
+    snapshot = build_snapshot(OpenAI())
+    print(f"Knowledge snapshot {snapshot.version}: {len(snapshot.chunks)} chunks")
@@ -0,0 +1,191 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Load test for Me.chat: N concurrent multi-turn conversations against a local fake OpenAI server and a
+# fake Pushover endpoint, so no tokens are spent and results only reflect our own code and thread pool.
+#
+#   python loadtest.py --sessions 200 --workers 40 --latency 0.8
+#
+# --workers mirrors Gradio's worker thread pool; queue wait shows when that pool saturates.
+
+EMBEDDING_DIM = 64
+
+SCRIPTS = [
+    ["Hi!", "What's your experience with DevOps?", "How large were the teams you led?"],
+    ["Are you open to work?", "Great, my email is visitor@example.com, I'm Alex from Acme.", "Thanks!"],
+    ["What did you do at Volkswagen?", "What is your favourite pizza topping?", "OK, reach me at pizza@example.com"],
+    ["Tell me about your leadership style.", "How do you handle underperformers?", "Which agile frameworks do you use?",
+     "What tools do you use for CI/CD?", "Thanks, that's all."],
+]
+
+
+def fake_embedding(text):
+    # Deterministic pseudo-embedding so identical texts get identical vectors
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    return [rng.uniform(-1, 1) for _ in range(EMBEDDING_DIM)]
+
+
+def fake_completion(request, latency):
+    time.sleep(max(0.0, random.gauss(latency, latency / 4)))
+    messages = request["messages"]
+    last = messages[-1]
+    prompt_tokens = sum(len(str(message.get("content") or "")) for message in messages) // 4
+    message = {"role": "assistant", "content": "Thanks for asking! " + "lorem ipsum " * 40}
+    finish_reason = "stop"
+    # Trigger the tools the way the real model would: emails are recorded, off-topic questions too
+    if last["role"] == "user" and request.get("tools"):
+        text = str(last.get("content") or "")
+        if "@" in text:
+            arguments = {"email": text.split()[-1].strip(".,"), "notes": text}
+            message = {"role": "assistant", "content": None, "tool_calls": [
+                {"id": "call_1", "type": "function", "function": {"name": "record_user_details", "arguments": json.dumps(arguments)}}]}
+            finish_reason = "tool_calls"
+        elif "pizza" in text:
+            message = {"role": "assistant", "content": None, "tool_calls": [
+                {"id": "call_1", "type": "function", "function": {"name": "record_unknown_question", "arguments": json.dumps({"question": text})}}]}
+            finish_reason = "tool_calls"
+    return {
+        "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": request["model"],
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 120, "total_tokens": prompt_tokens + 120,
+                  "prompt_tokens_details": {"cached_tokens": prompt_tokens // 2}},
+    }
+
+
+class FakeServer:
+    # One local HTTP server standing in for both the OpenAI API and Pushover
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.notifications = 0
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                server.requests += 1
+                if self.path.endswith("/chat/completions"):
+                    payload = fake_completion(json.loads(body), server.latency)
+                elif self.path.endswith("/embeddings"):
+                    inputs = json.loads(body)["input"]
+                    inputs = [inputs] if isinstance(inputs, str) else inputs
+                    payload = {"object": "list", "model": "fake", "usage": {"prompt_tokens": 1, "total_tokens": 1},
+                               "data": [{"object": "embedding", "index": i, "embedding": fake_embedding(text)} for i, text in enumerate(inputs)]}
+                elif self.path.endswith("/messages.json"):
+                    server.notifications += 1
+                    payload = {"status": 1}
+                else:
+                    self.send_error(404)
+                    return
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def run_session(me, script, submitted_at, results, lock):
+    started = time.monotonic()
+    history = []
+    turns = []
+    for message in script:
+        turn_started = time.monotonic()
+        try:
+            reply = me.chat(message, list(history))
+            error = None
+        except Exception as e:
+            reply, error = "", repr(e)
+        turns.append((time.monotonic() - turn_started, error))
+        history += [{"role": "user", "content": message}, {"role": "assistant", "content": reply}]
+    with lock:
+        results.append({"queue_wait": started - submitted_at, "turns": turns})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for Me.chat")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=40, help="worker threads, like Gradio's thread pool")
+    parser.add_argument("--latency", type=float, default=0.5, help="mean fake model latency in seconds")
+    parser.add_argument("--disable-answer-cache", action="store_true")
+    args = parser.parse_args()
+
+    server = FakeServer(args.latency)
+    import app
+    # Point both clients and the notifier at the fake server; app's load_dotenv has already run
+    os.environ["OPENAI_API_KEY"] = "fake-key"
+    os.environ["OPENAI_BASE_URL"] = f"{server.url}/v1"
+    app.notifier.url = f"{server.url}/1/messages.json"
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        me = app.Me(watch_knowledge=False, snapshot_dir=snapshot_dir)
+        if args.disable_answer_cache:
+            me.answer_cache.threshold = 2.0
+
+        results, lock = [], threading.Lock()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for i in range(args.sessions):
+                pool.submit(run_session, me, SCRIPTS[i % len(SCRIPTS)], time.monotonic(), results, lock)
+        elapsed = time.monotonic() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        app.notifier.flush()
+    server.close()
+
+    turn_count = sum(len(result["turns"]) for result in results)
+    errors = [error for result in results for _, error in result["turns"] if error]
+    waits = [result["queue_wait"] for result in results]
+    print(f"\nSessions: {len(results)}  turns: {turn_count}  errors: {len(errors)}  wall time: {elapsed:.1f}s")
+    print(f"Throughput: {turn_count / elapsed:.1f} turns/s, {len(results) / elapsed:.2f} sessions/s")
+    print(f"Fake API requests: {server.requests}  notifications delivered: {server.notifications}")
+    print("\nLatency per turn (s):")
+    print(f"{'turn':>6} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for index in range(max(len(script) for script in SCRIPTS)):
+        latencies = [result["turns"][index][0] for result in results if len(result["turns"]) > index]
+        if latencies:
+            print(f"{index + 1:>6} {len(latencies):>6} {percentile(latencies, 50):>8.3f} {percentile(latencies, 95):>8.3f} "
+                  f"{percentile(latencies, 99):>8.3f} {max(latencies):>8.3f}")
+    # Sessions waiting for a free worker thread mean the pool is saturated
+    saturated = sum(1 for wait in waits if wait > 0.05)
+    print(f"\nThread pool: {args.workers} workers, {saturated}/{len(waits)} sessions queued, "
+          f"queue wait p50 {percentile(waits, 50):.2f}s p95 {percentile(waits, 95):.2f}s max {max(waits, default=0):.2f}s")
+    concurrent_sessions = min(args.workers, args.sessions) or 1
+    print(f"Memory: peak {(peak - baseline) / 1e6:.1f} MB over baseline, ~{(peak - baseline) / concurrent_sessions / 1e3:.0f} KB per concurrent session")
+    print(f"Prompt cache: {me.cache_stats()}  answer cache hits: {me.answer_cache.hits}")
+    if errors:
+        print(f"First error: {errors[0]}")
+
+
+if __name__ == "__main__":
+    main()
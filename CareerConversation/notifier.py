@@ -0,0 +1,110 @@
+import os
+import queue
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+PUSHOVER_URL = os.getenv("PUSHOVER_URL", "https://api.pushover.net/1/messages.json")
+QUEUE_SIZE = 200
+TIMEOUT = 5
+RETRIES = 3
+BACKOFF = 1.0
+
+# Notifications arriving within this many seconds of each other are sent as one message
+COALESCE_WINDOW = 2.0
+# Pushover rejects longer messages
+MAX_MESSAGE_LENGTH = 1024
+
+
+def coalesce(texts, limit=MAX_MESSAGE_LENGTH):
+    messages = []
+    current = ""
+    # The same notification queued twice within the window is sent once
+    for text in dict.fromkeys(texts):
+        text = text[:limit]
+        if current and len(current) + 1 + len(text) > limit:
+            messages.append(current)
+            current = text
+        else:
+            current = f"{current}\n{text}" if current else text
+    if current:
+        messages.append(current)
+    return messages
+
+
+class Notifier:
+    # Sends push notifications from a background thread; notify() never blocks the caller
+
+    def __init__(self, url=PUSHOVER_URL, queue_size=QUEUE_SIZE, timeout=TIMEOUT, retries=RETRIES,
+                 backoff=BACKOFF, coalesce_window=COALESCE_WINDOW):
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.coalesce_window = coalesce_window
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+        self._thread.start()
+
+    def notify(self, text):
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            print(f"Notification queue full, dropped: {text}", flush=True)
+            return False
+
+    def flush(self):
+        self.queue.join()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.coalesce_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                for message in coalesce(batch):
+                    self._send(message)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _send(self, message):
+        data = {
+            "token": os.getenv("PUSHOVER_TOKEN"),
+            "user": os.getenv("PUSHOVER_USER"),
+            "message": message,
+        }
+        for attempt in range(self.retries):
+            try:
+                response = self.session.post(self.url, data=data, timeout=self.timeout)
+                if response.ok:
+                    self.sent += 1
+                    return
+                # Client errors other than rate limiting will not succeed on retry
+                if response.status_code < 500 and response.status_code != 429:
+                    self.failed += 1
+                    print(f"Pushover rejected notification with {response.status_code}", flush=True)
+                    return
+                print(f"Pushover returned {response.status_code}, attempt {attempt + 1}", flush=True)
+            except requests.RequestException as e:
+                print(f"Pushover request failed: {e}, attempt {attempt + 1}", flush=True)
+            time.sleep(self.backoff * 2 ** attempt)
+        self.failed += 1
+        print(f"Giving up on notification: {message}", flush=True)
@@ -0,0 +1,83 @@
+import re
+import threading
+
+TRIVIAL = "trivial"
+KNOWLEDGE = "knowledge"
+TOOL = "tool"
+# Recorded for turns answered from the answer cache, which never reach a model
+CACHE = "cache"
+
+TRIVIAL_MODEL = "gpt-4.1-nano"
+TRIVIAL_MAX_TOKENS = 150
+# Weight of the newest full-model latency in the running average used to estimate the latency saved
+LATENCY_SMOOTHING = 0.1
+
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+# Visitors who want to get in touch end up in record_user_details
+CONTACT_PHRASES = ("contact me", "reach me", "get in touch", "email me", "call me", "my email", "my number", "my phone", "hire you")
+SMALL_TALK = {
+    "hi", "hello", "hey", "hiya", "howdy", "yo", "greetings", "good", "morning", "afternoon", "evening", "day",
+    "thanks", "thank", "you", "thx", "ty", "cheers", "great", "cool", "nice", "awesome", "perfect", "ok", "okay",
+    "bye", "goodbye", "see", "later", "ya", "have", "a", "how", "are", "doing", "whats", "up", "got", "it",
+    "that", "thats", "helps", "much", "so", "very", "all", "for", "now", "there", "lol", "wow", "welcome", "pleasure",
+    "meet", "to", "i", "am", "fine", "well",
+}
+# Yes/no answers are left out on purpose: they depend on what the assistant asked before
+MAX_TRIVIAL_WORDS = 8
+
+TRIVIAL_INSTRUCTIONS = "You are {name}, chatting with a visitor on your career website. Reply to their small talk \
+in one or two friendly, professional sentences, staying in character. Do not make any claims about your career; \
+invite them to ask about your background, skills and experience, or to leave their email to get in touch."
+
+
+def classify(message):
+    # Local rules only: no model call, well under a millisecond
+    text = str(message).strip().lower()
+    if EMAIL.search(text) or any(phrase in text for phrase in CONTACT_PHRASES):
+        return TOOL
+    words = re.findall(r"[a-z]+", text.replace("'", ""))
+    if words and len(words) <= MAX_TRIVIAL_WORDS and all(word in SMALL_TALK for word in words):
+        return TRIVIAL
+    return KNOWLEDGE
+
+
+class CascadeRouter:
+    # Sends small talk to the cheapest model and everything else to the full model with retrieval,
+    # and keeps track of how much latency the cheap path saved
+
+    def __init__(self, smoothing=LATENCY_SMOOTHING):
+        self.smoothing = smoothing
+        self.full_latency = None
+        self.counts = {TRIVIAL: 0, KNOWLEDGE: 0, TOOL: 0}
+        self.cache_hits = 0
+        self.saved = 0.0
+        self.lock = threading.Lock()
+
+    def route(self, message):
+        route = classify(message)
+        with self.lock:
+            self.counts[route] += 1
+        return route
+
+    def record(self, route, message, latency):
+        with self.lock:
+            if route in (TRIVIAL, CACHE):
+                saved = self.full_latency - latency if self.full_latency is not None else None
+                if saved is not None:
+                    self.saved += saved
+                if route == CACHE:
+                    self.cache_hits += 1
+            else:
+                saved = None
+                if self.full_latency is None:
+                    self.full_latency = latency
+                else:
+                    self.full_latency += self.smoothing * (latency - self.full_latency)
+        saved_text = f", saved ~{saved:.2f}s" if saved is not None else ""
+        print(f"Routed {route} in {latency:.2f}s{saved_text}: {str(message)[:60]!r}", flush=True)
+
+    def stats(self):
+        with self.lock:
+            total = sum(self.counts.values())
+            return {**self.counts, "trivial_ratio": self.counts[TRIVIAL] / total if total else 0.0,
+                    "cache_hits": self.cache_hits, "latency_saved": self.saved, "full_latency": self.full_latency}
@@ -1,56 +1,177 @@
+import argparse
+import asyncio
+import json
 import os
+import re
+import time
 from dotenv import load_dotenv
-from openai import OpenAI
-from IPython.display import Markdown, display
+from openai import AsyncOpenAI
 
-load_dotenv(override=True)
+# Idea chain: business area -> pain points -> solution. Every area runs its chain as an independent
+# task under a shared concurrency cap, so many ideas take roughly the time of a few chains.
+# Ideas are streamed to a JSON lines file as they complete.
+#
+#   python simpleAgenticIdeaSearch.py --count 100 --concurrency 20 --output ideas.jsonl
+MODEL = "gpt-4o-mini"
+CONCURRENCY = 20
+# Areas requested per listing call; larger runs give each call its own sector so the lists do not overlap
+AREAS_PER_REQUEST = 20
+SECTORS = ["healthcare", "finance", "manufacturing", "retail", "logistics", "education", "energy", "legal",
+           "real estate", "insurance", "agriculture", "media", "telecommunications", "public sector", "travel"]
 
-openai_api_key = os.getenv("OPENAI_API_KEY")
-
-if openai_api_key:
-    print(f"OpenAI API Key exists and begins with {openai_api_key[:8]}")
-else:
-    print("OpenAI API Key does not exist")
-
-openai = OpenAI() #wrapper over the OpenAI API
 
 # create a message in format of openAI: role and content
 # role is set to user
 def create_message(content):
     return [{"role": "user", "content": content}]
 
-# get response from openAI for the message
-def get_response(messages):
-    response = openai.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=messages,
-    )
-    return response.choices[0].message.content
 
-def get_answer(question):
-    messages = create_message(question)
-    return get_response(messages)
+def areas_prompt(count, sector=None):
+    scope = f' in or around {sector}' if sector else ''
+    return f'List {count} distinct business areas{scope} that might be worth exploring for Agentic AI opportunity. Respond only with the areas, one per line'
+
+
+def pain_points_prompt(area):
+    return 'Present a biggest painpoint in ' + area + ' - something challenging that might be ripe for an Agentic solution. Answer with a list of 3 painpoints'
+
+
+def solution_prompt(pain_points):
+    return 'Create a solution for ' + pain_points + ' which can be a good and profitable agentic solution'
+
+
+def parse_areas(text):
+    areas = []
+    for line in text.splitlines():
+        # Only a leading bullet or "1." / "1)" is a list marker; "3D printing" keeps its digit
+        area = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s+", "", line).strip()
+        if area:
+            areas.append(area)
+    return areas
+
+
+class IdeaPipeline:
+
+    def __init__(self, client=None, model=MODEL, concurrency=CONCURRENCY, output=None):
+        self.client = client or AsyncOpenAI()
+        self.model = model
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.output = output
+        # prompt -> task, so identical prompts are sent once even while the first call is still running
+        self.memo = {}
+        self.calls = 0
+        self.write_lock = asyncio.Lock()
+
+    async def _complete(self, prompt):
+        async with self.semaphore:
+            self.calls += 1
+            response = await self.client.chat.completions.create(model=self.model, messages=create_message(prompt))
+        return response.choices[0].message.content
+
+    async def ask(self, prompt):
+        task = self.memo.get(prompt)
+        if task is None:
+            task = self.memo[prompt] = asyncio.ensure_future(self._complete(prompt))
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            # Do not memoize failures
+            if self.memo.get(prompt) is task:
+                del self.memo[prompt]
+            raise
+
+    async def chain(self, area):
+        started = time.monotonic()
+        pain_points = await self.ask(pain_points_prompt(area))
+        solution = await self.ask(solution_prompt(pain_points))
+        idea = {"area": area, "pain_points": pain_points, "solution": solution, "seconds": round(time.monotonic() - started, 2)}
+        await self.emit(idea)
+        return idea
+
+    async def emit(self, idea):
+        if self.output is None:
+            return
+        async with self.write_lock:
+            with open(self.output, "a", encoding="utf-8") as f:
+                f.write(json.dumps(idea, ensure_ascii=False) + "\n")
+
+    async def list_areas(self, count):
+        # Areas are requested in chunks concurrently and handed out as soon as a chunk arrives
+        sizes = [min(AREAS_PER_REQUEST, count - i) for i in range(0, count, AREAS_PER_REQUEST)]
+        if len(sizes) == 1:
+            prompts = [areas_prompt(sizes[0])]
+        else:
+            prompts = [areas_prompt(size, SECTORS[n % len(SECTORS)] + (f' (part {n // len(SECTORS) + 1})' if n >= len(SECTORS) else '')) for n, size in enumerate(sizes)]
+        tasks = [asyncio.ensure_future(self.ask(prompt)) for prompt in prompts]
+        seen = set()
+        try:
+            for task in asyncio.as_completed(tasks):
+                # One failed listing call only costs its chunk of areas
+                try:
+                    text = await task
+                except Exception as e:
+                    print(f"Area listing failed: {e}", flush=True)
+                    continue
+                for area in parse_areas(text):
+                    if area.lower() not in seen:
+                        seen.add(area.lower())
+                        yield area
+                        if len(seen) >= count:
+                            return
+        finally:
+            # Enough areas, or the consumer stopped: drop the listing calls still running.
+            # ask() shields the memoized call, so that one is cancelled and forgotten as well
+            for prompt, task in zip(prompts, tasks):
+                if not task.done():
+                    task.cancel()
+                    memo = self.memo.get(prompt)
+                    if memo is not None and not memo.done():
+                        memo.cancel()
+                        del self.memo[prompt]
+
+    async def run(self, count=None, areas=None):
+        # Each chain starts as soon as its area is known; ideas are yielded in completion order
+        chains = []
+        if areas:
+            chains = [asyncio.ensure_future(self.chain(area)) for area in areas]
+        else:
+            async for area in self.list_areas(count):
+                chains.append(asyncio.ensure_future(self.chain(area)))
+        for chain in asyncio.as_completed(chains):
+            try:
+                yield await chain
+            except Exception as e:
+                print(f"Idea chain failed: {e}", flush=True)
 
-# pick a business area that might be worth exploring for Agentic AI opportunity
-llm_request = 'Pick a business area that might be worth exploring for Agentic AI opportunity. Respond only with area' 
-# present the business idea
-business_idea = get_answer(llm_request)
-print("\nBusiness Area:")
-print(business_idea)
-# present a biggest painpoint in the business area
-llm_request = 'Present a biggest painpoint in ' + business_idea + ' - something challenging that might be ripe for an Agentic solution. Answer with a list of 3 painpoints'
-pain_points = get_answer(llm_request)
-print("\nPain Points:")
-print(pain_points)
-#get the solution for the painpoint
-# solution
-llm_request = 'Create a solution for '+pain_points+' which can be a good and profitable agentic solution'
-solution = get_answer(llm_request)
-print("\nSolution:")
-print(solution)
 
+async def generate(count=1, areas=None, output=None, concurrency=CONCURRENCY, model=MODEL):
+    pipeline = IdeaPipeline(model=model, concurrency=concurrency, output=output)
+    return [idea async for idea in pipeline.run(count, areas)]
 
 
+async def main(args):
+    pipeline = IdeaPipeline(model=args.model, concurrency=args.concurrency, output=args.output)
+    started = time.monotonic()
+    ideas = 0
+    async for idea in pipeline.run(args.count, args.areas):
+        ideas += 1
+        if args.output is None:
+            print(f"\nBusiness Area:\n{idea['area']}\n\nPain Points:\n{idea['pain_points']}\n\nSolution:\n{idea['solution']}")
+        else:
+            print(f"[{ideas}] {idea['area']} ({idea['seconds']}s)", flush=True)
+    print(f"\n{ideas} ideas, {pipeline.calls} API calls in {time.monotonic() - started:.1f}s")
 
 
+if __name__ == "__main__":
+    load_dotenv(override=True)
+    if os.getenv("OPENAI_API_KEY"):
+        print(f"OpenAI API Key exists and begins with {os.getenv('OPENAI_API_KEY')[:8]}")
+    else:
+        print("OpenAI API Key does not exist")
 
+    parser = argparse.ArgumentParser(description="Generate Agentic AI business ideas concurrently")
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--areas", nargs="*", help="explore these areas instead of letting the model pick")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--output", help="append ideas to this JSON lines file as they complete")
+    parser.add_argument("--model", default=MODEL)
+    asyncio.run(main(parser.parse_args()))
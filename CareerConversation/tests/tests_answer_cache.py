@@ -0,0 +1,57 @@
+import time
+import numpy as np
+import pytest
+from answer_cache import AnswerCache, MAX_CONTEXT_MESSAGES
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def cache():
+    cache = AnswerCache(threshold=0.9, ttl=60)
+    cache.store("What do you do?", unit(1, 0, 0), "I lead platform teams.")
+    return cache
+
+# ------------------------------------------------------------------------------
+# Test: similar questions hit within the TTL, expired entries miss and are dropped.
+# ------------------------------------------------------------------------------
+def test_ttl_hit_and_miss(cache, monkeypatch):
+    assert cache.lookup("What is your job?", unit(1, 0.1, 0)) == "I lead platform teams."
+    assert cache.hits == 1
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.lookup("What do you do?", unit(1, 0, 0)) is None
+    assert cache.entries == [] and len(cache.vectors) == 0
+    assert cache.misses == 1
+
+# ------------------------------------------------------------------------------
+# Test: a question below the similarity threshold is a miss.
+# ------------------------------------------------------------------------------
+def test_similarity_threshold_miss(cache):
+    assert cache.lookup("Do you like pizza?", unit(1, 1, 0)) is None
+    assert cache.lookup("Where do you live?", unit(0, 0, 1)) is None
+    assert (cache.hits, cache.misses) == (0, 2)
+
+# ------------------------------------------------------------------------------
+# Test: a change of me/ clears the cache, and answers computed from the old
+# knowledge are not stored afterwards.
+# ------------------------------------------------------------------------------
+def test_invalidation_when_knowledge_changes(cache):
+    generation = cache.generation
+    cache.invalidate()
+    assert cache.lookup("What do you do?", unit(1, 0, 0)) is None
+
+    cache.store("What do you do?", unit(1, 0, 0), "Old answer.", generation)
+    assert cache.entries == []
+    cache.store("What do you do?", unit(1, 0, 0), "New answer.", cache.generation)
+    assert cache.lookup("What do you do?", unit(1, 0, 0)) == "New answer."
+
+
+def test_only_short_conversations_are_cacheable(cache):
+    history = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello!"}]
+    assert cache.key_text("What do you do?", history) == "Hi\nWhat do you do?"
+    assert cache.key_text("And then?", history * MAX_CONTEXT_MESSAGES) is None
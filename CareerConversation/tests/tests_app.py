@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from types import SimpleNamespace
+import app
+from answer_cache import AnswerCache
+from history_compactor import HistoryCompactor
+from knowledge import Chunk
+from router import CACHE, KNOWLEDGE, TRIVIAL, TRIVIAL_MODEL, CascadeRouter
+
+# ------------------------------------------------------------------------------
+# Fake OpenAI client: answers name the model, every text embeds to the same vector.
+# ------------------------------------------------------------------------------
+class FakeOpenAI:
+    def __init__(self):
+        self.models = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.embeddings = SimpleNamespace(create=self.embed)
+
+    def create(self, model, messages, **kwargs):
+        self.models.append(model)
+        message = SimpleNamespace(content=f"answer from {model}", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=None)
+
+    def embed(self, model, input):
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[1.0, 0.0]) for _ in input])
+
+
+def snapshot(version, summary):
+    chunks = [Chunk("resume.pdf", "Led the platform team at Acme"), Chunk("summary.txt", summary)]
+    return SimpleNamespace(version=version, summary=summary, chunks=chunks, embeddings=np.zeros((0, 0), dtype=np.float32))
+
+
+@pytest.fixture
+def me(monkeypatch):
+    # A Me without API clients: retrieval falls back to BM25, which is all these tests need
+    me = app.Me.__new__(app.Me)
+    me.openai = None
+    me.name = "Test Person"
+    me.linkedin = "https://www.linkedin.com/in/test"
+    me.answer_cache = AnswerCache()
+    me.builds = 0
+    build = me.build_system_prompt
+
+    def counting_build(summary):
+        me.builds += 1
+        return build(summary)
+
+    monkeypatch.setattr(me, "build_system_prompt", counting_build)
+    me.knowledge = me.load_knowledge(snapshot("v1", "Engineering manager"))
+    return me
+
+# ------------------------------------------------------------------------------
+# Test: the system prompt is built once per knowledge version and every turn
+# starts with the same bytes; per-turn context only follows the history.
+# ------------------------------------------------------------------------------
+def test_system_prompt_is_memoized_and_prefix_stable(me):
+    history = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello!"}]
+    first = me.chat_messages(me.knowledge, "Where did you work?", [])
+    second = me.chat_messages(me.knowledge, "Which teams did you lead?", history)
+    assert me.builds == 1
+    assert first[0] == second[0] == {"role": "system", "content": me.system_prompt()}
+    assert "Engineering manager" in first[0]["content"]
+    assert second[1:3] == history
+    assert second[3]["content"].startswith("## Relevant background:")
+    assert second[-1] == {"role": "user", "content": "Which teams did you lead?"}
+
+
+def test_knowledge_change_swaps_the_prompt(me):
+    before = me.knowledge
+    me.answer_cache.store("Where did you work?", np.array([1.0, 0.0], dtype=np.float32), "At Acme.")
+    me.on_knowledge_change(snapshot("v2", "Director of engineering"))
+    assert me.answer_cache.entries == []
+    assert me.builds == 2
+    assert me.knowledge.version == "v2"
+    assert "Director of engineering" in me.system_prompt()
+    # A turn that grabbed the old state keeps its consistent view
+    assert "Engineering manager" in before.system_prompt
+
+
+@pytest.fixture
+def chatting(me):
+    me.openai = FakeOpenAI()
+    me.router = CascadeRouter()
+    me.compactor = HistoryCompactor(me.openai)
+    return me
+
+# ------------------------------------------------------------------------------
+# Test: small talk stays on the cheap model, a real question escalates to MODEL,
+# and a repeated question is answered from the cache and recorded as such.
+# ------------------------------------------------------------------------------
+def test_chat_routes_escalates_and_records_cache_hits(chatting, monkeypatch):
+    recorded = []
+    record = chatting.router.record
+
+    def recording(route, message, latency):
+        recorded.append(route)
+        record(route, message, latency)
+
+    monkeypatch.setattr(chatting.router, "record", recording)
+
+    assert chatting.chat("Hi!", []) == f"answer from {TRIVIAL_MODEL}"
+    assert chatting.chat("Hi, where did you work?", []) == f"answer from {app.MODEL}"
+    assert chatting.chat("Hi, where did you work?", []) == f"answer from {app.MODEL}"
+    assert chatting.openai.models == [TRIVIAL_MODEL, app.MODEL]
+    assert recorded == [TRIVIAL, KNOWLEDGE, CACHE]
+    assert chatting.router.stats()["cache_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_records_cache_hits(chatting):
+    chatting.answer_cache.store("Where did you work?", np.array([1.0, 0.0], dtype=np.float32), "At Acme.")
+    replies = [reply async for reply in chatting.chat_stream("Where did you work?", [])]
+    assert replies == ["At Acme."]
+    assert chatting.router.stats()["cache_hits"] == 1
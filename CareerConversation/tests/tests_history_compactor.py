@@ -0,0 +1,86 @@
+import pytest
+from types import SimpleNamespace
+from history_compactor import HistoryCompactor, SUMMARY_MODEL, estimate_tokens
+from router import TRIVIAL_MODEL
+
+# ------------------------------------------------------------------------------
+# Fake OpenAI client: records every summary request and answers with a counter.
+# ------------------------------------------------------------------------------
+class FakeOpenAI:
+    def __init__(self):
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages):
+        self.requests.append({"model": model, "prompt": messages[-1]["content"]})
+        content = f"summary {len(self.requests)}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def conversation(turns, words=50):
+    history = []
+    for turn in range(turns):
+        history.append({"role": "user", "content": f"question {turn} " + "word " * words, "metadata": None})
+        history.append({"role": "assistant", "content": f"answer {turn} " + "word " * words})
+    return history
+
+
+@pytest.fixture
+def openai():
+    return FakeOpenAI()
+
+# ------------------------------------------------------------------------------
+# Test: summaries run on the cheap model tier.
+# ------------------------------------------------------------------------------
+def test_summaries_use_cheap_model(openai):
+    assert SUMMARY_MODEL == TRIVIAL_MODEL
+    HistoryCompactor(openai, keep_turns=2, token_budget=200).compact(conversation(6))
+    assert openai.requests[0]["model"] == TRIVIAL_MODEL
+
+# ------------------------------------------------------------------------------
+# Test: a history within the token budget is passed on unchanged, without a summary.
+# ------------------------------------------------------------------------------
+def test_history_within_budget_is_not_compacted(openai):
+    history = conversation(2)
+    compacted = HistoryCompactor(openai, token_budget=10_000).compact(history)
+    assert compacted == [{"role": message["role"], "content": message["content"]} for message in history]
+    assert openai.requests == []
+
+# ------------------------------------------------------------------------------
+# Test: older turns are folded into a summary, the last turns are kept verbatim.
+# ------------------------------------------------------------------------------
+def test_old_turns_are_folded_into_summary(openai):
+    history = conversation(6)
+    compacted = HistoryCompactor(openai, keep_turns=2, token_budget=300).compact(history)
+    assert compacted[0]["role"] == "system"
+    assert "summary 1" in compacted[0]["content"]
+    assert compacted[1:] == [{"role": message["role"], "content": message["content"]} for message in history[-4:]]
+    assert estimate_tokens(compacted) <= 300
+
+# ------------------------------------------------------------------------------
+# Test: the running hash cache only summarizes messages folded since the last summary.
+# ------------------------------------------------------------------------------
+def test_running_summary_is_cached_by_prefix_hash(openai):
+    compactor = HistoryCompactor(openai, keep_turns=2, token_budget=300)
+    history = conversation(6)
+    compactor.compact(history)
+    # Same history again: answered from the cache
+    compactor.compact(history)
+    assert len(openai.requests) == 1
+
+    # One more turn folds one more turn: only that turn is sent, with the previous summary
+    compactor.compact(conversation(7))
+    assert len(openai.requests) == 2
+    prompt = openai.requests[1]["prompt"]
+    assert "Existing summary:\nsummary 1" in prompt
+    assert "question 4" in prompt and "question 3" not in prompt
+
+# ------------------------------------------------------------------------------
+# Test: if the kept turns alone exceed the budget, fewer turns are kept verbatim.
+# ------------------------------------------------------------------------------
+def test_kept_turns_shrink_to_fit_budget(openai):
+    history = conversation(6, words=200)
+    compacted = HistoryCompactor(openai, keep_turns=4, token_budget=500).compact(history)
+    kept_user_turns = [message for message in compacted if message["role"] == "user"]
+    assert len(kept_user_turns) == 1
+    assert kept_user_turns[0]["content"].startswith("question 5")
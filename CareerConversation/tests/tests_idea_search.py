@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from simpleAgenticIdeaSearch import IdeaPipeline, parse_areas
+
+# ------------------------------------------------------------------------------
+# Fake OpenAI client: the healthcare listing fails, the finance listing returns
+# plenty of areas and every other listing hangs until it is cancelled.
+# ------------------------------------------------------------------------------
+class FakeOpenAI:
+    def __init__(self):
+        self.cancelled = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages):
+        prompt = messages[0]["content"]
+        if "healthcare" in prompt:
+            raise RuntimeError("rate limited")
+        if "finance" in prompt:
+            content = "\n".join(f"{number}. area {number}" for number in range(50))
+        elif prompt.startswith("List"):
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+        else:
+            content = "idea"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+# ------------------------------------------------------------------------------
+# Test: a failed listing is skipped and the remaining listings are cancelled
+# once enough areas were yielded.
+# ------------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_list_areas_survives_failures_and_stops_at_count():
+    client = FakeOpenAI()
+    pipeline = IdeaPipeline(client=client)
+    areas = [area async for area in pipeline.list_areas(45)]
+    await asyncio.sleep(0)
+    assert areas == [f"area {number}" for number in range(45)]
+    assert client.cancelled == 1
+    assert all(task.done() for task in pipeline.memo.values())
+
+# ------------------------------------------------------------------------------
+# Test: only list markers are stripped, areas starting with a digit stay intact.
+# ------------------------------------------------------------------------------
+def test_parse_areas_keeps_leading_digits():
+    text = "1. 3D printing\n2) 5G networks\n- Cold chain logistics\n* 24/7 support\n\n• B2B payments\n10. 3PL warehousing"
+    assert parse_areas(text) == ["3D printing", "5G networks", "Cold chain logistics", "24/7 support", "B2B payments", "3PL warehousing"]
+    assert parse_areas("3D printing\n5G networks") == ["3D printing", "5G networks"]
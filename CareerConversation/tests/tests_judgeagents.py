@@ -0,0 +1,100 @@
+import json
+import re
+import pytest
+from types import SimpleNamespace
+from judgeagents import Evaluator, RateLimiter, ResultCache, RATE_LIMITS
+
+# ------------------------------------------------------------------------------
+# Fake OpenAI client: candidates echo their model name, the judge ranks competitor 1 first
+# and records the order in which it saw the answers.
+# ------------------------------------------------------------------------------
+class FakeOpenAI:
+    def __init__(self):
+        self.requests = []
+        self.judge_orders = []
+        self.verdict = None
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages):
+        self.requests.append({"model": model, "messages": messages})
+        if model == "o3-mini":
+            questions = messages[-1]["content"].split("## Question ")[1:]
+            self.judge_orders.append([re.findall(r"answer from (\S+)", question) for question in questions])
+            results = [{"question": number, "ranking": [1, 2]} for number in range(1, len(questions) + 1)]
+            content = json.dumps(self.verdict or {"results": results})
+        else:
+            content = f"answer from {model}"
+        usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=1000)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+
+def build_messages(prompt):
+    return [
+        {"role": "system", "content": "You are acting as Me."},
+        {"role": "system", "content": f"## Relevant background:\nnotes on {prompt}"},
+        {"role": "user", "content": prompt},
+    ]
+
+
+@pytest.fixture
+def evaluator(tmp_path):
+    evaluator = Evaluator(["gpt-4o-mini", "gpt-4.1-mini"], cache=ResultCache(str(tmp_path / "cache.jsonl")),
+                          batch_size=10, build_messages=build_messages)
+    evaluator.clients["openai"] = FakeOpenAI()
+    evaluator.limiters["openai"] = RateLimiter(*RATE_LIMITS["openai"])
+    return evaluator
+
+# ------------------------------------------------------------------------------
+# Test: candidates get the chat app's messages, the judge gets its bare prompt.
+# ------------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_candidates_get_chat_messages(evaluator):
+    await evaluator.evaluate(["Which languages do you know?"])
+    requests = evaluator.clients["openai"].requests
+    candidates = [request for request in requests if request["model"] != "o3-mini"]
+    assert all(request["messages"] == build_messages("Which languages do you know?") for request in candidates)
+    judge = [request for request in requests if request["model"] == "o3-mini"]
+    assert len(judge) == 1 and [message["role"] for message in judge[0]["messages"]] == ["user"]
+
+# ------------------------------------------------------------------------------
+# Test: the answer order is shuffled per question, so competitor 1 is not always the same model.
+# ------------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_answer_order_is_shuffled(evaluator):
+    rows = await evaluator.evaluate([f"question {number}" for number in range(10)])
+    orders = evaluator.clients["openai"].judge_orders[0]
+    assert {order[0] for order in orders} == {"gpt-4o-mini", "gpt-4.1-mini"}
+    # The fake judge always prefers competitor 1, so both models collect wins
+    assert all(row["wins"] for row in rows if not row["model"].endswith("(judge)"))
+
+# ------------------------------------------------------------------------------
+# Test: the report includes the judge's cost, also when the verdict comes from the cache.
+# ------------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_report_includes_judge_cost(evaluator):
+    rows = await evaluator.evaluate(["question"])
+    judge = rows[-1]
+    assert judge["model"] == "o3-mini (judge)" and judge["answers"] == 1
+    assert judge["cost"] == pytest.approx((1000 * 1.10 + 1000 * 4.40) / 1e6)
+
+    rows = await evaluator.evaluate(["question"])
+    assert rows[-1]["cost"] == judge["cost"]
+    assert len(evaluator.clients["openai"].requests) == 3
+
+# ------------------------------------------------------------------------------
+# Test: malformed items of a verdict are skipped, the valid ones still count.
+# ------------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_malformed_verdict_items_are_skipped(evaluator):
+    evaluator.clients["openai"].verdict = {"results": [
+        {"question": "first", "ranking": [1, 2]},
+        {"question": 2},
+        {"question": 3, "ranking": ["best", 1]},
+        None,
+        {"question": 4, "ranking": [2, 1]},
+    ]}
+    batch = [(f"question {number}", [("gpt-4o-mini", "a"), ("gpt-4.1-mini", "b")]) for number in range(1, 5)]
+    rankings, cost = await evaluator.rank_batch(batch)
+    assert list(rankings) == ["question 4"]
+    assert sorted(rankings["question 4"]) == ["gpt-4.1-mini", "gpt-4o-mini"]
+    assert cost > 0
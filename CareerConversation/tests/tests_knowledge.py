@@ -0,0 +1,69 @@
+import numpy as np
+from types import SimpleNamespace
+from knowledge import CHUNK_OVERLAP, CHUNK_WORDS, Chunk, KnowledgeIndex, chunk_text, load_source
+
+# ------------------------------------------------------------------------------
+# Fake OpenAI client: every text is embedded as the same unit vector.
+# ------------------------------------------------------------------------------
+class FakeOpenAI:
+    def __init__(self, vector):
+        self.vector = vector
+        self.inputs = []
+        self.embeddings = SimpleNamespace(create=self.create)
+
+    def create(self, model, input):
+        self.inputs.extend(input)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=self.vector) for _ in input])
+
+
+CHUNKS = [
+    Chunk("resume.pdf", "Led the Kubernetes migration of forty services at Acme"),
+    Chunk("linkedin.pdf", "Managed container orchestration platforms for many teams"),
+    Chunk("summary.txt", "Enjoys hiking in the Alps and cooking for friends"),
+    Chunk("resume.pdf", "Studied mechanical engineering in Munich"),
+]
+# Chunk 1 is the paraphrase closest to the query vector, chunk 0 the second closest
+EMBEDDINGS = np.array([[0.6, 0.8, 0, 0], [1, 0, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]], dtype=np.float32)
+QUERY_VECTOR = np.array([1, 0, 0, 0], dtype=np.float32)
+
+# ------------------------------------------------------------------------------
+# Test: prose is split into overlapping windows that cover every word.
+# ------------------------------------------------------------------------------
+def test_chunk_text_overlapping_windows():
+    words = [f"w{i}" for i in range(400)]
+    chunks = chunk_text(" ".join(words), "summary.txt")
+    windows = [chunk.text.split() for chunk in chunks]
+    assert [window[0] for window in windows] == ["w0", f"w{CHUNK_WORDS - CHUNK_OVERLAP}", f"w{2 * (CHUNK_WORDS - CHUNK_OVERLAP)}"]
+    assert all(len(window) <= CHUNK_WORDS for window in windows)
+    assert windows[0][-CHUNK_OVERLAP:] == windows[1][:CHUNK_OVERLAP]
+    assert windows[-1][-1] == "w399"
+    assert {chunk.source for chunk in chunks} == {"summary.txt"}
+
+    assert [chunk.text for chunk in chunk_text("just a few words", "summary.txt")] == ["just a few words"]
+    assert chunk_text("", "summary.txt") == []
+
+
+def test_load_source_chunks_text_files(tmp_path):
+    (tmp_path / "notes.txt").write_text("word " * (CHUNK_WORDS + 10), encoding="utf-8")
+    chunks = load_source("notes.txt", str(tmp_path))
+    assert len(chunks) == 2
+    assert chunks[0].source == "notes.txt"
+
+# ------------------------------------------------------------------------------
+# Test: BM25 finds exact keywords, embeddings find paraphrases, RRF keeps both.
+# ------------------------------------------------------------------------------
+def test_hybrid_search_fuses_keyword_and_embedding_rankings():
+    keyword_only = KnowledgeIndex(CHUNKS, EMBEDDINGS)
+    assert keyword_only.search("kubernetes experience", k=1) == [CHUNKS[0]]
+
+    index = KnowledgeIndex(CHUNKS, EMBEDDINGS, openai=FakeOpenAI(QUERY_VECTOR.tolist()))
+    assert index.search("container platforms", k=1, query_vector=QUERY_VECTOR) == [CHUNKS[1]]
+    assert set(index.search("kubernetes experience", k=2, query_vector=QUERY_VECTOR)) == {CHUNKS[0], CHUNKS[1]}
+
+
+def test_search_embeds_the_query_when_no_vector_is_given():
+    openai = FakeOpenAI(QUERY_VECTOR.tolist())
+    index = KnowledgeIndex(CHUNKS, EMBEDDINGS, openai=openai)
+    assert index.search("orchestration", k=1) == [CHUNKS[1]]
+    assert openai.inputs == ["orchestration"]
+    assert KnowledgeIndex([], np.zeros((0, 0), dtype=np.float32), openai).search("anything") == []
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import shutil
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from knowledge_snapshot import SnapshotWatcher, current_version, ensure_snapshot, load_snapshot
+
+ME_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "me")
+
+# ------------------------------------------------------------------------------
+# Fake OpenAI client: deterministic embeddings, remembers every embedded text.
+# ------------------------------------------------------------------------------
+class FakeOpenAI:
+    def __init__(self):
+        self.inputs = []
+        self.embeddings = SimpleNamespace(create=self.create)
+
+    def create(self, model, input):
+        self.inputs.extend(input)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=self.vector(text)) for text in input])
+
+    @staticmethod
+    def vector(text):
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [byte / 255 + 0.01 for byte in digest[:8]]
+
+
+@pytest.fixture
+def me_dir(tmp_path):
+    return shutil.copytree(ME_DIR, tmp_path / "me")
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    return str(tmp_path / "snapshot")
+
+# ------------------------------------------------------------------------------
+# Test: an unchanged me/ reuses the memory-mapped snapshot without re-embedding.
+# ------------------------------------------------------------------------------
+def test_unchanged_sources_reuse_snapshot(me_dir, snapshot_dir):
+    openai = FakeOpenAI()
+    built = ensure_snapshot(openai, str(me_dir), snapshot_dir)
+    assert len(openai.inputs) == len(built.chunks) > 0
+    assert current_version(snapshot_dir) == built.version
+
+    openai.inputs.clear()
+    # A new mtime alone is re-hashed, but the content hash keeps the version
+    os.utime(me_dir / "summary.txt")
+    reused = ensure_snapshot(openai, str(me_dir), snapshot_dir)
+    assert openai.inputs == []
+    assert reused.version == built.version
+    assert isinstance(reused.embeddings, np.memmap)
+    np.testing.assert_array_equal(reused.embeddings, built.embeddings)
+
+# ------------------------------------------------------------------------------
+# Test: an edited source changes the manifest and forces a rebuild, in which
+# only the edited source is extracted and embedded again.
+# ------------------------------------------------------------------------------
+def test_edited_source_rebuilds_snapshot(me_dir, snapshot_dir):
+    openai = FakeOpenAI()
+    built = ensure_snapshot(openai, str(me_dir), snapshot_dir)
+    changes = []
+    watcher = SnapshotWatcher(openai, changes.append, built, me_dir=str(me_dir), snapshot_dir=snapshot_dir)
+    openai.inputs.clear()
+    assert watcher.check() is False
+
+    with open(me_dir / "summary.txt", "a", encoding="utf-8") as f:
+        f.write("\nNow also speaks Japanese.")
+    assert watcher.check() is True
+    rebuilt = changes[0]
+    assert rebuilt.version != built.version
+    assert rebuilt.manifest["sources"]["summary.txt"]["sha256"] != built.manifest["sources"]["summary.txt"]["sha256"]
+    assert rebuilt.manifest["sources"]["resume.pdf"] == built.manifest["sources"]["resume.pdf"]
+    assert rebuilt.summary.endswith("Now also speaks Japanese.")
+    summary_chunks = [chunk.text for chunk in rebuilt.chunks if chunk.source == "summary.txt"]
+    assert openai.inputs == summary_chunks
+
+    # Reused embeddings stay with their chunks
+    for chunk, row in zip(rebuilt.chunks, rebuilt.embeddings):
+        expected = np.array(FakeOpenAI.vector(chunk.text), dtype=np.float32)
+        np.testing.assert_allclose(row, expected / np.linalg.norm(expected), rtol=1e-6)
+    assert current_version(snapshot_dir) == rebuilt.version
+    assert load_snapshot(snapshot_dir).version == rebuilt.version
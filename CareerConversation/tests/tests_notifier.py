@@ -0,0 +1,97 @@
+import threading
+import pytest
+import requests
+from types import SimpleNamespace
+import notifier
+from notifier import Notifier, coalesce
+
+# ------------------------------------------------------------------------------
+# Fake session: stands in for Pushover like loadtest.py's fake server, answering
+# each post with the next scripted status code or exception (200 when exhausted).
+# ------------------------------------------------------------------------------
+class FakeSession:
+    def __init__(self, answers=(), gate=None):
+        self.answers = list(answers)
+        self.gate = gate
+        self.posted = []
+        self.entered = threading.Event()
+
+    def post(self, url, data, timeout):
+        self.posted.append(data["message"])
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        answer = self.answers.pop(0) if self.answers else 200
+        if isinstance(answer, Exception):
+            raise answer
+        return SimpleNamespace(ok=answer < 400, status_code=answer)
+
+
+def make_notifier(session, **kwargs):
+    kwargs.setdefault("coalesce_window", 0)
+    kwargs.setdefault("backoff", 0)
+    sender = Notifier(url="http://pushover.test/1/messages.json", **kwargs)
+    sender.session = session
+    return sender
+
+# ------------------------------------------------------------------------------
+# Test: a full queue drops new notifications instead of blocking the caller.
+# ------------------------------------------------------------------------------
+def test_full_queue_drops_notifications():
+    gate = threading.Event()
+    session = FakeSession(gate=gate)
+    sender = make_notifier(session, queue_size=2)
+    assert sender.notify("first")
+    # The worker holds "first" while the post hangs, so the queue itself fills up
+    assert session.entered.wait(5)
+    assert sender.notify("second") and sender.notify("third")
+    assert not sender.notify("fourth")
+    assert sender.dropped == 1
+
+    gate.set()
+    sender.flush()
+    assert session.posted == ["first", "second", "third"]
+    assert sender.sent == 3
+
+# ------------------------------------------------------------------------------
+# Test: 5xx answers and request exceptions are retried with exponential backoff.
+# ------------------------------------------------------------------------------
+def test_server_errors_are_retried_with_backoff(monkeypatch):
+    delays = []
+    monkeypatch.setattr(notifier.time, "sleep", delays.append)
+    session = FakeSession([503, requests.ConnectionError("reset"), 200])
+    sender = make_notifier(session, backoff=0.5)
+    sender.notify("hello")
+    sender.flush()
+    assert session.posted == ["hello"] * 3
+    assert delays == [0.5, 1.0]
+    assert (sender.sent, sender.failed) == (1, 0)
+
+
+def test_retries_give_up_and_client_errors_fail_at_once():
+    session = FakeSession([500, 500, 500, 400])
+    sender = make_notifier(session, retries=3)
+    sender.notify("lost")
+    sender.flush()
+    assert len(session.posted) == 3
+    sender.notify("rejected")
+    sender.flush()
+    assert len(session.posted) == 4
+    assert (sender.sent, sender.failed) == (0, 2)
+
+# ------------------------------------------------------------------------------
+# Test: notifications within the window go out as one message, duplicates once.
+# ------------------------------------------------------------------------------
+def test_notifications_are_coalesced():
+    session = FakeSession()
+    sender = make_notifier(session, coalesce_window=0.2)
+    for text in ["Recording pizza", "Recording alex@example.com", "Recording pizza"]:
+        sender.notify(text)
+    sender.flush()
+    assert session.posted == ["Recording pizza\nRecording alex@example.com"]
+    assert sender.sent == 1
+
+
+def test_coalesce_splits_at_message_limit():
+    messages = coalesce(["a" * 6, "b" * 3, "c" * 20], limit=10)
+    assert messages == ["aaaaaa\nbbb", "c" * 10]
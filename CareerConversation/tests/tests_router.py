@@ -0,0 +1,53 @@
+import pytest
+from router import CACHE, KNOWLEDGE, TOOL, TRIVIAL, CascadeRouter, classify
+
+# ------------------------------------------------------------------------------
+# Test: local rules send small talk to the cheap tier, contact requests to the
+# tool-capable full model and everything else to the full model with retrieval.
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize("message, route", [
+    ("Hi!", TRIVIAL),
+    ("Good morning", TRIVIAL),
+    ("Thanks, that's all.", TRIVIAL),
+    ("how are you doing?", TRIVIAL),
+    ("What's your experience with DevOps?", KNOWLEDGE),
+    ("Tell me about your leadership style.", KNOWLEDGE),
+    ("yes", KNOWLEDGE),
+    # Small talk that carries a real question escalates to the full model
+    ("Hi, what did you do at Volkswagen?", KNOWLEDGE),
+    ("thanks thanks thanks thanks thanks thanks thanks thanks thanks", KNOWLEDGE),
+    ("", KNOWLEDGE),
+    # Anything that leads to record_user_details escalates to the tool route
+    ("Great, my email is visitor@example.com", TOOL),
+    ("Thanks! Please get in touch.", TOOL),
+    ("Can I hire you?", TOOL),
+])
+def test_classify(message, route):
+    assert classify(message) == route
+
+# ------------------------------------------------------------------------------
+# Test: the router counts routes and tracks the latency the cheap tier and the
+# answer cache saved against the running full-model latency.
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize("turns, full_latency, saved, cache_hits", [
+    ([(TRIVIAL, 0.2)], None, 0.0, 0),
+    ([(KNOWLEDGE, 2.0), (TRIVIAL, 0.5)], 2.0, 1.5, 0),
+    ([(KNOWLEDGE, 2.0), (TOOL, 4.0)], 2.2, 0.0, 0),
+    ([(KNOWLEDGE, 2.0), (CACHE, 0.1), (CACHE, 0.1)], 2.0, 3.8, 2),
+])
+def test_router_records_latency(turns, full_latency, saved, cache_hits):
+    router = CascadeRouter(smoothing=0.1)
+    for route, latency in turns:
+        router.record(route, "message", latency)
+    stats = router.stats()
+    assert stats["full_latency"] == pytest.approx(full_latency)
+    assert stats["latency_saved"] == pytest.approx(saved)
+    assert stats["cache_hits"] == cache_hits
+
+
+def test_router_counts_routes():
+    router = CascadeRouter()
+    assert [router.route(message) for message in ["Hi", "What do you do?", "email me"]] == [TRIVIAL, KNOWLEDGE, TOOL]
+    stats = router.stats()
+    assert (stats[TRIVIAL], stats[KNOWLEDGE], stats[TOOL]) == (1, 1, 1)
+    assert stats["trivial_ratio"] == pytest.approx(1 / 3)
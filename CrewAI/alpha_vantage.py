@@ -0,0 +1,348 @@
+"""
+This module implements a shared Alpha Vantage client that treats the API quota as the scarcest resource.
+- A token bucket persisted in SQLite keeps the per-minute (and, on the free tier, per-day) quota across
+  restarts and across processes sharing the same state file.
+- Identical requests that are in flight at the same time are coalesced into one API call.
+- Responses are cached on disk with a TTL per endpoint; the most recently used ones are also kept
+  decoded in a bounded in-memory LRU.
+- Endpoints that accept several symbols are used in batches. NEWS_SENTIMENT is not one of them:
+  a list of tickers there means articles that mention all of them.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+import requests
+
+ALPHA_VANTAGE_URL = os.getenv('ALPHA_VANTAGE_URL', 'https://www.alphavantage.co/query')
+STATE_PATH = os.getenv('ALPHA_VANTAGE_STATE', './alpha_vantage_state.db')
+TIMEOUT = 30
+RETRIES = 3
+
+# Requests per minute and per day for each subscription tier (None = unlimited)
+TIERS = {
+    'free': (5, 25),
+    'premium': (75, None),
+}
+
+# Seconds a response stays fresh, per endpoint
+ENDPOINT_TTLS = {
+    'TIME_SERIES_DAILY': 6 * 60 * 60,
+    'NEWS_SENTIMENT': 15 * 60,
+    'GLOBAL_QUOTE': 60,
+    'REALTIME_BULK_QUOTES': 60,
+    'OVERVIEW': 24 * 60 * 60,
+}
+DEFAULT_TTL = 60 * 60
+# Decoded responses kept in memory; a full daily history is a few MB once decoded
+MEMORY_CACHE_ENTRIES = int(os.getenv('ALPHA_VANTAGE_MEMORY_ENTRIES', '64'))
+
+# Alpha Vantage reports an exhausted quota as a Note/Information message containing one of these
+QUOTA_PHRASES = ('rate limit', 'call frequency', 'requests per')
+
+# Symbols per request for endpoints that accept a list
+BULK_QUOTES_BATCH = 100
+
+
+class AlphaVantageError(Exception):
+    """Raised when Alpha Vantage answers with an error, a quota note or an unexpected payload."""
+
+
+class TokenBucket:
+    """
+    Token buckets whose state lives in a SQLite file, so the quota used before a restart still counts.
+    Every bucket refills continuously at capacity / period tokens per second.
+    """
+
+    def __init__(self, path: str, limits: Dict[str, tuple]):
+        """
+        Args:
+            path (str): SQLite file holding the bucket state
+            limits (Dict[str, tuple]): Bucket name -> (capacity, period in seconds)
+        """
+        self.path = path
+        self.limits = limits
+        with closing(self._connect()) as db:
+            db.execute('CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _refill(self, db: sqlite3.Connection, now: float) -> Dict[str, float]:
+        tokens = {}
+        for name, (capacity, period) in self.limits.items():
+            row = db.execute('SELECT tokens, updated FROM buckets WHERE name = ?', (name,)).fetchone()
+            level = capacity if row is None else min(capacity, row[0] + (now - row[1]) * capacity / period)
+            tokens[name] = level
+        return tokens
+
+    def acquire(self, block: bool = True) -> bool:
+        """
+        Takes one token from every bucket, waiting until all of them have one.
+
+        Args:
+            block (bool): Wait for tokens instead of returning False
+
+        Returns:
+            bool: True once the tokens were taken, False if block is False and a bucket is empty
+        """
+        while True:
+            with closing(self._connect()) as db:
+                # An immediate transaction serializes processes that share the state file
+                db.execute('BEGIN IMMEDIATE')
+                try:
+                    now = time.time()
+                    tokens = self._refill(db, now)
+                    wait = max((1 - level) * self.limits[name][1] / self.limits[name][0] for name, level in tokens.items())
+                    if wait <= 0:
+                        for name, level in tokens.items():
+                            db.execute('INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)', (name, level - 1, now))
+                    db.execute('COMMIT')
+                except BaseException:
+                    db.execute('ROLLBACK')
+                    raise
+            if wait <= 0:
+                return True
+            if not block:
+                return False
+            time.sleep(min(wait, 60))
+
+    def drain(self) -> None:
+        """Empties every bucket, e.g. after the API reported that the quota is used up."""
+        with closing(self._connect()) as db:
+            now = time.time()
+            db.executemany('INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, 0, ?)', [(name, now) for name in self.limits])
+
+
+class AlphaVantageClient:
+    """
+    A thread-safe Alpha Vantage client shared by all agents and tools.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, url: str = ALPHA_VANTAGE_URL, tier: Optional[str] = None,
+                 state_path: str = STATE_PATH, memory_entries: int = MEMORY_CACHE_ENTRIES):
+        """
+        Args:
+            api_key (Optional[str]): The API key, ALPHA_VANTAGE_API_KEY by default
+            url (str): The API endpoint
+            tier (Optional[str]): 'free' or 'premium', ALPHA_VANTAGE_TIER by default
+            state_path (str): SQLite file for the token bucket and the response cache
+            memory_entries (int): Maximum number of decoded responses kept in memory
+        """
+        self.api_key = api_key or os.getenv('ALPHA_VANTAGE_API_KEY')
+        self.url = url
+        self.tier = tier or os.getenv('ALPHA_VANTAGE_TIER', 'free')
+        per_minute, per_day = TIERS[self.tier]
+        limits = {'minute': (per_minute, 60.0)}
+        if per_day:
+            limits['day'] = (per_day, 24 * 60 * 60.0)
+        self.state_path = state_path
+        self.bucket = TokenBucket(state_path, limits)
+        with closing(sqlite3.connect(state_path, timeout=30)) as db, db:
+            db.execute('CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, function TEXT NOT NULL, payload BLOB NOT NULL, fetched_at REAL NOT NULL)')
+        self.session = requests.Session()
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.stats = {'api_calls': 0, 'cache_hits': 0, 'coalesced': 0}
+
+    @staticmethod
+    def cache_key(function: str, params: Dict[str, Any]) -> str:
+        return function + '?' + '&'.join(f'{name}={params[name]}' for name in sorted(params))
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        # Least recently used responses leave memory first; the SQLite copy stays. Callers hold self._lock
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _from_memory(self, key: str, function: str) -> Optional[Dict[str, Any]]:
+        # Callers hold self._lock
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[1] <= ENDPOINT_TTLS.get(function, DEFAULT_TTL):
+            self._memory.move_to_end(key)
+            return entry[0]
+        del self._memory[key]
+        return None
+
+    def _cached(self, key: str, function: str) -> Optional[Dict[str, Any]]:
+        # Only the in-memory LRU is guarded by the lock; SQLite I/O runs outside it
+        with self._lock:
+            payload = self._from_memory(key, function)
+        if payload is not None:
+            return payload
+        with closing(sqlite3.connect(self.state_path, timeout=30)) as db:
+            row = db.execute('SELECT payload, fetched_at FROM responses WHERE key = ?', (key,)).fetchone()
+        if row is None or time.time() - row[1] > ENDPOINT_TTLS.get(function, DEFAULT_TTL):
+            return None
+        entry = (json.loads(zlib.decompress(row[0])), row[1])
+        with self._lock:
+            self._remember(key, entry)
+        return entry[0]
+
+    def _store(self, key: str, function: str, payload: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, (payload, now))
+        with closing(sqlite3.connect(self.state_path, timeout=30)) as db, db:
+            db.execute('INSERT OR REPLACE INTO responses (key, function, payload, fetched_at) VALUES (?, ?, ?, ?)',
+                       (key, function, zlib.compress(json.dumps(payload).encode('utf-8')), now))
+
+    def _fetch(self, function: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        for attempt in range(RETRIES):
+            self.bucket.acquire()
+            self._count('api_calls')
+            response = self.session.get(self.url, params={'function': function, **params, 'apikey': self.api_key}, timeout=TIMEOUT)
+            response.raise_for_status()
+            payload = response.json()
+            message = payload.get('Note') or payload.get('Information')
+            if message and len(payload) == 1:
+                if not any(phrase in message.lower() for phrase in QUOTA_PHRASES):
+                    raise AlphaVantageError(message)
+                # Quota exceeded despite the bucket (e.g. another application uses the same key)
+                print(f"Alpha Vantage quota message, attempt {attempt + 1}: {message}")
+                self.bucket.drain()
+                continue
+            if 'Error Message' in payload:
+                raise AlphaVantageError(payload['Error Message'])
+            return payload
+        raise AlphaVantageError(f'Quota exhausted after {RETRIES} attempts for {function}')
+
+    def query(self, function: str, **params: Any) -> Dict[str, Any]:
+        """
+        Calls an endpoint through the cache, request coalescing and the rate limiter.
+
+        Args:
+            function (str): The Alpha Vantage function, e.g. TIME_SERIES_DAILY
+            **params: The remaining query parameters (without apikey)
+
+        Returns:
+            Dict[str, Any]: The decoded JSON response
+        """
+        key = self.cache_key(function, params)
+        cached = self._cached(key, function)
+        if cached is None:
+            with self._lock:
+                # A leader may have stored the response since the lookup above
+                cached = self._from_memory(key, function)
+                if cached is None:
+                    future = self._inflight.get(key)
+                    leader = future is None
+                    if leader:
+                        future = self._inflight[key] = Future()
+                    else:
+                        self.stats['coalesced'] += 1
+        if cached is not None:
+            self._count('cache_hits')
+            return cached
+        if not leader:
+            # Someone else is already fetching exactly this; wait for their result
+            return future.result()
+        try:
+            payload = self._fetch(function, params)
+            self._store(key, function, payload)
+            future.set_result(payload)
+            return payload
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def daily(self, symbol: str, outputsize: str = 'compact') -> Dict[str, Any]:
+        """
+        Daily bars of a symbol. A fresh full history also answers a compact request.
+
+        Args:
+            symbol (str): The stock symbol
+            outputsize (str): 'compact' for the last 100 bars, 'full' for the whole history
+
+        Returns:
+            Dict[str, Any]: The TIME_SERIES_DAILY response
+        """
+        symbol = symbol.upper()
+        if outputsize == 'compact':
+            full = self._cached(self.cache_key('TIME_SERIES_DAILY', {'symbol': symbol, 'outputsize': 'full'}), 'TIME_SERIES_DAILY')
+            if full is not None:
+                self._count('cache_hits')
+                return full
+        return self.query('TIME_SERIES_DAILY', symbol=symbol, outputsize=outputsize)
+
+    def quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Latest quotes for many symbols: batches of 100 via REALTIME_BULK_QUOTES on premium,
+        one GLOBAL_QUOTE per symbol on the free tier.
+
+        Args:
+            symbols (List[str]): The stock symbols
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The quote per symbol
+        """
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        quotes = {}
+        if self.tier == 'premium':
+            for i in range(0, len(symbols), BULK_QUOTES_BATCH):
+                batch = ','.join(sorted(symbols[i:i + BULK_QUOTES_BATCH]))
+                for quote in self.query('REALTIME_BULK_QUOTES', symbol=batch).get('data', []):
+                    quotes[quote['symbol']] = quote
+        else:
+            for symbol in symbols:
+                quotes[symbol] = self.query('GLOBAL_QUOTE', symbol=symbol).get('Global Quote', {})
+        return quotes
+
+    def news(self, symbols: List[str], time_from: Optional[str] = None, time_to: Optional[str] = None,
+             limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        News articles mentioning any of the symbols, newest first per symbol. NEWS_SENTIMENT returns
+        only articles mentioning every listed ticker, so each symbol is requested on its own.
+
+        Args:
+            symbols (List[str]): The stock symbols
+            time_from (Optional[str]): Only articles published at or after this time (YYYYMMDDTHHMM, UTC)
+            time_to (Optional[str]): Only articles published at or before this time (YYYYMMDDTHHMM, UTC)
+            limit (int): Maximum number of articles per request
+
+        Returns:
+            List[Dict[str, Any]]: The articles of all symbols, each article once
+        """
+        articles = {}
+        for symbol in dict.fromkeys(symbol.upper() for symbol in symbols):
+            params = {'tickers': symbol, 'limit': limit, 'sort': 'LATEST'}
+            if time_from:
+                params['time_from'] = time_from
+            if time_to:
+                params['time_to'] = time_to
+            for article in self.query('NEWS_SENTIMENT', **params).get('feed', []):
+                articles.setdefault(article.get('url') or id(article), article)
+        return list(articles.values())
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> AlphaVantageClient:
+    """Returns the process-wide client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AlphaVantageClient()
+        return _client
@@ -0,0 +1,227 @@
+"""
+This module implements a local stand-in for the Alpha Vantage API.
+It serves deterministic synthetic data in Alpha Vantage's response format, so the price store
+and the tools can be exercised in tests and benchmarks without an API key or quota.
+
+Usage:
+    with StubAlphaVantage() as stub:
+        store = PriceStore(root, fetcher=stub.fetch_daily)
+        client = stub.client(state_path)
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import requests
+
+from alpha_vantage import AlphaVantageClient
+from price_store import COMPACT_BARS, parse_daily
+
+
+def synthetic_bars(symbol: str, start: str = '2015-01-01', end: Optional[str] = None) -> Dict[str, Dict[str, str]]:
+    """
+    Generates a reproducible random walk of business-day bars for a symbol.
+
+    Args:
+        symbol (str): The stock symbol; it seeds the random generator
+        start (str): First date (YYYY-MM-DD)
+        end (Optional[str]): Last date (YYYY-MM-DD), today if None
+
+    Returns:
+        Dict[str, Dict[str, str]]: Bars keyed by date, in the shape of 'Time Series (Daily)'
+    """
+    seed = int.from_bytes(hashlib.sha256(symbol.upper().encode('utf-8')).digest()[:8], 'big')
+    rng = np.random.default_rng(seed)
+    end = np.datetime64(end or 'today', 'D')
+    days = np.arange(np.datetime64(start, 'D'), end + 1, dtype='datetime64[D]')
+    days = days[np.is_busday(days)]
+    close = 20 + 180 * rng.random() * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(days))))
+    open_ = close * (1 + rng.normal(0, 0.005, len(days)))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, len(days))))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, len(days))))
+    volume = rng.integers(100_000, 10_000_000, len(days))
+    return {
+        str(day): {'1. open': f'{o:.4f}', '2. high': f'{h:.4f}', '3. low': f'{l:.4f}', '4. close': f'{c:.4f}', '5. volume': str(v)}
+        for day, o, h, l, c, v in zip(days, open_, high, low, close, volume)
+    }
+
+
+HEADLINES = [
+    ('{ticker} beats earnings expectations as revenue surges', 'Quarterly profit exceeded analyst estimates and the company raised its full-year guidance on strong demand.'),
+    ('{ticker} shares fall after analyst downgrade', 'A major broker downgraded the stock to underperform, citing weaker margins and concerns about slowing growth.'),
+    ('{ticker} announces partnership to expand cloud business', 'The company said the partnership would boost its expansion into new markets over the next two years.'),
+    ('Regulators open probe into {ticker} accounting practices', 'The investigation concerns revenue recognition; the company said it would cooperate and sees no material risk.'),
+    ('{ticker} unveils buyback and higher dividend', 'The board approved a new share buyback program and a dividend increase, signalling confidence in cash flow.'),
+    ('{ticker} recalls products over safety concerns', 'The recall affects several product lines and may delay shipments, the company warned in a statement.'),
+]
+SOURCES = ['Reuters', 'Benzinga', 'Motley Fool', 'Zacks', 'MarketWatch', 'Yahoo Finance']
+
+
+def synthetic_news(ticker: str, days: int = 10) -> List[Dict[str, Any]]:
+    """
+    Generates reproducible news for a ticker: a few stories per day, most of them syndicated by
+    several sources with slightly different wording.
+
+    Args:
+        ticker (str): The stock symbol; it seeds the random generator
+        days (int): Number of days of news, ending now
+
+    Returns:
+        List[Dict[str, Any]]: Articles in the shape of NEWS_SENTIMENT's 'feed'
+    """
+    seed = int.from_bytes(hashlib.sha256(f'news:{ticker}'.encode('utf-8')).digest()[:8], 'big')
+    rng = np.random.default_rng(seed)
+    now = int(time.time()) // 3600 * 3600
+    articles = []
+    for story in range(days * 2):
+        published = now - int(rng.integers(0, days * 24 * 3600))
+        title, summary = HEADLINES[int(rng.integers(len(HEADLINES)))]
+        title, summary = title.format(ticker=ticker), f'{ticker}: {summary}'
+        for copy in range(int(rng.integers(1, 4))):
+            # Syndicated copies: another source, a few minutes later, slightly different wording
+            suffix = '' if copy == 0 else f' - {SOURCES[copy % len(SOURCES)]} reports'
+            articles.append({
+                'title': title + suffix,
+                'url': f'https://news.example.com/{ticker.lower()}/{story}/{copy}',
+                'time_published': time.strftime('%Y%m%dT%H%M%S', time.gmtime(published + copy * 300)),
+                'summary': summary,
+                'source': SOURCES[(story + copy) % len(SOURCES)],
+                'ticker_sentiment': [{'ticker': ticker, 'relevance_score': f'{rng.uniform(0.3, 1.0):.6f}'}],
+            })
+    return articles
+
+
+class StubAlphaVantage:
+    """
+    A threaded HTTP server answering Alpha Vantage queries on localhost.
+    Symbols starting with 'INVALID' get Alpha Vantage's error response.
+    """
+
+    def __init__(self, start: str = '2015-01-01', end: Optional[str] = None, per_minute: Optional[int] = None, latency: float = 0.0):
+        """
+        Args:
+            start (str): First date of the synthetic history
+            end (Optional[str]): Last date of the synthetic history, today if None
+            per_minute (Optional[int]): Answer with Alpha Vantage's quota note above this many requests per minute
+            latency (float): Seconds to wait before answering, to make concurrent requests overlap
+        """
+        self.start_date = start
+        self.end_date = end
+        self.per_minute = per_minute
+        self.latency = latency
+        self._recent = deque()
+        # Requests served, per function and output size
+        self.requests = Counter()
+        self._bars = {}
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                payload = stub.respond(params)
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/query'
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def bars(self, symbol: str) -> Dict[str, Dict[str, str]]:
+        """Returns (and memoizes) the full synthetic history of a symbol."""
+        with self._lock:
+            if symbol not in self._bars:
+                self._bars[symbol] = synthetic_bars(symbol, self.start_date, self.end_date)
+            return self._bars[symbol]
+
+    def respond(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Builds the JSON response for a query.
+
+        Args:
+            params (Dict[str, str]): The query parameters
+
+        Returns:
+            Dict[str, Any]: The response in Alpha Vantage's format
+        """
+        function = params.get('function')
+        self.requests[(function, params.get('outputsize'))] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.per_minute is not None:
+            with self._lock:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] > 60:
+                    self._recent.popleft()
+                if len(self._recent) >= self.per_minute:
+                    return {'Note': 'Thank you for using Alpha Vantage! Our standard API rate limit is 5 requests per minute.'}
+                self._recent.append(now)
+        if function == 'NEWS_SENTIMENT':
+            return self.news(params)
+        symbol = params.get('symbol', '').upper()
+        if function != 'TIME_SERIES_DAILY' or not symbol or symbol.startswith('INVALID'):
+            return {'Error Message': 'Invalid API call. Please retry or visit the documentation for TIME_SERIES_DAILY.'}
+        bars = self.bars(symbol)
+        days = sorted(bars)
+        if params.get('outputsize', 'compact') == 'compact':
+            days = days[-COMPACT_BARS:]
+        return {
+            'Meta Data': {'1. Information': 'Daily Prices (open, high, low, close) and Volumes', '2. Symbol': symbol},
+            'Time Series (Daily)': {day: bars[day] for day in reversed(days)},
+        }
+
+    def news(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Answers NEWS_SENTIMENT, honouring time_from, time_to, sort and limit. Like the real API, a list of
+        tickers selects the articles that mention all of them.
+        """
+        tickers = [ticker for ticker in params.get('tickers', '').upper().split(',') if ticker]
+        feed = [article for article in synthetic_news(tickers[0])
+                if all(any(item['ticker'] == ticker for item in article['ticker_sentiment']) for ticker in tickers[1:])] if tickers else []
+        if params.get('time_from'):
+            feed = [article for article in feed if article['time_published'][:13] >= params['time_from']]
+        if params.get('time_to'):
+            feed = [article for article in feed if article['time_published'][:13] <= params['time_to']]
+        feed.sort(key=lambda article: article['time_published'], reverse=params.get('sort', 'LATEST') != 'EARLIEST')
+        feed = feed[:int(params.get('limit', 50))]
+        return {'items': str(len(feed)), 'feed': feed}
+
+    def fetch_daily(self, symbol: str, outputsize: str = 'compact') -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """A drop-in replacement for price_store.fetch_daily that queries this server."""
+        params = {'function': 'TIME_SERIES_DAILY', 'symbol': symbol, 'outputsize': outputsize, 'apikey': 'stub'}
+        response = requests.get(self.url, params=params, timeout=10)
+        response.raise_for_status()
+        return parse_daily(response.json())
+
+    def client(self, state_path: str, tier: str = 'premium') -> AlphaVantageClient:
+        """Returns an AlphaVantageClient talking to this server, with its state in state_path."""
+        return AlphaVantageClient(api_key='stub', url=self.url, tier=tier, state_path=state_path)
+
+    def start(self) -> 'StubAlphaVantage':
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'StubAlphaVantage':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,296 @@
+"""
+This module implements a vectorized backtester over the local price store.
+Dated signals per symbol become a (bars x symbols) matrix of target positions, and positions, PnL,
+transaction costs, drawdowns, Sharpe ratios and turnover are computed for the whole universe at
+once with NumPy, so thousands of symbols take seconds.
+
+Signals are target positions from -1 (fully short) to 1 (fully long). A signal dated on day t is
+executed at the close of the first trading day on or after t, so it earns returns from the next bar
+on and never sees the price it was decided on. The portfolio gives every symbol an equal share of
+the capital.
+
+Usage:
+    python backtest.py --decisions analysis_results.jsonl --cost-bps 10
+    python backtest.py --strategy sma_crossover --start 2020-01-01
+"""
+
+import argparse
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from indicators import sma
+from price_store import PriceStore
+
+BARS_PER_YEAR = 252
+# Commission plus half spread per unit of traded notional, in basis points
+DEFAULT_COST_BPS = 10.0
+
+# Words in a crew's final answer that map to a target position
+DECISION_WORDS = {
+    'strong buy': 1.0, 'buy': 1.0, 'accumulate': 1.0, 'overweight': 1.0,
+    'hold': 0.0, 'neutral': 0.0,
+    'strong sell': -1.0, 'sell': -1.0, 'reduce': -1.0, 'underweight': -1.0,
+}
+_WORDS = '|'.join(sorted(DECISION_WORDS, key=len, reverse=True))
+DECISION = re.compile(rf'\b({_WORDS})\b', re.IGNORECASE)
+# An explicit "Recommendation: Buy" takes precedence over words mentioned elsewhere in the text
+LABELLED_DECISION = re.compile(rf'\b(?:recommendation|decision|action|rating)\W+(?:\w+\W+){{0,3}}?({_WORDS})\b', re.IGNORECASE)
+
+
+@dataclass
+class BacktestResult:
+    """Per-bar positions and returns of every symbol, plus the equally weighted portfolio."""
+    dates: np.ndarray
+    symbols: List[str]
+    positions: np.ndarray
+    returns: np.ndarray
+    turnover: np.ndarray
+    portfolio: np.ndarray
+
+    def summary(self) -> Dict[str, float]:
+        """Statistics of the portfolio."""
+        count = max(1, len(self.symbols))
+        stats = performance(self.portfolio[:, None], self.turnover.sum(axis=1, keepdims=True) / count,
+                            np.abs(self.positions).sum(axis=1, keepdims=True) / count)
+        return {name: round(float(values[0]), 4) for name, values in stats.items()}
+
+    def per_symbol(self) -> Dict[str, Dict[str, float]]:
+        """Statistics of every symbol traded on its own."""
+        stats = performance(self.returns, self.turnover, np.abs(self.positions))
+        return {symbol: {name: round(float(values[column]), 4) for name, values in stats.items()}
+                for column, symbol in enumerate(self.symbols)}
+
+
+def performance(returns: np.ndarray, turnover: np.ndarray, exposure: np.ndarray, bars_per_year: int = BARS_PER_YEAR) -> Dict[str, np.ndarray]:
+    """
+    Computes performance statistics column by column.
+
+    Args:
+        returns (np.ndarray): (bars x columns) net returns per bar
+        turnover (np.ndarray): (bars x columns) traded notional per bar, as a fraction of capital
+        exposure (np.ndarray): (bars x columns) gross position per bar, as a fraction of capital
+        bars_per_year (int): Bars per year, for annualizing
+
+    Returns:
+        Dict[str, np.ndarray]: One value per column for every statistic
+    """
+    bars = max(1, len(returns))
+    equity = np.cumprod(1 + returns, axis=0)
+    final = equity[-1] if len(equity) else np.ones(returns.shape[1])
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=0)
+    volatility = returns.std(axis=0) * np.sqrt(bars_per_year)
+    mean = returns.mean(axis=0) * bars_per_year if len(returns) else np.zeros(returns.shape[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(volatility > 0, mean / volatility, 0.0)
+    return {
+        'total_return': final - 1,
+        'annual_return': np.maximum(final, 0) ** (bars_per_year / bars) - 1,
+        'volatility': volatility,
+        'sharpe': sharpe,
+        'max_drawdown': (equity / peak - 1).min(axis=0) if len(equity) else np.zeros(returns.shape[1]),
+        'turnover': turnover.sum(axis=0) * bars_per_year / bars,
+        'exposure': exposure.mean(axis=0) if len(exposure) else np.zeros(returns.shape[1]),
+    }
+
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """Replaces every NaN with the last valid value above it in the same column."""
+    rows = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return values[rows, np.arange(values.shape[1])]
+
+
+def align_signals(dates: np.ndarray, symbols: List[str], signals: Dict[str, Iterable[Tuple[str, float]]],
+                  hold_bars: Optional[int] = None) -> np.ndarray:
+    """
+    Turns dated signals into a (dates x symbols) matrix of target positions. Every signal holds until
+    the next one for the same symbol, or for at most hold_bars bars.
+
+    Args:
+        dates (np.ndarray): The trading calendar (datetime64[D])
+        symbols (List[str]): The stock symbols, one column each
+        signals (Dict[str, Iterable[Tuple[str, float]]]): Symbol -> (YYYY-MM-DD, target position) pairs
+        hold_bars (Optional[int]): Close a position this many bars after its signal; None holds it
+
+    Returns:
+        np.ndarray: Target positions, 0 before a symbol's first signal
+    """
+    targets = np.full((len(dates), len(symbols)), np.nan)
+    for column, symbol in enumerate(symbols):
+        pairs = sorted(signals.get(symbol, ()))
+        if not pairs:
+            continue
+        days = np.array([day[:10] for day, _ in pairs], dtype='datetime64[D]')
+        rows = np.searchsorted(dates, days)
+        keep = rows < len(dates)
+        # Several signals on the same bar: the last one counts
+        targets[rows[keep], column] = np.array([value for _, value in pairs], dtype=np.float64)[keep]
+    signalled = ~np.isnan(targets)
+    targets = forward_fill(targets)
+    if hold_bars is not None:
+        last = np.where(signalled, np.arange(len(dates))[:, None], 0)
+        np.maximum.accumulate(last, axis=0, out=last)
+        targets[np.arange(len(dates))[:, None] - last >= hold_bars] = 0.0
+    return np.clip(np.nan_to_num(targets), -1.0, 1.0)
+
+
+def run_backtest(dates: np.ndarray, symbols: List[str], close: np.ndarray, targets: np.ndarray,
+                 cost_bps: float = DEFAULT_COST_BPS) -> BacktestResult:
+    """
+    Backtests target positions against closing prices.
+
+    Args:
+        dates (np.ndarray): The trading calendar
+        symbols (List[str]): The stock symbols, one column each
+        close (np.ndarray): (dates x symbols) closes, NaN where a symbol has no bar
+        targets (np.ndarray): (dates x symbols) target positions decided at each close
+        cost_bps (float): Cost per unit of traded notional, in basis points
+
+    Returns:
+        BacktestResult: Positions, net returns and turnover per symbol and bar
+    """
+    prices = forward_fill(close)
+    returns = np.zeros_like(prices)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = prices[1:] / prices[:-1] - 1
+    returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+    # A position is only opened once the symbol has a price to trade at
+    listed = ~np.isnan(prices)
+    positions = np.zeros_like(prices)
+    positions[1:] = np.where(listed[:-1], targets[:-1], 0.0)
+    turnover = np.abs(np.diff(positions, axis=0, prepend=0.0))
+    net = positions * returns - turnover * cost_bps / 10_000
+    return BacktestResult(dates=dates, symbols=list(symbols), positions=positions, returns=net,
+                          turnover=turnover, portfolio=net.mean(axis=1) if len(symbols) else np.zeros(len(dates)))
+
+
+def backtest_signals(signals: Dict[str, Iterable[Tuple[str, float]]], store: Optional[PriceStore] = None,
+                     start: Optional[str] = None, end: Optional[str] = None, cost_bps: float = DEFAULT_COST_BPS,
+                     hold_bars: Optional[int] = None) -> BacktestResult:
+    """
+    Backtests dated signals against the closes in the price store.
+
+    Args:
+        signals (Dict[str, Iterable[Tuple[str, float]]]): Symbol -> (YYYY-MM-DD, target position) pairs
+        store (Optional[PriceStore]): The price store, the default one if None
+        start (Optional[str]): First date (YYYY-MM-DD), the first signal if None
+        end (Optional[str]): Last date (YYYY-MM-DD)
+        cost_bps (float): Cost per unit of traded notional, in basis points
+        hold_bars (Optional[int]): Close a position this many bars after its signal; None holds it
+
+    Returns:
+        BacktestResult: The backtest of all symbols with stored prices
+    """
+    store = store or PriceStore()
+    signals = {symbol.upper(): list(pairs) for symbol, pairs in signals.items()}
+    symbols = [symbol for symbol in sorted(signals) if signals[symbol] and store.read(symbol) is not None]
+    if start is None and symbols:
+        start = min(day[:10] for symbol in symbols for day, _ in signals[symbol])
+    dates, close = store.matrix(symbols, 'close', start, end)
+    return run_backtest(dates, symbols, close, align_signals(dates, symbols, signals, hold_bars), cost_bps)
+
+
+def parse_decision(text: str) -> Optional[float]:
+    """
+    Reads the target position from a crew's final answer.
+
+    Args:
+        text (str): The Trading Strategist's recommendation
+
+    Returns:
+        Optional[float]: 1 for buy, 0 for hold, -1 for sell, None if no decision was found
+    """
+    found = LABELLED_DECISION.findall(text or '') or DECISION.findall(text or '')
+    return DECISION_WORDS[found[-1].lower()] if found else None
+
+
+def load_decisions(paths: Iterable[str]) -> Dict[str, List[Tuple[str, float]]]:
+    """
+    Reads stored crew results (run_batch's JSON lines files) as dated signals.
+
+    Args:
+        paths (Iterable[str]): JSON lines files with symbol, analysis_date and result per line
+
+    Returns:
+        Dict[str, List[Tuple[str, float]]]: Symbol -> (YYYY-MM-DD, target position) pairs
+    """
+    signals = {}
+    skipped = 0
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                position = parse_decision(str(record.get('result', '')))
+                if position is None:
+                    skipped += 1
+                    continue
+                signals.setdefault(record['symbol'].upper(), []).append((record['analysis_date'][:10], position))
+    if skipped:
+        print(f"Skipped {skipped} results without a recognizable decision")
+    return signals
+
+
+def replay_decisions(paths: Iterable[str], store: Optional[PriceStore] = None, **kwargs) -> BacktestResult:
+    """
+    Backtests the decisions the crew stored in run_batch output files.
+
+    Args:
+        paths (Iterable[str]): JSON lines files written by StockAnalysisCrew.run_batch
+        store (Optional[PriceStore]): The price store, the default one if None
+        **kwargs: Passed on to backtest_signals
+
+    Returns:
+        BacktestResult: The backtest of the replayed decisions
+    """
+    return backtest_signals(load_decisions(paths), store, **kwargs)
+
+
+def sma_crossover_targets(close: np.ndarray, fast: int = 50, slow: int = 200) -> np.ndarray:
+    """A baseline strategy: long while the fast SMA is above the slow one, flat otherwise."""
+    return np.nan_to_num((sma(close, fast) > sma(close, slow)).astype(np.float64))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest crew decisions or a baseline strategy over the price store')
+    parser.add_argument('--decisions', nargs='*', help='run_batch output files to replay')
+    parser.add_argument('--strategy', choices=['sma_crossover'], help='baseline strategy over the stored symbols')
+    parser.add_argument('--symbols', nargs='*', help='symbols for --strategy, all stored symbols by default')
+    parser.add_argument('--start')
+    parser.add_argument('--end')
+    parser.add_argument('--cost-bps', type=float, default=DEFAULT_COST_BPS)
+    parser.add_argument('--hold-bars', type=int, help='close replayed positions after this many bars')
+    parser.add_argument('--top', type=int, default=10, help='best and worst symbols to print')
+    args = parser.parse_args()
+    if not args.decisions and not args.strategy:
+        parser.error('give --decisions or --strategy')
+
+    started = time.perf_counter()
+    store = PriceStore()
+    if args.decisions:
+        result = replay_decisions(args.decisions, store, start=args.start, end=args.end,
+                                  cost_bps=args.cost_bps, hold_bars=args.hold_bars)
+    else:
+        symbols = [symbol.upper() for symbol in args.symbols] if args.symbols else store.symbols()
+        dates, close = store.matrix(symbols, 'close', args.start, args.end)
+        result = run_backtest(dates, symbols, close, sma_crossover_targets(close), args.cost_bps)
+    elapsed = time.perf_counter() - started
+
+    print(f"{len(result.symbols)} symbols x {len(result.dates)} bars in {elapsed:.2f}s")
+    print(json.dumps(result.summary(), indent=2))
+    ranked = sorted(result.per_symbol().items(), key=lambda item: item[1]['sharpe'], reverse=True)
+    for label, items in (('Best', ranked[:args.top]), ('Worst', ranked[::-1][:args.top])):
+        print(f"{label} by Sharpe:")
+        for symbol, stats in items:
+            print(f"  {symbol:<8} sharpe {stats['sharpe']:>7.2f}  return {stats['total_return']:>8.2%}  "
+                  f"drawdown {stats['max_drawdown']:>8.2%}  turnover {stats['turnover']:>6.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,14 +9,64 @@ from textwrap import dedent
 from langchain.tools import tool
 from datetime import datetime, timedelta
 import pandas as pd
-from typing import List, Dict, Any
+import numpy as np
+from typing import List, Dict, Any, Optional
 import os
+import asyncio
+import json
+import requests
 from dotenv import load_dotenv
+from price_store import PriceStore, AlphaVantageError, price_summary
+from indicators import compute_indicators, latest_signals
+from news_pipeline import NewsPipeline
+from screen import SCREEN_TOP_K, screen
 
 # Load environment variables from .env file
 # This is where we store sensitive information like API keys
 load_dotenv()
 
+# Local columnar price history shared by all tools; only missing bars are downloaded
+price_store = PriceStore()
+# Deduplicated news per symbol; only articles newer than the last ingest are downloaded
+news_pipeline = NewsPipeline()
+
+# Global budget of LLM requests per minute, shared by all crews of a batch run
+LLM_REQUESTS_PER_MINUTE = int(os.getenv('LLM_REQUESTS_PER_MINUTE', '60'))
+# Calendar days of history prefetched for batch runs (enough for the 200-day SMA)
+PREFETCH_DAYS = 450
+
+
+def read_completed(output_path: str) -> set:
+    """
+    Reads the symbols already analyzed from a batch run's JSON lines file. A run killed while
+    writing leaves a partial last line; it is cut off so the next result starts on a fresh line.
+    Other lines that cannot be decoded are skipped.
+    
+    Args:
+        output_path (str): JSON lines file written by run_batch_async
+        
+    Returns:
+        set: The symbols that have a result in the file
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            complete = data.rfind(b'\n') + 1
+            print(f"Removing partial last line from {output_path}")
+            f.truncate(complete)
+            data = data[:complete]
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            done.add(json.loads(line)['symbol'])
+        except (ValueError, KeyError, TypeError):
+            print(f"Skipping unreadable line in {output_path}: {line[:80]!r}")
+    return done
+
 class StockAnalysisCrew:
     """
     A class that orchestrates a team of AI agents to analyze stocks and make trading decisions.
@@ -36,6 +86,20 @@ class StockAnalysisCrew:
         if not self.alpha_vantage_api_key or not self.openai_api_key:
             raise ValueError("Missing required API keys. Please check your .env file.")
 
+        # Agents are defined once and reused for every symbol
+        self._agents = None
+
+    def get_agents(self) -> List[Agent]:
+        """
+        Returns the crew's agents, creating them on first use.
+
+        Returns:
+            List[Agent]: The Data Analyst, Market Researcher and Trading Strategist agents
+        """
+        if self._agents is None:
+            self._agents = self.create_agents()
+        return self._agents
+
     def create_agents(self) -> List[Agent]:
         """
         Creates and returns a list of specialized AI agents, each with a specific role in the analysis process.
@@ -87,17 +151,24 @@ class StockAnalysisCrew:
 
         return [data_analyst, market_researcher, trading_strategist]
 
-    def create_tasks(self, agents: List[Agent], symbol: str) -> List[Task]:
+    def create_tasks(self, agents: List[Agent], symbol: str, context: Optional[Dict[str, Any]] = None) -> List[Task]:
         """
         Creates a sequence of tasks for the agents to perform in order to analyze a stock.
         
         Args:
             agents (List[Agent]): The list of agents that will perform the tasks
             symbol (str): The stock symbol to analyze
+            context (Optional[Dict[str, Any]]): Prefetched price summary, news digest and technical indicators;
+                when given they are put into the task descriptions, which saves the agents their tool calls
             
         Returns:
             List[Task]: A list of tasks to be performed by the agents
         """
+        context = context or {}
+        prices = f"\nPrefetched price data (no need to fetch it again):\n{json.dumps(context['prices'])}" if context.get('prices') else ''
+        news = f"\nPrefetched news digest (no need to fetch it again):\n{json.dumps(context['news'])}" if context.get('news') else ''
+        technical = f"\nPrefetched technical indicators (no need to compute them again):\n{json.dumps(context['technical'])}" if context.get('technical') else ''
+
         # Task 1: Gather and analyze stock data
         data_analysis_task = Task(
             description=dedent(f"""
@@ -106,7 +177,7 @@ class StockAnalysisCrew:
                 2. Calculate key metrics
                 3. Identify trends and patterns
                 4. Prepare a comprehensive data analysis report
-            """),
+            """) + prices,
             agent=agents[0]  # Data Analyst agent
         )
 
@@ -118,7 +189,7 @@ class StockAnalysisCrew:
                 2. Analyze market sentiment
                 3. Identify relevant market trends
                 4. Prepare a market research report
-            """),
+            """) + news,
             agent=agents[1]  # Market Researcher agent
         )
 
@@ -130,37 +201,49 @@ class StockAnalysisCrew:
                 2. Consider technical indicators
                 3. Evaluate risk factors
                 4. Make a final trading recommendation
-            """),
+            """) + technical,
             agent=agents[2]  # Trading Strategist agent
         )
 
         return [data_analysis_task, market_research_task, trading_decision_task]
 
-    def run_analysis(self, symbol: str) -> Dict[str, Any]:
+    def build_crew(self, symbol: str, context: Optional[Dict[str, Any]] = None, max_rpm: Optional[int] = None, verbose: int = 2) -> Crew:
         """
-        Runs the complete stock analysis process using the crew of agents.
+        Builds the crew for one symbol from the shared agent definitions.
         
         Args:
             symbol (str): The stock symbol to analyze
+            context (Optional[Dict[str, Any]]): Prefetched data for the tasks, see create_tasks
+            max_rpm (Optional[int]): Maximum LLM requests per minute for this crew
+            verbose (int): CrewAI verbosity level
             
         Returns:
-            Dict[str, Any]: A dictionary containing the analysis results and trading decision
+            Crew: A crew ready to be kicked off
         """
-        # Create the team of agents
-        agents = self.create_agents()
-        
-        # Create the sequence of tasks
-        tasks = self.create_tasks(agents, symbol)
-        
-        # Create and run the crew
-        crew = Crew(
+        # Crews running concurrently each get their own copies, since agents keep per-task execution state
+        agents = [agent.copy() for agent in self.get_agents()]
+        tasks = self.create_tasks(agents, symbol, context)
+        return Crew(
             agents=agents,
             tasks=tasks,
-            verbose=2,  # Show detailed progress
-            process=Process.sequential  # Tasks are performed in sequence
+            verbose=verbose,
+            process=Process.sequential,  # Tasks are performed in sequence
+            max_rpm=max_rpm
         )
+
+    def run_analysis(self, symbol: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Runs the complete stock analysis process using the crew of agents.
         
-        # Execute the analysis and get results
+        Args:
+            symbol (str): The stock symbol to analyze
+            context (Optional[Dict[str, Any]]): Prefetched data for the tasks, see create_tasks
+            
+        Returns:
+            Dict[str, Any]: A dictionary containing the analysis results and trading decision
+        """
+        # Create the crew from the shared agents and execute the analysis
+        crew = self.build_crew(symbol, context)
         result = crew.kickoff()
         
         return {
@@ -169,30 +252,169 @@ class StockAnalysisCrew:
             'result': result
         }
 
+    def prefetch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Syncs prices and news and computes technical indicators for many symbols in bulk, so the crews
+        do not each fetch and compute them through tool calls.
+        
+        Args:
+            symbols (List[str]): The stock symbols
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: Price summary, news digest and technical indicators per symbol
+        """
+        price_store.sync_many(symbols)
+        context = {symbol: {} for symbol in symbols}
+        try:
+            # One news request per ticker, only for articles newer than its watermark
+            news_pipeline.ingest(symbols)
+        except (AlphaVantageError, requests.RequestException) as e:
+            print(f"Using stored news, ingest failed: {e}")
+        for symbol in symbols:
+            digest = news_pipeline.digest(symbol)
+            if digest['articles']:
+                context[symbol]['news'] = digest
+        start = (datetime.now() - timedelta(days=PREFETCH_DAYS)).date().isoformat()
+        stored = [symbol for symbol in symbols if price_store.read(symbol) is not None]
+        if not stored:
+            return context
+
+        # One vectorized indicator pass over the whole watchlist
+        dates, bars = price_store.matrices(stored, ('high', 'low', 'close', 'volume'), start)
+        close = bars['close']
+        indicators = compute_indicators(bars['high'], bars['low'], close, bars['volume'])
+        for column, symbol in enumerate(stored):
+            valid = np.flatnonzero(~np.isnan(close[:, column]))
+            if len(valid) == 0:
+                continue
+            row = int(valid[-1])
+            context[symbol].update({
+                'prices': price_summary(price_store.read(symbol)),
+                'technical': {'symbol': symbol, 'date': str(dates[row]), **latest_signals(indicators, close, column, row)},
+            })
+        return context
+
+    async def run_batch_async(self, symbols: List[str], output_path: str = 'analysis_results.jsonl',
+                              concurrency: int = 4, requests_per_minute: int = LLM_REQUESTS_PER_MINUTE) -> List[Dict[str, Any]]:
+        """
+        Analyzes a whole watchlist with several crews running concurrently. Results are appended to
+        output_path as each symbol completes, and symbols already in that file are skipped, so an
+        interrupted run can be resumed.
+        
+        Args:
+            symbols (List[str]): The stock symbols to analyze
+            output_path (str): JSON lines file receiving one result per symbol
+            concurrency (int): Maximum number of crews running at the same time, at most requests_per_minute
+            requests_per_minute (int): Global LLM request budget, split evenly across the concurrent crews
+                as a per-crew max_rpm cap of at least 1
+            
+        Returns:
+            List[Dict[str, Any]]: The results of this run, in completion order
+        """
+        done = read_completed(output_path)
+        pending = [symbol for symbol in dict.fromkeys(symbols) if symbol not in done]
+        if not pending:
+            return []
+
+        context = await asyncio.to_thread(self.prefetch, pending)
+        # max_rpm is a per-crew cap of at least 1, so more crews than requests per minute would
+        # exceed the budget; limiting concurrency keeps all crews together within it
+        concurrency = max(1, min(concurrency, requests_per_minute))
+        semaphore = asyncio.Semaphore(concurrency)
+        max_rpm = max(1, requests_per_minute // concurrency)
+        write_lock = asyncio.Lock()
+        results = []
+
+        async def analyze(symbol):
+            async with semaphore:
+                crew = self.build_crew(symbol, context.get(symbol), max_rpm=max_rpm, verbose=0)
+                try:
+                    output = await crew.kickoff_async()
+                    record = {'symbol': symbol, 'analysis_date': datetime.now().isoformat(), 'result': str(output)}
+                except Exception as e:
+                    print(f"Analysis of {symbol} failed: {e}")
+                    return
+            async with write_lock:
+                with open(output_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + '\n')
+            results.append(record)
+            print(f"Finished {symbol} ({len(results)}/{len(pending)})")
+
+        await asyncio.gather(*(analyze(symbol) for symbol in pending))
+        return results
+
+    def run_batch(self, symbols: List[str], **kwargs) -> List[Dict[str, Any]]:
+        """
+        Synchronous entry point for run_batch_async.
+        
+        Args:
+            symbols (List[str]): The stock symbols to analyze
+            **kwargs: Passed on to run_batch_async
+            
+        Returns:
+            List[Dict[str, Any]]: The results of this run, in completion order
+        """
+        return asyncio.run(self.run_batch_async(symbols, **kwargs))
+
+    def run_screened(self, universe: Optional[List[str]] = None, top_k: int = SCREEN_TOP_K, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Ranks a universe with the quantitative pre-screen and analyzes only the top candidates,
+        so the LLM crews run for top_k symbols instead of the whole universe.
+        
+        Args:
+            universe (Optional[List[str]]): The symbols to screen, all stored symbols if None
+            top_k (int): Number of candidates handed to the crews
+            **kwargs: Passed on to run_batch_async
+            
+        Returns:
+            List[Dict[str, Any]]: The results of this run, in completion order
+        """
+        candidates = screen(universe, price_store, top_k=top_k)
+        return self.run_batch([candidate['symbol'] for candidate in candidates], **kwargs)
+
     # Tool methods that agents can use to perform their tasks
     @tool
     def get_stock_data(self, symbol: str) -> Dict[str, Any]:
         """
         Fetches historical stock data for analysis.
         This is a tool that the Data Analyst agent can use.
+        History comes from the local price store; only bars newer than the last sync are downloaded.
         """
-        # Implementation would go here
-        pass
+        try:
+            price_store.sync(symbol)
+        except (AlphaVantageError, requests.RequestException) as e:
+            # Fall back to the stored history if there is one
+            if price_store.read(symbol) is None:
+                return {'symbol': symbol, 'error': str(e)}
+            print(f"Using stored prices for {symbol}, sync failed: {e}")
+        return price_summary(price_store.read(symbol))
 
     @tool
-    def get_market_news(self, symbol: str) -> List[Dict[str, Any]]:
+    def get_market_news(self, symbol: str) -> Dict[str, Any]:
         """
         Fetches relevant market news and updates.
         This is a tool that the Market Researcher agent can use.
+        Returns a ranked digest of deduplicated recent articles with their sentiment, instead of the raw feed.
         """
-        # Implementation would go here
-        pass
+        try:
+            news_pipeline.ingest([symbol])
+        except (AlphaVantageError, requests.RequestException) as e:
+            print(f"Using stored news for {symbol}, ingest failed: {e}")
+        return news_pipeline.digest(symbol)
 
     @tool
     def get_technical_indicators(self, symbol: str) -> Dict[str, Any]:
         """
         Calculates technical indicators for the stock.
         This is a tool that the Trading Strategist agent can use.
+        Returns the latest SMA/EMA, RSI, MACD, Bollinger bands, ATR and volume signals.
         """
-        # Implementation would go here
-        pass 
\ No newline at end of file
+        try:
+            price_store.sync(symbol)
+        except (AlphaVantageError, requests.RequestException) as e:
+            print(f"Using stored prices for {symbol}, sync failed: {e}")
+        series = price_store.read(symbol)
+        if series is None or len(series) == 0:
+            return {'symbol': symbol, 'error': 'no price data'}
+        indicators = compute_indicators(series.high, series.low, series.close, series.volume)
+        return {'symbol': symbol, 'date': str(series.dates[-1]), **latest_signals(indicators, series.close)} 
\ No newline at end of file
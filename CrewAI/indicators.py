@@ -0,0 +1,372 @@
+"""
+This module implements a vectorized technical-indicator engine.
+All indicators are computed for a whole universe at once over 2-D (bars x symbols) arrays, so one
+pass covers thousands of symbols. IncrementalIndicators keeps running state per symbol and updates
+every indicator in O(1) per new bar instead of recomputing full windows.
+
+Missing bars (NaN) are skipped by the exponential indicators; window indicators are NaN for as long
+as a missing bar is inside their window.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+SMA_WINDOWS = (20, 50, 200)
+EMA_FAST = 12
+EMA_SLOW = 26
+MACD_SIGNAL = 9
+RSI_PERIOD = 14
+BOLLINGER_WINDOW = 20
+BOLLINGER_WIDTH = 2.0
+ATR_PERIOD = 14
+VOLUME_WINDOW = 20
+
+
+def _as_matrix(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    return values[:, None] if values.ndim == 1 else values
+
+
+def prefix_sums(values: np.ndarray):
+    """
+    Cumulative sums (and cumulative NaN counts) from which any rolling window sum is one subtraction.
+
+    Args:
+        values (np.ndarray): A (bars x symbols) array
+
+    Returns:
+        Tuple[np.ndarray, Optional[np.ndarray]]: (bars + 1) x symbols prefix sums, and prefix NaN
+        counts or None if there are no NaNs
+    """
+    missing = np.isnan(values)
+    has_gaps = missing.any()
+    sums = np.zeros((len(values) + 1, values.shape[1]))
+    np.cumsum(np.where(missing, 0.0, values) if has_gaps else values, axis=0, out=sums[1:])
+    gaps = None
+    if has_gaps:
+        gaps = np.zeros((len(values) + 1, values.shape[1]), dtype=np.int32)
+        np.cumsum(missing, axis=0, out=gaps[1:])
+    return sums, gaps
+
+
+def window_sum(prefix, window: int) -> np.ndarray:
+    """
+    Sum over the last `window` bars, O(bars) regardless of the window.
+
+    Args:
+        prefix: Output of prefix_sums
+        window (int): Window length in bars
+
+    Returns:
+        np.ndarray: The rolling sums, NaN until the window is full or while it contains a NaN
+    """
+    sums, gaps = prefix
+    result = np.full((len(sums) - 1, sums.shape[1]), np.nan)
+    if len(sums) > window:
+        result[window - 1:] = sums[window:] - sums[:-window]
+        if gaps is not None:
+            result[window - 1:][(gaps[window:] - gaps[:-window]) != 0] = np.nan
+    return result
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Sum over the last `window` bars, NaN until the window is full or while it contains a NaN."""
+    return window_sum(prefix_sums(_as_matrix(values)), window)
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average over the last `window` bars."""
+    return rolling_sum(values, window) / window
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Population standard deviation over the last `window` bars."""
+    values = _as_matrix(values)
+    # Centering each column keeps the sum of squares numerically stable
+    centered = values - np.nanmean(values, axis=0, keepdims=True)
+    mean = rolling_sum(centered, window) / window
+    variance = rolling_sum(centered ** 2, window) / window - mean ** 2
+    return np.sqrt(np.maximum(variance, 0.0))
+
+
+def ema(values: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Exponential moving average, seeded with the first valid value. Loops over bars only;
+    every step is a vector operation across all symbols.
+
+    Args:
+        values (np.ndarray): A (bars x symbols) array
+        alpha (float): Smoothing factor, 2 / (span + 1) or 1 / period for Wilder smoothing
+
+    Returns:
+        np.ndarray: The moving average; NaN bars keep the previous value
+    """
+    values = _as_matrix(values)
+    result = np.empty_like(values)
+    current = np.full(values.shape[1], np.nan)
+    for i in range(len(values)):
+        current = _ema_step(current, values[i], alpha)
+        result[i] = current
+    return result
+
+
+def _ema_step(current: np.ndarray, value: np.ndarray, alpha: float) -> np.ndarray:
+    updated = np.where(np.isnan(current), value, current + alpha * (value - current))
+    return np.where(np.isnan(value), current, updated)
+
+
+def _warm_up(values: np.ndarray, counts: np.ndarray, period: int) -> np.ndarray:
+    # Hide exponential indicators until each symbol has seen `period` valid inputs
+    return np.where(counts >= period, values, np.nan)
+
+
+def compute_indicators(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Computes all indicators for a universe in one vectorized pass.
+
+    Args:
+        high (np.ndarray): (bars x symbols) highs
+        low (np.ndarray): (bars x symbols) lows
+        close (np.ndarray): (bars x symbols) closes
+        volume (np.ndarray): (bars x symbols) volumes
+
+    Returns:
+        Dict[str, np.ndarray]: A (bars x symbols) array per indicator
+    """
+    high, low, close, volume = (_as_matrix(values) for values in (high, low, close, volume))
+    counts = np.cumsum(~np.isnan(close), axis=0, dtype=np.int32)
+    # One set of prefix sums serves every moving average of the closes
+    prefix = prefix_sums(close)
+    result = {f'sma_{window}': window_sum(prefix, window) / window for window in SMA_WINDOWS}
+
+    ema_fast = ema(close, 2 / (EMA_FAST + 1))
+    ema_slow = ema(close, 2 / (EMA_SLOW + 1))
+    macd = ema_fast - ema_slow
+    signal = ema(_warm_up(macd, counts, EMA_SLOW), 2 / (MACD_SIGNAL + 1))
+    result[f'ema_{EMA_FAST}'] = _warm_up(ema_fast, counts, EMA_FAST)
+    result[f'ema_{EMA_SLOW}'] = _warm_up(ema_slow, counts, EMA_SLOW)
+    result['macd'] = _warm_up(macd, counts, EMA_SLOW)
+    result['macd_signal'] = _warm_up(signal, counts, EMA_SLOW + MACD_SIGNAL - 1)
+    result['macd_histogram'] = result['macd'] - result['macd_signal']
+
+    # RSI with Wilder smoothing of gains and losses between consecutive valid closes
+    previous = _previous_valid(close)
+    change = close - previous
+    gains = ema(np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)), 1 / RSI_PERIOD)
+    losses = ema(np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0)), 1 / RSI_PERIOD)
+    result[f'rsi_{RSI_PERIOD}'] = _warm_up(_rsi(gains, losses), counts, RSI_PERIOD + 1)
+
+    middle = result[f'sma_{BOLLINGER_WINDOW}'] if BOLLINGER_WINDOW in SMA_WINDOWS else window_sum(prefix, BOLLINGER_WINDOW) / BOLLINGER_WINDOW
+    width = BOLLINGER_WIDTH * rolling_std(close, BOLLINGER_WINDOW)
+    result['bollinger_middle'] = middle
+    result['bollinger_upper'] = middle + width
+    result['bollinger_lower'] = middle - width
+
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+    result[f'atr_{ATR_PERIOD}'] = _warm_up(ema(true_range, 1 / ATR_PERIOD), counts, ATR_PERIOD)
+
+    result['volume_ratio'] = volume / sma(volume, VOLUME_WINDOW)
+    direction = np.sign(np.nan_to_num(change))
+    result['obv'] = np.cumsum(direction * np.nan_to_num(volume), axis=0)
+    return result
+
+
+def _previous_valid(values: np.ndarray) -> np.ndarray:
+    # The last non-NaN value before each bar (forward fill shifted by one bar)
+    index = np.where(~np.isnan(values), np.arange(len(values))[:, None], -1)
+    np.maximum.accumulate(index, axis=0, out=index)
+    previous = np.full(values.shape, np.nan)
+    shifted = index[:-1]
+    valid = shifted >= 0
+    rows = np.where(valid, shifted, 0)
+    previous[1:] = np.where(valid, np.take_along_axis(values, rows, axis=0), np.nan)
+    return previous
+
+
+def _rsi(gains: np.ndarray, losses: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + gains / losses)
+    # No losses in the window means maximum strength
+    return np.where((losses == 0) & (gains > 0), 100.0, np.where((losses == 0) & (gains == 0), 50.0, rsi))
+
+
+class IncrementalIndicators:
+    """
+    Running indicator state for a fixed universe. update() consumes one bar for every symbol and
+    returns the same indicators as compute_indicators() for that bar, in O(1) per symbol.
+    """
+
+    def __init__(self, symbols: int):
+        """
+        Args:
+            symbols (int): Number of symbols (columns) in the universe
+        """
+        self.symbols = symbols
+        self.longest = max(SMA_WINDOWS + (BOLLINGER_WINDOW, VOLUME_WINDOW))
+        # Ring buffers of the last bars for the window indicators
+        self.closes = np.full((self.longest, symbols), np.nan)
+        self.volumes = np.full((VOLUME_WINDOW, symbols), np.nan)
+        self.position = 0
+        self.bars = 0
+        self.sums = {window: np.zeros(symbols) for window in SMA_WINDOWS}
+        self.gaps = {window: np.zeros(symbols) for window in SMA_WINDOWS}
+        # Bollinger sums are taken around a fixed reference per symbol for numerical stability
+        self.reference = np.full(symbols, np.nan)
+        self.bollinger_sum = np.zeros(symbols)
+        self.bollinger_squares = np.zeros(symbols)
+        self.bollinger_gaps = np.zeros(symbols)
+        self.volume_sum = np.zeros(symbols)
+        self.volume_gaps = np.zeros(symbols)
+        self.counts = np.zeros(symbols)
+        self.ema_fast = np.full(symbols, np.nan)
+        self.ema_slow = np.full(symbols, np.nan)
+        self.signal = np.full(symbols, np.nan)
+        self.gains = np.full(symbols, np.nan)
+        self.losses = np.full(symbols, np.nan)
+        self.atr = np.full(symbols, np.nan)
+        self.previous = np.full(symbols, np.nan)
+        self.obv = np.zeros(symbols)
+
+    @classmethod
+    def from_history(cls, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> 'IncrementalIndicators':
+        """
+        Builds the running state by replaying a (bars x symbols) history.
+
+        Returns:
+            IncrementalIndicators: State positioned after the last bar of the history
+        """
+        high, low, close, volume = (_as_matrix(values) for values in (high, low, close, volume))
+        state = cls(close.shape[1])
+        for i in range(len(close)):
+            state.update(high[i], low[i], close[i], volume[i])
+        return state
+
+    def _roll(self, ring: np.ndarray, window: int, offset: int) -> np.ndarray:
+        # The value leaving a window of `window` bars when the ring advances
+        return ring[(offset - window) % len(ring)] if self.bars >= window else np.full(self.symbols, np.nan)
+
+    def update(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Consumes one new bar for every symbol.
+
+        Args:
+            high (np.ndarray): Highs of the new bar, one per symbol (NaN if missing)
+            low (np.ndarray): Lows of the new bar
+            close (np.ndarray): Closes of the new bar
+            volume (np.ndarray): Volumes of the new bar
+
+        Returns:
+            Dict[str, np.ndarray]: The indicators for this bar, one value per symbol
+        """
+        high, low, close, volume = (np.asarray(values, dtype=np.float64) for values in (high, low, close, volume))
+        valid = ~np.isnan(close)
+        self.counts += valid
+        self.reference = np.where(np.isnan(self.reference), close, self.reference)
+        result = {}
+
+        for window in SMA_WINDOWS:
+            leaving = self._roll(self.closes, window, self.position)
+            self.sums[window] += np.nan_to_num(close) - np.nan_to_num(leaving)
+            self.gaps[window] += ~valid
+            if self.bars >= window:
+                self.gaps[window] -= np.isnan(leaving)
+            full = (self.gaps[window] == 0) & (self.bars + 1 >= window)
+            result[f'sma_{window}'] = np.where(full, self.sums[window] / window, np.nan)
+
+        leaving = self._roll(self.closes, BOLLINGER_WINDOW, self.position) - self.reference
+        centered = close - self.reference
+        self.bollinger_sum += np.nan_to_num(centered) - np.nan_to_num(leaving)
+        self.bollinger_squares += np.nan_to_num(centered) ** 2 - np.nan_to_num(leaving) ** 2
+        self.bollinger_gaps += ~valid
+        if self.bars >= BOLLINGER_WINDOW:
+            self.bollinger_gaps -= np.isnan(leaving)
+        full = (self.bollinger_gaps == 0) & (self.bars + 1 >= BOLLINGER_WINDOW)
+        mean = self.bollinger_sum / BOLLINGER_WINDOW
+        width = BOLLINGER_WIDTH * np.sqrt(np.maximum(self.bollinger_squares / BOLLINGER_WINDOW - mean ** 2, 0.0))
+        middle = np.where(full, mean + self.reference, np.nan)
+        result['bollinger_middle'] = middle
+        result['bollinger_upper'] = middle + width
+        result['bollinger_lower'] = middle - width
+
+        volume_leaving = self._roll(self.volumes, VOLUME_WINDOW, self.position % VOLUME_WINDOW)
+        self.volume_sum += np.nan_to_num(volume) - np.nan_to_num(volume_leaving)
+        self.volume_gaps += np.isnan(volume)
+        if self.bars >= VOLUME_WINDOW:
+            self.volume_gaps -= np.isnan(volume_leaving)
+        full = (self.volume_gaps == 0) & (self.bars + 1 >= VOLUME_WINDOW)
+        result['volume_ratio'] = volume / np.where(full, self.volume_sum / VOLUME_WINDOW, np.nan)
+
+        self.ema_fast = _ema_step(self.ema_fast, close, 2 / (EMA_FAST + 1))
+        self.ema_slow = _ema_step(self.ema_slow, close, 2 / (EMA_SLOW + 1))
+        macd = np.where(self.counts >= EMA_SLOW, self.ema_fast - self.ema_slow, np.nan)
+        self.signal = _ema_step(self.signal, macd, 2 / (MACD_SIGNAL + 1))
+        result[f'ema_{EMA_FAST}'] = np.where(self.counts >= EMA_FAST, self.ema_fast, np.nan)
+        result[f'ema_{EMA_SLOW}'] = np.where(self.counts >= EMA_SLOW, self.ema_slow, np.nan)
+        result['macd'] = macd
+        result['macd_signal'] = np.where(self.counts >= EMA_SLOW + MACD_SIGNAL - 1, self.signal, np.nan)
+        result['macd_histogram'] = result['macd'] - result['macd_signal']
+
+        change = close - self.previous
+        self.gains = _ema_step(self.gains, np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)), 1 / RSI_PERIOD)
+        self.losses = _ema_step(self.losses, np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0)), 1 / RSI_PERIOD)
+        result[f'rsi_{RSI_PERIOD}'] = np.where(self.counts >= RSI_PERIOD + 1, _rsi(self.gains, self.losses), np.nan)
+
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - self.previous), np.abs(low - self.previous)))
+        self.atr = _ema_step(self.atr, true_range, 1 / ATR_PERIOD)
+        result[f'atr_{ATR_PERIOD}'] = np.where(self.counts >= ATR_PERIOD, self.atr, np.nan)
+
+        self.obv += np.sign(np.nan_to_num(change)) * np.nan_to_num(volume)
+        result['obv'] = self.obv.copy()
+
+        self.previous = np.where(valid, close, self.previous)
+        self.closes[self.position % self.longest] = close
+        self.volumes[self.position % VOLUME_WINDOW] = volume
+        self.position += 1
+        self.bars += 1
+        return result
+
+
+def latest_signals(indicators: Dict[str, np.ndarray], close: np.ndarray, column: int = 0, row: int = -1) -> Dict[str, object]:
+    """
+    Turns the indicator values of one symbol at one bar into the facts a strategist needs.
+
+    Args:
+        indicators (Dict[str, np.ndarray]): Output of compute_indicators
+        close (np.ndarray): The (bars x symbols) closes the indicators were computed from
+        column (int): The symbol's column
+        row (int): The bar, the latest by default
+
+    Returns:
+        Dict[str, object]: Indicator values (rounded) and derived signals
+    """
+    close = _as_matrix(close)
+    row = row % len(close)
+
+    def value(name, at=row):
+        item = indicators[name][at, column]
+        return None if np.isnan(item) else round(float(item), 4)
+
+    price = float(close[row, column])
+    values = {name: value(name) for name in indicators}
+    signals = []
+    if values['sma_50'] is not None and values['sma_200'] is not None:
+        signals.append('golden cross regime (SMA50 above SMA200)' if values['sma_50'] > values['sma_200'] else 'death cross regime (SMA50 below SMA200)')
+    rsi = values[f'rsi_{RSI_PERIOD}']
+    if rsi is not None and rsi >= 70:
+        signals.append('RSI overbought')
+    elif rsi is not None and rsi <= 30:
+        signals.append('RSI oversold')
+    previous = value('macd_histogram', row - 1) if row > 0 else None
+    if previous is not None and values['macd_histogram'] is not None:
+        if previous <= 0 < values['macd_histogram']:
+            signals.append('MACD bullish crossover')
+        elif previous >= 0 > values['macd_histogram']:
+            signals.append('MACD bearish crossover')
+    if values['bollinger_upper'] is not None and price > values['bollinger_upper']:
+        signals.append('price above upper Bollinger band')
+    elif values['bollinger_lower'] is not None and price < values['bollinger_lower']:
+        signals.append('price below lower Bollinger band')
+    if values['volume_ratio'] is not None and values['volume_ratio'] >= 2:
+        signals.append('volume spike (2x the 20-day average)')
+    return {'close': price, 'indicators': values, 'signals': signals}
@@ -0,0 +1,347 @@
+"""
+This module implements an incremental, deduplicated news pipeline for the Market Researcher.
+- Only articles newer than the last one seen for a symbol are fetched (a per-symbol watermark),
+  paging back in time when a response is full.
+- Syndicated copies of the same story are collapsed with 64-bit SimHash fingerprints of the
+  normalized title and summary.
+- Relevance and sentiment are scored locally with a small finance lexicon, no LLM calls.
+Only a compact, ranked digest is handed to the agent instead of dozens of overlapping articles.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from alpha_vantage import get_client
+
+NEWS_DB = os.getenv('NEWS_DB', './news.db')
+# Articles per request; a full page means older articles may be missing and the next page is fetched
+NEWS_PAGE_SIZE = 50
+MAX_PAGES = 10
+# How far back the first ingest of a symbol reaches
+BACKFILL_DAYS = 7
+# Word pairs as SimHash features: on headline-length texts, light rewording stays within about 10
+# differing bits, while different stories about the same ticker are 20 bits or more apart
+SHINGLE_WORDS = 2
+DUPLICATE_DISTANCE = 10
+# Older articles count less; an article loses half its weight every this many hours
+HALF_LIFE_HOURS = 48.0
+DIGEST_SIZE = 8
+SUMMARY_CHARACTERS = 240
+
+# Loughran-McDonald style word lists, trimmed to terms that matter in market news
+POSITIVE_WORDS = {
+    'beat', 'beats', 'exceeded', 'exceeds', 'record', 'growth', 'grew', 'gain', 'gains', 'surge', 'surged', 'soar',
+    'soared', 'rally', 'rallied', 'upgrade', 'upgraded', 'outperform', 'strong', 'stronger', 'profit', 'profitable',
+    'raised', 'raises', 'boost', 'boosted', 'bullish', 'expansion', 'approval', 'approved', 'win', 'wins', 'partnership',
+    'breakthrough', 'dividend', 'buyback', 'rebound', 'optimistic', 'improved', 'improves', 'higher', 'positive',
+}
+NEGATIVE_WORDS = {
+    'miss', 'missed', 'misses', 'loss', 'losses', 'decline', 'declined', 'drop', 'dropped', 'fall', 'fell', 'plunge',
+    'plunged', 'slump', 'downgrade', 'downgraded', 'underperform', 'weak', 'weaker', 'cut', 'cuts', 'lawsuit', 'probe',
+    'investigation', 'recall', 'bearish', 'layoffs', 'warning', 'warns', 'default', 'bankruptcy', 'fraud', 'fine',
+    'fined', 'delay', 'delayed', 'lower', 'negative', 'concern', 'concerns', 'risk', 'risks', 'volatile', 'sell-off',
+}
+NEGATIONS = {'not', 'no', 'never', "n't", 'without', 'despite'}
+TOKEN = re.compile(r"[a-z][a-z\-']*")
+# A trailing source attribution such as " - Reuters" or " | Benzinga reports"
+SOURCE_SUFFIX = re.compile(r'\s+[-|\u2013\u2014]\s+(?:\S+\s+){0,3}\S+\s*$')
+TIME_FORMAT = '%Y%m%dT%H%M%S'
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN.findall(text.lower())
+
+
+def simhash(text: str, bits: int = 64) -> int:
+    """
+    Computes a SimHash fingerprint over word shingles; near-identical texts differ in only a few bits.
+
+    Args:
+        text (str): The article text (title and summary)
+        bits (int): Fingerprint size
+
+    Returns:
+        int: The fingerprint
+    """
+    words = tokenize(text)
+    shingles = [' '.join(words[i:i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))]
+    weights = [0] * bits
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(bits) if weights[bit] > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def fingerprint_text(title: str, summary: str) -> str:
+    """Returns the text a story is fingerprinted by: title without its source attribution, and summary."""
+    return f"{SOURCE_SUFFIX.sub('', title or '')} {summary or ''}"
+
+
+def lexicon_sentiment(text: str) -> float:
+    """
+    Scores sentiment from -1 (negative) to 1 (positive) by counting lexicon words; a negation
+    in the two preceding words flips a word's polarity.
+
+    Args:
+        text (str): The text to score
+
+    Returns:
+        float: The sentiment score
+    """
+    words = tokenize(text)
+    score = 0
+    hits = 0
+    for i, word in enumerate(words):
+        polarity = 1 if word in POSITIVE_WORDS else -1 if word in NEGATIVE_WORDS else 0
+        if polarity == 0:
+            continue
+        if any(previous in NEGATIONS or previous.endswith("n't") for previous in words[max(0, i - 2):i]):
+            polarity = -polarity
+        score += polarity
+        hits += 1
+    return score / math.sqrt(hits + 4) if hits else 0.0
+
+
+def local_relevance(ticker: str, title: str, summary: str, provider_score: Any = None) -> float:
+    """
+    Scores how much an article is about a ticker: a mention in the title counts most, a mention in
+    the summary less. The provider's score, if any, is used as a floor.
+
+    Args:
+        ticker (str): The stock symbol
+        title (str): The article title
+        summary (str): The article summary
+        provider_score (Any): The relevance score delivered with the article, if any
+
+    Returns:
+        float: Relevance between 0 and 1
+    """
+    pattern = re.compile(rf'\b{re.escape(ticker.upper())}\b')
+    score = 1.0 if pattern.search(title or '') else 0.6 if pattern.search(summary or '') else 0.2
+    try:
+        return max(score, float(provider_score or 0))
+    except ValueError:
+        return score
+
+
+def parse_time(value: str) -> datetime:
+    # Alpha Vantage timestamps look like 20240105T143000, in UTC
+    return datetime.strptime(value[:15], TIME_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def utc_days_ago(days: float) -> str:
+    """Returns the UTC time the given number of days ago, formatted like Alpha Vantage timestamps."""
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime(TIME_FORMAT)
+
+
+class NewsPipeline:
+    """
+    Ingests news per symbol incrementally and builds ranked digests from the stored articles.
+    """
+
+    def __init__(self, path: str = NEWS_DB, fetch: Optional[Callable[..., List[Dict[str, Any]]]] = None):
+        """
+        Args:
+            path (str): SQLite file holding articles, fingerprints and per-symbol watermarks
+            fetch (Optional[Callable]): Called as fetch(symbols, time_from, time_to, limit) to download
+                the newest articles in a time range; defaults to the shared Alpha Vantage client's news()
+        """
+        self.path = path
+        self.fetch = fetch or (lambda *args: get_client().news(*args))
+        with closing(self._connect()) as db, db:
+            db.executescript('''
+                CREATE TABLE IF NOT EXISTS articles (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT UNIQUE,
+                    title TEXT NOT NULL,
+                    summary TEXT,
+                    source TEXT,
+                    published TEXT NOT NULL,
+                    fingerprint INTEGER NOT NULL,
+                    sentiment REAL NOT NULL,
+                    duplicates INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS mentions (
+                    article_id INTEGER NOT NULL,
+                    symbol TEXT NOT NULL,
+                    relevance REAL NOT NULL,
+                    PRIMARY KEY (article_id, symbol)
+                );
+                CREATE INDEX IF NOT EXISTS mentions_symbol ON mentions (symbol);
+                CREATE INDEX IF NOT EXISTS articles_published ON articles (published);
+                CREATE TABLE IF NOT EXISTS watermarks (symbol TEXT PRIMARY KEY, last_published TEXT NOT NULL);
+            ''')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def watermark(self, symbol: str) -> Optional[str]:
+        """Returns the publication time of the newest article stored for a symbol."""
+        with closing(self._connect()) as db:
+            row = db.execute('SELECT last_published FROM watermarks WHERE symbol = ?', (symbol.upper(),)).fetchone()
+        return row[0] if row else None
+
+    def ingest(self, symbols: List[str]) -> Dict[str, int]:
+        """
+        Fetches articles newer than each symbol's watermark and stores the ones that are not
+        syndicated copies of a stored story.
+
+        Args:
+            symbols (List[str]): The stock symbols
+
+        Returns:
+            Dict[str, int]: New (non-duplicate) articles per symbol
+        """
+        added = {}
+        for symbol in dict.fromkeys(symbol.upper() for symbol in symbols):
+            watermark = self.watermark(symbol)
+            articles = self._fetch_since(symbol, watermark)
+            # Oldest first, so the original of a story is stored and its later copies are merged into it
+            articles.sort(key=lambda article: article['time_published'])
+            added[symbol] = 0
+            newest = watermark
+            for article in articles:
+                published = article['time_published']
+                for mentioned in self._store(article, published):
+                    if mentioned == symbol:
+                        added[symbol] += 1
+                # Only articles about this symbol move its watermark
+                if any(item.get('ticker', '').upper() == symbol for item in article.get('ticker_sentiment', [])):
+                    newest = max(newest or published, published)
+            if newest and newest != watermark:
+                with closing(self._connect()) as db, db:
+                    db.execute('INSERT OR REPLACE INTO watermarks (symbol, last_published) VALUES (?, ?)', (symbol, newest))
+        return added
+
+    def _fetch_since(self, symbol: str, watermark: Optional[str]) -> List[Dict[str, Any]]:
+        # Alpha Vantage's time_from/time_to have minute precision and return the newest articles first;
+        # a full page is followed by the page ending at its oldest minute, overlaps are removed by URL
+        time_from = watermark[:13] if watermark else utc_days_ago(BACKFILL_DAYS)[:13]
+        time_to = None
+        articles = {}
+        for _ in range(MAX_PAGES):
+            page = self.fetch([symbol], time_from, time_to, NEWS_PAGE_SIZE)
+            new = 0
+            for article in page:
+                published = article.get('time_published', '')
+                # Anything at or before the watermark was stored by an earlier ingest
+                if not published or (watermark and published <= watermark):
+                    continue
+                key = article.get('url') or (article.get('title'), published)
+                if key not in articles:
+                    articles[key] = article
+                    new += 1
+            if len(page) < NEWS_PAGE_SIZE or not new:
+                break
+            time_to = min(article['time_published'] for article in page)[:13]
+        else:
+            print(f"News for {symbol}: stopped after {MAX_PAGES} pages, older articles were skipped")
+        return list(articles.values())
+
+    def _store(self, article: Dict[str, Any], published: str) -> List[str]:
+        title, summary = article.get('title', ''), article.get('summary', '')
+        fingerprint = simhash(fingerprint_text(title, summary))
+        sentiment = lexicon_sentiment(f"{title} {summary}")
+        mentions = {item['ticker'].upper(): local_relevance(item['ticker'], title, summary, item.get('relevance_score'))
+                    for item in article.get('ticker_sentiment', [])}
+        with closing(self._connect()) as db, db:
+            if db.execute('SELECT 1 FROM articles WHERE url = ?', (article.get('url'),)).fetchone():
+                return []
+            # Syndicated copies are only looked for among recent articles about the same tickers
+            recent = db.execute(
+                'SELECT DISTINCT a.id, a.fingerprint FROM articles a JOIN mentions m ON m.article_id = a.id '
+                f'WHERE a.published >= ? AND m.symbol IN ({",".join("?" * len(mentions))})',
+                (self._days_before(published, 3), *mentions)).fetchall()
+            duplicate = next((row[0] for row in recent if hamming(row[1] & (2 ** 64 - 1), fingerprint) <= DUPLICATE_DISTANCE), None)
+            if duplicate is not None:
+                db.execute('UPDATE articles SET duplicates = duplicates + 1 WHERE id = ?', (duplicate,))
+                article_id, new = duplicate, []
+            else:
+                cursor = db.execute(
+                    'INSERT INTO articles (url, title, summary, source, published, fingerprint, sentiment) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (article.get('url'), article.get('title', ''), article.get('summary', ''), article.get('source', ''),
+                     published, self._signed(fingerprint), sentiment))
+                article_id, new = cursor.lastrowid, list(mentions)
+            db.executemany('INSERT OR IGNORE INTO mentions (article_id, symbol, relevance) VALUES (?, ?, ?)',
+                           [(article_id, symbol, relevance) for symbol, relevance in mentions.items()])
+        return new
+
+    @staticmethod
+    def _signed(fingerprint: int) -> int:
+        # SQLite integers are signed 64-bit
+        return fingerprint - 2 ** 64 if fingerprint >= 2 ** 63 else fingerprint
+
+    @staticmethod
+    def _days_before(published: str, days: int) -> str:
+        return (parse_time(published) - timedelta(days=days)).strftime(TIME_FORMAT)
+
+    def digest(self, symbol: str, limit: int = DIGEST_SIZE, days: int = 7) -> Dict[str, Any]:
+        """
+        Builds a compact, ranked news digest for a symbol from the stored articles.
+        Articles are ranked by relevance to the symbol, recency and how widely they were syndicated.
+
+        Args:
+            symbol (str): The stock symbol
+            limit (int): Maximum number of articles in the digest
+            days (int): Only consider articles from the last this many days
+
+        Returns:
+            Dict[str, Any]: Overall sentiment, article counts and the top articles with short summaries
+        """
+        symbol = symbol.upper()
+        since = utc_days_ago(days)
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                'SELECT a.title, a.summary, a.source, a.published, a.sentiment, a.duplicates, m.relevance '
+                'FROM mentions m JOIN articles a ON a.id = m.article_id WHERE m.symbol = ? AND a.published >= ?',
+                (symbol, since)).fetchall()
+        now = datetime.now(timezone.utc)
+        ranked = []
+        for title, summary, source, published, sentiment, duplicates, relevance in rows:
+            age_hours = max(0.0, (now - parse_time(published)).total_seconds() / 3600)
+            weight = relevance * 0.5 ** (age_hours / HALF_LIFE_HOURS) * (1 + math.log1p(duplicates))
+            ranked.append((weight, title, summary, source, published, sentiment, duplicates))
+        ranked.sort(reverse=True)
+        total_weight = sum(item[0] for item in ranked)
+        overall = sum(item[0] * item[5] for item in ranked) / total_weight if total_weight else 0.0
+        return {
+            'symbol': symbol,
+            'articles': len(ranked),
+            'syndicated_copies': sum(item[6] for item in ranked),
+            'sentiment': round(overall, 3),
+            'sentiment_label': 'bullish' if overall > 0.15 else 'bearish' if overall < -0.15 else 'neutral',
+            'top_articles': [
+                {'title': title, 'source': source, 'published': published, 'sentiment': round(sentiment, 3),
+                 'copies': duplicates + 1, 'summary': (summary or '')[:SUMMARY_CHARACTERS]}
+                for _, title, summary, source, published, sentiment, duplicates in ranked[:limit]
+            ],
+        }
+
+    def prune(self, days: int = 30) -> int:
+        """
+        Deletes articles older than the given number of days.
+
+        Returns:
+            int: The number of deleted articles
+        """
+        cutoff = utc_days_ago(days)
+        with closing(self._connect()) as db, db:
+            db.execute('DELETE FROM mentions WHERE article_id IN (SELECT id FROM articles WHERE published < ?)', (cutoff,))
+            return db.execute('DELETE FROM articles WHERE published < ?', (cutoff,)).rowcount
+
+
+def format_digest(digest: Dict[str, Any]) -> str:
+    """Renders a digest as compact JSON for an agent's context."""
+    return json.dumps(digest, ensure_ascii=False, separators=(',', ':'))
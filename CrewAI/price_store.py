@@ -0,0 +1,462 @@
+"""
+This module implements a local, columnar store for daily OHLCV stock prices.
+Each symbol lives in its own directory with a dates file and a column-major OHLCV block in which
+every field is one contiguous row. Reads memory-map both files, so a date range is a zero-copy slice and
+hundreds of symbols come off disk in milliseconds instead of minutes of throttled API calls.
+Syncing only downloads the bars that are newer than the last stored date.
+Universe-wide readers (the screen) use a consolidated panel, one (dates x symbols) file per field,
+so a cold process opens three files instead of two per symbol.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+from alpha_vantage import AlphaVantageError, get_client
+
+# Where the per-symbol column files are kept
+STORE_DIR = os.getenv('PRICE_STORE_DIR', './.price_store')
+# Number of most recent bars Alpha Vantage returns for outputsize=compact
+COMPACT_BARS = 100
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+# Directory of the consolidated panel inside the store; dot-prefixed, so it is not taken for a symbol
+PANEL_DIR = '.panel'
+
+
+@dataclass
+class PriceSeries:
+    """
+    Daily bars of one symbol. When read from the store, every array is a read-only view
+    on a memory-mapped file.
+    """
+    symbol: str
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def between(self, start: Optional[str] = None, end: Optional[str] = None) -> 'PriceSeries':
+        """
+        Returns the bars from start to end (both inclusive) without copying.
+
+        Args:
+            start (Optional[str]): First date (YYYY-MM-DD), or None for the first stored bar
+            end (Optional[str]): Last date (YYYY-MM-DD), or None for the last stored bar
+
+        Returns:
+            PriceSeries: A view on the requested date range
+        """
+        lo = np.searchsorted(self.dates, np.datetime64(start, 'D'), side='left') if start else 0
+        hi = np.searchsorted(self.dates, np.datetime64(end, 'D'), side='right') if end else len(self.dates)
+        return PriceSeries(self.symbol, *(getattr(self, name)[lo:hi] for name in ('dates',) + FIELDS))
+
+
+def parse_daily(payload: Dict[str, Any]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Converts an Alpha Vantage TIME_SERIES_DAILY response into sorted column arrays.
+
+    Args:
+        payload (Dict[str, Any]): The decoded JSON response
+
+    Returns:
+        Tuple[np.ndarray, Dict[str, np.ndarray]]: The dates and a column array per field
+    """
+    series = payload.get('Time Series (Daily)')
+    if series is None:
+        message = payload.get('Error Message') or payload.get('Note') or payload.get('Information') or 'unexpected response'
+        raise AlphaVantageError(message)
+    days = sorted(series)
+    dates = np.array(days, dtype='datetime64[D]')
+    columns = {
+        field: np.array([float(series[day][f'{i}. {field}']) for day in days], dtype=np.float64)
+        for i, field in enumerate(FIELDS, start=1)
+    }
+    return dates, columns
+
+
+def fetch_daily(symbol: str, outputsize: str = 'compact') -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Downloads daily bars for one symbol through the shared, rate-limited Alpha Vantage client.
+
+    Args:
+        symbol (str): The stock symbol
+        outputsize (str): 'compact' for the last 100 bars, 'full' for the whole history
+
+    Returns:
+        Tuple[np.ndarray, Dict[str, np.ndarray]]: The dates and a column array per field
+    """
+    return parse_daily(get_client().daily(symbol, outputsize))
+
+
+class PriceStore:
+    """
+    Per-symbol columnar price files with incremental sync.
+    Open memory maps are cached and reopened only when a symbol was rewritten.
+    """
+
+    def __init__(self, root: str = STORE_DIR, fetcher: Optional[Callable[..., Tuple[np.ndarray, Dict[str, np.ndarray]]]] = None):
+        """
+        Args:
+            root (str): Directory holding one subdirectory per symbol
+            fetcher (Optional[Callable]): Called as fetcher(symbol, outputsize) to download bars;
+                defaults to fetch_daily
+        """
+        self.root = root
+        self.fetcher = fetcher or fetch_daily
+        self._open = {}
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol.upper())
+
+    def symbols(self) -> List[str]:
+        """Returns the symbols that have stored bars."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if not name.startswith('.') and os.path.exists(os.path.join(self.root, name, 'meta.json')))
+
+    def meta(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Returns the stored metadata of a symbol (bars, first/last date, last sync), or None."""
+        try:
+            with open(os.path.join(self._path(symbol), 'meta.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def read(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None) -> Optional[PriceSeries]:
+        """
+        Reads the stored bars of a symbol as memory-mapped, zero-copy arrays.
+
+        Args:
+            symbol (str): The stock symbol
+            start (Optional[str]): First date (YYYY-MM-DD) to include
+            end (Optional[str]): Last date (YYYY-MM-DD) to include
+
+        Returns:
+            Optional[PriceSeries]: The bars in the date range, or None if the symbol is not stored
+        """
+        path = self._path(symbol)
+        try:
+            version = os.stat(os.path.join(path, 'meta.json')).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self._open.get(symbol.upper())
+        if cached is None or cached[0] != version:
+            try:
+                dates = np.load(os.path.join(path, 'dates.npy'), mmap_mode='r')
+                ohlcv = np.load(os.path.join(path, 'ohlcv.npy'), mmap_mode='r')
+            except ValueError:
+                # Empty arrays cannot be memory-mapped
+                dates = np.load(os.path.join(path, 'dates.npy'))
+                ohlcv = np.load(os.path.join(path, 'ohlcv.npy'))
+            cached = (version, PriceSeries(symbol.upper(), dates, *ohlcv))
+            self._open[symbol.upper()] = cached
+        series = cached[1]
+        return series.between(start, end) if start or end else series
+
+    def read_many(self, symbols: Iterable[str], start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, PriceSeries]:
+        """
+        Reads a date range for many symbols; symbols that are not stored are left out.
+
+        Args:
+            symbols (Iterable[str]): The stock symbols
+            start (Optional[str]): First date (YYYY-MM-DD) to include
+            end (Optional[str]): Last date (YYYY-MM-DD) to include
+
+        Returns:
+            Dict[str, PriceSeries]: The bars of each stored symbol
+        """
+        result = {}
+        for symbol in symbols:
+            series = self.read(symbol, start, end)
+            if series is not None:
+                result[symbol.upper()] = series
+        return result
+
+    def matrix(self, symbols: List[str], field: str = 'close', start: Optional[str] = None, end: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Aligns one field of many symbols on a common calendar, as used by the vectorized analytics.
+
+        Args:
+            symbols (List[str]): The stock symbols, one column each
+            field (str): One of open, high, low, close, volume
+            start (Optional[str]): First date (YYYY-MM-DD) to include
+            end (Optional[str]): Last date (YYYY-MM-DD) to include
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The union of all dates and a (dates x symbols) array,
+            NaN where a symbol has no bar
+        """
+        dates, values = self.matrices(symbols, (field,), start, end)
+        return dates, values[field]
+
+    def matrices(self, symbols: List[str], fields: Iterable[str] = FIELDS, start: Optional[str] = None,
+                 end: Optional[str] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Like matrix, for several fields at once; every symbol is read and aligned only once.
+
+        Args:
+            symbols (List[str]): The stock symbols, one column each
+            fields (Iterable[str]): Any of open, high, low, close, volume
+            start (Optional[str]): First date (YYYY-MM-DD) to include
+            end (Optional[str]): Last date (YYYY-MM-DD) to include
+
+        Returns:
+            Tuple[np.ndarray, Dict[str, np.ndarray]]: The union of all dates and a (dates x symbols)
+            array per field, NaN where a symbol has no bar
+        """
+        series = [self.read(symbol, start, end) for symbol in symbols]
+        stored = [s.dates for s in series if s is not None and len(s)]
+        dates = np.unique(np.concatenate(stored)) if stored else np.array([], dtype='datetime64[D]')
+        values = {field: np.full((len(dates), len(symbols)), np.nan) for field in fields}
+        for column, s in enumerate(series):
+            if s is not None and len(s):
+                rows = np.searchsorted(dates, s.dates)
+                for field, matrix in values.items():
+                    matrix[rows, column] = getattr(s, field)
+        return dates, values
+
+    def _version(self, symbol: str) -> Optional[int]:
+        try:
+            return os.stat(os.path.join(self._path(symbol), 'meta.json')).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def panel(self, symbols: List[str], fields: Iterable[str] = ('close', 'volume'), start: Optional[str] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Like matrices, from a consolidated panel file that is rebuilt only when a symbol was
+        rewritten or the request is not covered (other symbols, fields or an earlier start).
+
+        Args:
+            symbols (List[str]): The stock symbols, one column each
+            fields (Iterable[str]): Any of open, high, low, close, volume
+            start (Optional[str]): First date (YYYY-MM-DD) to include
+
+        Returns:
+            Tuple[np.ndarray, Dict[str, np.ndarray]]: The union of all dates and a (dates x symbols)
+            array per field, NaN where a symbol has no bar
+        """
+        symbols = [symbol.upper() for symbol in symbols]
+        fields = tuple(fields)
+        path = os.path.join(self.root, PANEL_DIR)
+        versions = {symbol: self._version(symbol) for symbol in symbols}
+        try:
+            with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            meta = None
+        covered = (meta is not None and set(fields) <= set(meta['fields'])
+                   and (meta['start'] is None or (start is not None and meta['start'] <= start))
+                   and all(symbol in meta['versions'] and meta['versions'][symbol] == version for symbol, version in versions.items()))
+        if not covered:
+            stored, wanted = symbols, fields
+            if meta is not None and meta['start'] == start:
+                # Keep serving what the old panel served, so alternating requests do not rebuild it every time
+                stored = list(dict.fromkeys(meta['symbols'] + symbols))
+                wanted = tuple(dict.fromkeys(tuple(meta['fields']) + fields))
+            # Versions are taken before reading, so a symbol rewritten meanwhile invalidates the panel
+            versions = {symbol: self._version(symbol) for symbol in stored}
+            dates, values = self.matrices(stored, wanted, start)
+            self._write_panel(path, versions, dates, values, start)
+            meta = {'symbols': stored}
+        columns = {symbol: column for column, symbol in enumerate(meta['symbols'])}
+        dates = np.load(os.path.join(path, 'dates.npy'))
+        lo = np.searchsorted(dates, np.datetime64(start, 'D')) if start else 0
+        index = np.array([columns[symbol] for symbol in symbols], dtype=np.intp)
+        values = {}
+        for field in fields:
+            try:
+                matrix = np.load(os.path.join(path, f'{field}.npy'), mmap_mode='r')
+            except ValueError:
+                matrix = np.load(os.path.join(path, f'{field}.npy'))
+            values[field] = matrix[lo:, index] if len(index) else np.empty((len(dates) - lo, 0))
+        # Dates on which none of the requested symbols traded only exist for other symbols in the panel
+        traded = ~np.isnan(values[fields[0]]).all(axis=1) if fields else np.ones(len(dates) - lo, dtype=bool)
+        return dates[lo:][traded], {field: matrix[traded] for field, matrix in values.items()}
+
+    def _write_panel(self, path: str, versions: Dict[str, Optional[int]], dates: np.ndarray, values: Dict[str, np.ndarray],
+                     start: Optional[str]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.root, prefix='.panel-')
+        np.save(os.path.join(staging, 'dates.npy'), dates)
+        for field, matrix in values.items():
+            np.save(os.path.join(staging, f'{field}.npy'), matrix)
+        self._write_meta(staging, {
+            'symbols': list(versions),
+            'fields': list(values),
+            'start': start,
+            'versions': versions,
+        })
+        retired = None
+        if os.path.exists(path):
+            retired = tempfile.mkdtemp(dir=self.root, prefix='.panel-old-')
+            os.rmdir(retired)
+            os.rename(path, retired)
+        os.rename(staging, path)
+        if retired:
+            shutil.rmtree(retired, ignore_errors=True)
+
+    def _write_meta(self, path: str, meta: Dict[str, Any]) -> None:
+        staging = os.path.join(path, f'.meta-{os.getpid()}.json')
+        with open(staging, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(staging, os.path.join(path, 'meta.json'))
+
+    def write(self, symbol: str, dates: np.ndarray, columns: Dict[str, np.ndarray]) -> int:
+        """
+        Merges new bars into the stored ones. Newer data wins for dates that exist in both.
+        The symbol directory is replaced as a whole, so readers never see a half-written set of columns.
+
+        Args:
+            symbol (str): The stock symbol
+            dates (np.ndarray): Dates of the new bars
+            columns (Dict[str, np.ndarray]): A column array per field
+
+        Returns:
+            int: The number of bars that were not stored before
+        """
+        symbol = symbol.upper()
+        existing = self.read(symbol)
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        if existing is not None and len(dates) == 0:
+            # Nothing new: only record that the symbol is up to date
+            self._write_meta(self._path(symbol), {**self.meta(symbol), 'last_sync': date.today().isoformat()})
+            return 0
+        if existing is not None and len(existing):
+            keep = ~np.isin(existing.dates, dates)
+            added = int(len(dates) - (len(existing.dates) - keep.sum()))
+            dates = np.concatenate([existing.dates[keep], dates])
+            columns = {field: np.concatenate([np.asarray(getattr(existing, field))[keep], columns[field]]) for field in FIELDS}
+        else:
+            added = len(dates)
+        order = np.argsort(dates, kind='stable')
+
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.root, prefix=f'.{symbol}-')
+        np.save(os.path.join(staging, 'dates.npy'), dates[order])
+        # One row per field, so every column is contiguous on disk
+        np.save(os.path.join(staging, 'ohlcv.npy'), np.stack([np.asarray(columns[field], dtype=np.float64)[order] for field in FIELDS]))
+        self._write_meta(staging, {
+            'symbol': symbol,
+            'bars': int(len(dates)),
+            'first_date': str(dates[order][0]) if len(dates) else None,
+            'last_date': str(dates[order][-1]) if len(dates) else None,
+            'last_sync': date.today().isoformat(),
+        })
+
+        target = self._path(symbol)
+        retired = None
+        if os.path.exists(target):
+            # Open memory maps keep the old files alive until they are released
+            retired = tempfile.mkdtemp(dir=self.root, prefix=f'.{symbol}-old-')
+            os.rmdir(retired)
+            os.rename(target, retired)
+        os.rename(staging, target)
+        if retired:
+            shutil.rmtree(retired, ignore_errors=True)
+        return added
+
+    def needs_sync(self, symbol: str) -> bool:
+        """Returns True if the symbol was not synced today."""
+        meta = self.meta(symbol)
+        return meta is None or meta['last_sync'] < date.today().isoformat()
+
+    def sync(self, symbol: str, force: bool = False) -> int:
+        """
+        Downloads only the bars missing since the last stored date. Alpha Vantage cannot be
+        queried by date range, so the compact (last 100 bars) response is used whenever it covers
+        the gap and the full history only for new symbols or long gaps.
+
+        Args:
+            symbol (str): The stock symbol
+            force (bool): Sync even if the symbol was already synced today
+
+        Returns:
+            int: The number of new bars stored
+        """
+        meta = self.meta(symbol)
+        if not force and meta is not None and not self.needs_sync(symbol):
+            return 0
+        outputsize = 'full'
+        if meta is not None and meta['last_date']:
+            missing = np.busday_count(np.datetime64(meta['last_date'], 'D'), np.datetime64(date.today(), 'D'))
+            if missing < COMPACT_BARS:
+                outputsize = 'compact'
+        dates, columns = self.fetcher(symbol, outputsize)
+        if meta is not None and meta['last_date']:
+            # Only bars after the last stored one are new
+            newer = dates > np.datetime64(meta['last_date'], 'D')
+            dates = dates[newer]
+            columns = {field: values[newer] for field, values in columns.items()}
+        return self.write(symbol, dates, columns)
+
+    def sync_many(self, symbols: Iterable[str], force: bool = False) -> Dict[str, Any]:
+        """
+        Syncs many symbols; a failing symbol does not stop the others.
+
+        Args:
+            symbols (Iterable[str]): The stock symbols
+            force (bool): Sync even if a symbol was already synced today
+
+        Returns:
+            Dict[str, Any]: New bars per symbol, or the error message for symbols that failed
+        """
+        results = {}
+        for symbol in symbols:
+            try:
+                results[symbol] = self.sync(symbol, force)
+            except (AlphaVantageError, requests.RequestException) as e:
+                print(f"Sync of {symbol} failed: {e}")
+                results[symbol] = str(e)
+        return results
+
+
+def price_summary(series: PriceSeries, recent: int = 10) -> Dict[str, Any]:
+    """
+    Condenses a price series into the key metrics an agent needs, instead of the raw history.
+
+    Args:
+        series (PriceSeries): The bars of one symbol
+        recent (int): Number of most recent bars to include verbatim
+
+    Returns:
+        Dict[str, Any]: Returns over several horizons, 52-week range, volatility, volume and recent bars
+    """
+    close = np.asarray(series.close)
+    if len(close) == 0:
+        return {'symbol': series.symbol, 'error': 'no price data'}
+
+    def change(bars):
+        return round(float(close[-1] / close[-bars - 1] - 1), 4) if len(close) > bars else None
+
+    year = close[-252:]
+    daily_returns = np.diff(np.log(close[-253:]))
+    return {
+        'symbol': series.symbol,
+        'last_date': str(series.dates[-1]),
+        'last_close': float(close[-1]),
+        'return_1w': change(5),
+        'return_1m': change(21),
+        'return_3m': change(63),
+        'return_1y': change(252),
+        'high_52w': float(year.max()),
+        'low_52w': float(year.min()),
+        'volatility_annualized': round(float(daily_returns.std() * np.sqrt(252)), 4) if len(daily_returns) > 1 else None,
+        'average_volume_20d': float(np.mean(series.volume[-20:])),
+        'recent_bars': [
+            {'date': str(series.dates[i]), 'open': float(series.open[i]), 'high': float(series.high[i]),
+             'low': float(series.low[i]), 'close': float(series.close[i]), 'volume': float(series.volume[i])}
+            for i in range(max(0, len(series) - recent), len(series))
+        ],
+    }
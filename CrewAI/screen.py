@@ -0,0 +1,193 @@
+"""
+This module implements a quantitative pre-screen that runs before the LLM crew.
+It ranks a whole universe from the local price store on momentum, volatility, liquidity and moving
+average crossovers, all computed as vectorized NumPy operations over one (bars x symbols) matrix,
+so only the most promising names get the full three-agent analysis. The matrix comes from the price
+store's consolidated panel; only the first screen after a sync pays for reading every symbol's files.
+
+Usage:
+    python screen.py --top 20
+    python screen.py --top 20 --analyze
+"""
+
+import argparse
+import json
+import os
+import time
+import warnings
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backtest import BARS_PER_YEAR, forward_fill
+from indicators import sma
+from price_store import PriceStore
+
+# Calendar days read from the store: a year of momentum plus room for the 200-day SMA
+LOOKBACK_DAYS = 400
+SCREEN_TOP_K = int(os.getenv('SCREEN_TOP_K', '20'))
+MIN_PRICE = 5.0
+# Average daily traded value over the last month, in the quote currency
+MIN_DOLLAR_VOLUME = 1_000_000.0
+# Symbols whose last bar is older than this many bars are considered stale (delisted or halted)
+MAX_STALE_BARS = 5
+# Crossovers within this many bars count as recent
+CROSS_BARS = 10
+
+# Weights of the cross-sectional percentile ranks; negative weights prefer low values
+WEIGHTS = {
+    'momentum_12_1': 0.35,
+    'momentum_3m': 0.20,
+    'volatility': -0.15,
+    'dollar_volume': 0.10,
+}
+# Bonuses for trend signals, added to the weighted ranks
+SIGNAL_BONUSES = {
+    'uptrend': 0.10,
+    'recent_golden_cross': 0.10,
+    'recent_breakout': 0.05,
+}
+
+
+def percentile_ranks(values: np.ndarray, eligible: np.ndarray) -> np.ndarray:
+    """
+    Ranks values among the eligible symbols from 0 (lowest) to 1 (highest); missing values get 0.5.
+
+    Args:
+        values (np.ndarray): One value per symbol
+        eligible (np.ndarray): Boolean mask of the symbols to rank
+
+    Returns:
+        np.ndarray: The percentile ranks, 0 for symbols that are not eligible
+    """
+    ranks = np.zeros(len(values))
+    valid = eligible & ~np.isnan(values)
+    count = int(valid.sum())
+    if count > 1:
+        ranks[valid] = np.argsort(np.argsort(values[valid])) / (count - 1)
+    elif count:
+        ranks[valid] = 0.5
+    ranks[eligible & np.isnan(values)] = 0.5
+    return ranks
+
+
+def _crossed_above(fast: np.ndarray, slow: np.ndarray, bars: int) -> np.ndarray:
+    # True where fast moved from below to above slow within the last `bars` bars
+    above = fast[-bars - 1:] > slow[-bars - 1:]
+    known = ~np.isnan(fast[-bars - 1:]) & ~np.isnan(slow[-bars - 1:])
+    return ((above[1:] & ~above[:-1]) & known[1:] & known[:-1]).any(axis=0) & above[-1]
+
+
+def screen_metrics(close: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Computes the screening metrics of every symbol at the last bar.
+
+    Args:
+        close (np.ndarray): (bars x symbols) closes, NaN where a symbol has no bar
+        volume (np.ndarray): (bars x symbols) volumes
+
+    Returns:
+        Dict[str, np.ndarray]: One value per symbol for every metric and signal
+    """
+    bars = len(close)
+    valid = ~np.isnan(close)
+    last_valid = np.where(valid, np.arange(bars)[:, None], -1).max(axis=0) if bars else np.full(close.shape[1], -1)
+    prices = forward_fill(close)
+
+    def change(recent, past):
+        if bars < past:
+            return np.full(close.shape[1], np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return prices[-recent] / prices[-past] - 1
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily = close[1:] / close[:-1] - 1
+    month = BARS_PER_YEAR // 12
+    sma_50, sma_200 = sma(prices, 50), sma(prices, 200)
+    with warnings.catch_warnings():
+        # Symbols without bars in the window give all-NaN columns, and NaN metrics
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return {
+            'price': prices[-1] if bars else np.full(close.shape[1], np.nan),
+            'history': valid.sum(axis=0),
+            'stale_bars': bars - 1 - last_valid,
+            # Twelve-month return skipping the last month, which tends to mean-revert
+            'momentum_12_1': change(month + 1, BARS_PER_YEAR + 1),
+            'momentum_3m': change(1, 3 * month + 1),
+            'volatility': np.nanstd(daily[-3 * month:], axis=0) * np.sqrt(BARS_PER_YEAR),
+            'dollar_volume': np.nanmean((close * volume)[-month:], axis=0),
+            'uptrend': (prices[-1] > sma_50[-1]) & (sma_50[-1] > sma_200[-1]),
+            'recent_golden_cross': _crossed_above(sma_50, sma_200, CROSS_BARS),
+            'recent_breakout': _crossed_above(prices, sma_50, CROSS_BARS),
+        }
+
+
+def screen(symbols: Optional[List[str]] = None, store: Optional[PriceStore] = None, top_k: int = SCREEN_TOP_K,
+           min_price: float = MIN_PRICE, min_dollar_volume: float = MIN_DOLLAR_VOLUME) -> List[Dict[str, Any]]:
+    """
+    Ranks a universe on quantitative criteria and returns the best candidates for the crew.
+
+    Args:
+        symbols (Optional[List[str]]): The universe, all stored symbols if None
+        store (Optional[PriceStore]): The price store, the default one if None
+        top_k (int): Number of candidates to return
+        min_price (float): Leave out symbols trading below this price
+        min_dollar_volume (float): Leave out symbols with less average daily traded value
+
+    Returns:
+        List[Dict[str, Any]]: The top candidates, best first, with their score, metrics and signals
+    """
+    started = time.perf_counter()
+    store = store or PriceStore()
+    symbols = [symbol.upper() for symbol in symbols] if symbols is not None else store.symbols()
+    start = (datetime.now() - timedelta(days=LOOKBACK_DAYS)).date().isoformat()
+    dates, bars = store.panel(symbols, ('close', 'volume'), start)
+    if not len(dates):
+        return []
+    metrics = screen_metrics(bars['close'], bars['volume'])
+
+    with np.errstate(invalid='ignore'):
+        eligible = ((metrics['history'] >= 200) & (metrics['stale_bars'] <= MAX_STALE_BARS)
+                    & (metrics['price'] >= min_price) & (metrics['dollar_volume'] >= min_dollar_volume))
+    score = np.zeros(len(symbols))
+    for name, weight in WEIGHTS.items():
+        ranks = percentile_ranks(metrics[name], eligible)
+        score += abs(weight) * (ranks if weight > 0 else 1 - ranks)
+    for name, bonus in SIGNAL_BONUSES.items():
+        score += bonus * metrics[name]
+    score[~eligible] = -np.inf
+
+    order = np.argsort(-score, kind='stable')[:min(top_k, int(eligible.sum()))]
+    candidates = []
+    for column in order:
+        candidates.append({
+            'symbol': symbols[column],
+            'score': round(float(score[column]), 4),
+            **{name: None if np.isnan(metrics[name][column]) else round(float(metrics[name][column]), 4) for name in WEIGHTS},
+            'price': round(float(metrics['price'][column]), 4),
+            'signals': [name for name in SIGNAL_BONUSES if metrics[name][column]],
+        })
+    print(f"Screened {len(symbols)} symbols in {time.perf_counter() - started:.2f}s: "
+          f"{int(eligible.sum())} eligible, {len(candidates)} selected")
+    return candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank the stored universe and pick candidates for the LLM crew')
+    parser.add_argument('--symbols', nargs='*', help='the universe, all stored symbols by default')
+    parser.add_argument('--top', type=int, default=SCREEN_TOP_K)
+    parser.add_argument('--min-price', type=float, default=MIN_PRICE)
+    parser.add_argument('--min-dollar-volume', type=float, default=MIN_DOLLAR_VOLUME)
+    parser.add_argument('--analyze', action='store_true', help='run the crew on the selected candidates')
+    args = parser.parse_args()
+
+    candidates = screen(args.symbols, top_k=args.top, min_price=args.min_price, min_dollar_volume=args.min_dollar_volume)
+    print(json.dumps(candidates, indent=2))
+    if args.analyze and candidates:
+        from crew import StockAnalysisCrew
+        StockAnalysisCrew().run_batch([candidate['symbol'] for candidate in candidates])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+
+import alpha_vantage
+from alpha_vantage import RETRIES, AlphaVantageError, TokenBucket
+from alpha_vantage_stub import StubAlphaVantage
+
+QUOTA_NOTE = {'Note': 'Thank you for using Alpha Vantage! Our standard API rate limit is 5 requests per minute.'}
+
+
+@pytest.fixture
+def stub():
+    with StubAlphaVantage(start='2024-01-01', latency=0.2) as stub:
+        yield stub
+
+# ------------------------------------------------------------------------------
+# Test: identical requests in flight at the same time share one API call.
+# ------------------------------------------------------------------------------
+def test_concurrent_identical_requests_are_coalesced(tmp_path, stub):
+    client = stub.client(str(tmp_path / 'state.db'))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.daily('AAPL', 'full'))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stub.requests[('TIME_SERIES_DAILY', 'full')] == 1
+    assert client.stats['api_calls'] == 1
+    assert client.stats['coalesced'] + client.stats['cache_hits'] == 4
+    assert all(result == results[0] for result in results)
+
+# ------------------------------------------------------------------------------
+# Test: cached responses survive a restart, and a fresh full history answers compact requests.
+# ------------------------------------------------------------------------------
+def test_responses_are_cached_on_disk(tmp_path, stub):
+    state = str(tmp_path / 'state.db')
+    stub.client(state).daily('MSFT', 'full')
+
+    restarted = stub.client(state)
+    restarted.daily('MSFT', 'full')
+    restarted.daily('MSFT', 'compact')
+    assert sum(stub.requests.values()) == 1
+    assert restarted.stats == {'api_calls': 0, 'cache_hits': 2, 'coalesced': 0}
+
+# ------------------------------------------------------------------------------
+# Test: the token bucket refuses requests beyond its capacity, also after a restart.
+# ------------------------------------------------------------------------------
+def test_token_bucket_limits_and_persists(tmp_path):
+    path = str(tmp_path / 'state.db')
+    bucket = TokenBucket(path, {'minute': (2, 60.0)})
+    assert bucket.acquire(block=False)
+    assert bucket.acquire(block=False)
+    assert not bucket.acquire(block=False)
+    assert not TokenBucket(path, {'minute': (2, 60.0)}).acquire(block=False)
+
+    fast = TokenBucket(str(tmp_path / 'fast.db'), {'minute': (1, 0.2)})
+    assert fast.acquire(block=False)
+    assert not fast.acquire(block=False)
+    assert fast.acquire()
+
+# ------------------------------------------------------------------------------
+# Test: a quota note drains the bucket and the request is retried.
+# ------------------------------------------------------------------------------
+def test_quota_note_is_retried(tmp_path, stub):
+    respond = stub.respond
+    answers = iter([QUOTA_NOTE])
+    stub.respond = lambda params: next(answers, None) or respond(params)
+    client = stub.client(str(tmp_path / 'state.db'))
+
+    payload = client.daily('IBM')
+    assert 'Time Series (Daily)' in payload
+    assert client.stats['api_calls'] == 2
+
+# ------------------------------------------------------------------------------
+# Test: a quota that stays exhausted gives up after RETRIES attempts; other notes fail at once.
+# ------------------------------------------------------------------------------
+def test_persistent_quota_note_and_other_notes_fail(tmp_path, stub):
+    client = stub.client(str(tmp_path / 'state.db'))
+    client.bucket = TokenBucket(str(tmp_path / 'bucket.db'), {'minute': (1, 0.05)})
+
+    stub.respond = lambda params: QUOTA_NOTE
+    with pytest.raises(AlphaVantageError, match='Quota exhausted'):
+        client.daily('IBM')
+    assert client.stats['api_calls'] == RETRIES
+
+    stub.respond = lambda params: {'Information': 'The demo API key is for demo purposes only.'}
+    with pytest.raises(AlphaVantageError, match='demo'):
+        client.daily('AAPL')
+    assert client.stats['api_calls'] == RETRIES + 1
+
+# ------------------------------------------------------------------------------
+# Test: news is requested per ticker, since a ticker list means articles mentioning all of them.
+# ------------------------------------------------------------------------------
+def test_news_requests_one_ticker_per_call(tmp_path, stub):
+    client = stub.client(str(tmp_path / 'state.db'))
+    articles = client.news(['AAPL', 'MSFT', 'aapl'], limit=1000)
+    assert stub.requests[('NEWS_SENTIMENT', None)] == 2
+    tickers = {article['ticker_sentiment'][0]['ticker'] for article in articles}
+    assert tickers == {'AAPL', 'MSFT'}
+    assert len({article['url'] for article in articles}) == len(articles)
+
+    # The stub follows the API: both tickers must be mentioned
+    assert stub.respond({'function': 'NEWS_SENTIMENT', 'tickers': 'AAPL,MSFT'})['feed'] == []
+
+# ------------------------------------------------------------------------------
+# Test: the in-memory cache keeps only the most recently used responses and no expired ones.
+# ------------------------------------------------------------------------------
+def test_memory_cache_is_bounded(tmp_path, stub, monkeypatch):
+    client = stub.client(str(tmp_path / 'state.db'))
+    client.memory_entries = 2
+    for symbol in ('AAA', 'BBB', 'AAA', 'CCC'):
+        client.daily(symbol)
+    assert list(client._memory) == [client.cache_key('TIME_SERIES_DAILY', {'symbol': symbol, 'outputsize': 'compact'})
+                                    for symbol in ('AAA', 'CCC')]
+    # Evicted responses are still answered from disk
+    client.daily('BBB')
+    assert client.stats['api_calls'] == 3
+
+    later = time.time() + 7 * 60 * 60
+    monkeypatch.setattr(time, 'time', lambda: later)
+    client.daily('BBB')
+    assert client.stats['api_calls'] == 4
+    assert len(client._memory) == 2
+
+# ------------------------------------------------------------------------------
+# Test: SQLite is never opened while the client's lock is held.
+# ------------------------------------------------------------------------------
+def test_sqlite_io_runs_outside_the_lock(tmp_path, stub, monkeypatch):
+    client = stub.client(str(tmp_path / 'state.db'))
+    connect = alpha_vantage.sqlite3.connect
+    opened = []
+
+    def checked_connect(*args, **kwargs):
+        assert not client._lock.locked()
+        opened.append(args[0])
+        return connect(*args, **kwargs)
+
+    monkeypatch.setattr(alpha_vantage.sqlite3, 'connect', checked_connect)
+    client.daily('AAPL')
+    client._memory.clear()
+    client.daily('AAPL')
+    assert client.stats == {'api_calls': 1, 'cache_hits': 1, 'coalesced': 0}
+    assert opened
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from backtest import align_signals, parse_decision, run_backtest
+
+# Mon 2024-01-01 .. Fri 2024-01-12
+DATES = np.arange(np.datetime64('2024-01-01'), np.datetime64('2024-01-13'), dtype='datetime64[D]')
+DATES = DATES[np.is_busday(DATES)]
+
+# ------------------------------------------------------------------------------
+# Test: signals hold until the next one, weekend signals land on the next trading day.
+# ------------------------------------------------------------------------------
+def test_align_signals_holds_and_rolls_forward():
+    signals = {
+        'AAA': [('2024-01-06', 1.0), ('2024-01-10', -1.0)],
+        'BBB': [('2024-01-03T15:30:00', 1.0)],
+    }
+    targets = align_signals(DATES, ['AAA', 'BBB', 'CCC'], signals)
+    # Saturday the 6th is executed on Monday the 8th, the 6th row of the calendar
+    assert list(targets[:, 0]) == [0, 0, 0, 0, 0, 1, 1, -1, -1, -1]
+    assert list(targets[:, 1]) == [0, 0, 1, 1, 1, 1, 1, 1, 1, 1]
+    assert not targets[:, 2].any()
+
+    held = align_signals(DATES, ['BBB'], signals, hold_bars=3)
+    assert list(held[:, 0]) == [0, 0, 1, 1, 1, 0, 0, 0, 0, 0]
+
+# ------------------------------------------------------------------------------
+# Test: a signal never earns the return of the bar it was decided on.
+# ------------------------------------------------------------------------------
+def test_no_look_ahead():
+    close = np.full((len(DATES), 1), 100.0)
+    # The stock jumps on the signal day and again on the next day
+    close[4:, 0] = 110.0
+    close[5:, 0] = 121.0
+    targets = align_signals(DATES, ['AAA'], {'AAA': [(str(DATES[4]), 1.0)]})
+    result = run_backtest(DATES, ['AAA'], close, targets, cost_bps=0)
+    assert result.positions[4, 0] == 0 and result.positions[5, 0] == 1
+    assert result.returns[4, 0] == 0
+    assert result.returns[5, 0] == pytest.approx(0.1)
+
+    # Changing prices after a bar does not change the position held on it
+    future = close.copy()
+    future[7:, 0] = 50.0
+    again = run_backtest(DATES, ['AAA'], future, targets, cost_bps=0)
+    np.testing.assert_array_equal(again.positions[:7], result.positions[:7])
+
+# ------------------------------------------------------------------------------
+# Test: trading costs are charged on every change of position.
+# ------------------------------------------------------------------------------
+def test_costs_are_charged_on_turnover():
+    close = np.full((len(DATES), 1), 100.0)
+    targets = align_signals(DATES, ['AAA'], {'AAA': [(str(DATES[1]), 1.0), (str(DATES[3]), -1.0)]})
+    result = run_backtest(DATES, ['AAA'], close, targets, cost_bps=10)
+    assert list(result.turnover[:, 0]) == [0, 0, 1, 0, 2, 0, 0, 0, 0, 0]
+    assert result.returns.sum() == pytest.approx(-3 * 0.001)
+
+# ------------------------------------------------------------------------------
+# Test: the decision is read from the crew's final answer.
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize('text, expected', [
+    ('Recommendation: BUY. Entry around 180.', 1.0),
+    ('We would not sell here. Final decision: hold the position.', 0.0),
+    ('Risks could make investors sell. Rating - Strong Sell', -1.0),
+    ('Overall we suggest to accumulate on dips.', 1.0),
+    ('Revenue grew 12% year over year.', None),
+    ('', None),
+])
+def test_parse_decision(text, expected):
+    assert parse_decision(text) == expected
@@ -0,0 +1,55 @@
+import numpy as np
+
+from benchmark_indicators import synthetic_universe
+from indicators import IncrementalIndicators, compute_indicators, rolling_std, sma
+
+
+def universe_with_gaps(symbols=12, bars=320):
+    high, low, close, volume = synthetic_universe(symbols, bars, seed=7)
+    # A symbol listed late, one with a trading halt and one with a single missing bar
+    for values in (high, low, close, volume):
+        values[:150, 1] = np.nan
+        values[200:210, 2] = np.nan
+        values[250, 3] = np.nan
+    return high, low, close, volume
+
+# ------------------------------------------------------------------------------
+# Test: moving averages agree with a plain per-window computation, NaN while a window has a gap.
+# ------------------------------------------------------------------------------
+def test_sma_and_std_match_reference():
+    _, _, close, _ = universe_with_gaps()
+    result = sma(close, 20)
+    deviation = rolling_std(close, 20)
+    for row in (18, 19, 100, 205, 215, 260, 319):
+        window = close[row - 19:row + 1] if row >= 19 else None
+        for column in range(close.shape[1]):
+            if window is None or np.isnan(window[:, column]).any():
+                assert np.isnan(result[row, column]) and np.isnan(deviation[row, column])
+            else:
+                assert np.isclose(result[row, column], window[:, column].mean())
+                assert np.isclose(deviation[row, column], window[:, column].std())
+
+# ------------------------------------------------------------------------------
+# Test: incremental updates give the same indicators as a full recomputation at every bar.
+# ------------------------------------------------------------------------------
+def test_incremental_matches_full_computation():
+    high, low, close, volume = universe_with_gaps()
+    full = compute_indicators(high, low, close, volume)
+    state = IncrementalIndicators(close.shape[1])
+    for row in range(len(close)):
+        latest = state.update(high[row], low[row], close[row], volume[row])
+        assert set(latest) == set(full)
+        for name, values in latest.items():
+            np.testing.assert_allclose(values, full[name][row], rtol=1e-7, atol=1e-7, err_msg=f'{name} at bar {row}')
+
+# ------------------------------------------------------------------------------
+# Test: state rebuilt from history continues exactly like a full recomputation.
+# ------------------------------------------------------------------------------
+def test_from_history_continues_with_new_bars():
+    high, low, close, volume = universe_with_gaps()
+    state = IncrementalIndicators.from_history(high[:300], low[:300], close[:300], volume[:300])
+    full = compute_indicators(high, low, close, volume)
+    for row in range(300, len(close)):
+        latest = state.update(high[row], low[row], close[row], volume[row])
+    for name, values in latest.items():
+        np.testing.assert_allclose(values, full[name][-1], rtol=1e-7, atol=1e-7, err_msg=name)
@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+import news_pipeline
+from alpha_vantage_stub import StubAlphaVantage, synthetic_news
+from news_pipeline import (BACKFILL_DAYS, DUPLICATE_DISTANCE, NewsPipeline, fingerprint_text, hamming, simhash,
+                           utc_days_ago)
+
+
+def article(url, tickers, published, title='Quarterly results', summary=''):
+    return {
+        'url': url, 'title': title, 'summary': summary, 'source': 'Reuters', 'time_published': published,
+        'ticker_sentiment': [{'ticker': ticker, 'relevance_score': '0.9'} for ticker in tickers],
+    }
+
+
+def hours_ago(hours):
+    return time.strftime('%Y%m%dT%H%M%S', time.gmtime(time.time() - hours * 3600))
+
+
+@pytest.fixture
+def stub():
+    with StubAlphaVantage() as stub:
+        yield stub
+
+
+@pytest.fixture
+def utc_offset_timezone():
+    # A local time zone far from UTC, so local and UTC timestamps cannot be confused
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('TZ', 'America/Los_Angeles')
+        time.tzset()
+        yield
+    time.tzset()
+
+# ------------------------------------------------------------------------------
+# Test: full responses are paged back in time until every new article was fetched.
+# ------------------------------------------------------------------------------
+def test_ingest_pages_through_full_responses(tmp_path, stub, monkeypatch):
+    monkeypatch.setattr(news_pipeline, 'NEWS_PAGE_SIZE', 10)
+    client = stub.client(str(tmp_path / 'state.db'))
+    pipeline = NewsPipeline(str(tmp_path / 'news.db'), fetch=client.news)
+    pipeline.ingest(['AAPL'])
+
+    expected = [item for item in synthetic_news('AAPL') if item['time_published'][:13] >= utc_days_ago(BACKFILL_DAYS)[:13]]
+    assert len(expected) > 10
+    digest = pipeline.digest('AAPL', days=BACKFILL_DAYS + 1)
+    assert digest['articles'] + digest['syndicated_copies'] == len(expected)
+    assert stub.requests[('NEWS_SENTIMENT', None)] > 1
+    assert pipeline.watermark('AAPL') == max(item['time_published'] for item in expected)
+
+    # Nothing newer than the watermark: one request, nothing added
+    requests = stub.requests[('NEWS_SENTIMENT', None)]
+    assert pipeline.ingest(['AAPL']) == {'AAPL': 0}
+    assert stub.requests[('NEWS_SENTIMENT', None)] == requests + 1
+
+# ------------------------------------------------------------------------------
+# Test: every symbol is fetched on its own and its watermark only moves with articles about it.
+# ------------------------------------------------------------------------------
+def test_watermark_advances_only_from_articles_mentioning_symbol(tmp_path):
+    calls = []
+    feeds = {
+        'AAPL': [article('a1', ['AAPL'], hours_ago(5)), article('x1', ['MSFT'], hours_ago(1))],
+        'MSFT': [article('m1', ['MSFT', 'AAPL'], hours_ago(3), title='Cloud deal')],
+    }
+
+    def fetch(symbols, time_from, time_to, limit):
+        calls.append(symbols)
+        return feeds[symbols[0]]
+
+    pipeline = NewsPipeline(str(tmp_path / 'news.db'), fetch=fetch)
+    added = pipeline.ingest(['aapl', 'MSFT'])
+    assert calls == [['AAPL'], ['MSFT']]
+    assert pipeline.watermark('AAPL') == feeds['AAPL'][0]['time_published']
+    assert pipeline.watermark('MSFT') == feeds['MSFT'][0]['time_published']
+    assert added == {'AAPL': 1, 'MSFT': 1}
+
+# ------------------------------------------------------------------------------
+# Test: the stub's syndicated copies ("... - Benzinga reports") collapse into the original story.
+# ------------------------------------------------------------------------------
+def test_syndicated_copies_merge(tmp_path, stub):
+    stories = {}
+    for item in synthetic_news('MSFT'):
+        stories.setdefault(item['url'].rsplit('/', 2)[1], []).append(item)
+    for copies in stories.values():
+        original = simhash(fingerprint_text(copies[0]['title'], copies[0]['summary']))
+        for copy in copies[1:]:
+            assert hamming(original, simhash(fingerprint_text(copy['title'], copy['summary']))) <= DUPLICATE_DISTANCE
+
+    pipeline = NewsPipeline(str(tmp_path / 'news.db'), fetch=stub.client(str(tmp_path / 'state.db')).news)
+    pipeline.ingest(['MSFT'])
+    digest = pipeline.digest('MSFT', limit=100, days=BACKFILL_DAYS + 1)
+    syndicated = [item for copies in stories.values() for item in copies[1:]
+                  if item['time_published'][:13] >= utc_days_ago(BACKFILL_DAYS)[:13]]
+    assert syndicated and digest['syndicated_copies'] >= len(syndicated)
+    # The original is kept, not a copy with the source in its title
+    assert not any(item['title'].endswith(' reports') for item in digest['top_articles'])
+
+# ------------------------------------------------------------------------------
+# Test: digest windows and pruning use UTC, like Alpha Vantage's timestamps.
+# ------------------------------------------------------------------------------
+def test_digest_and_prune_use_utc(tmp_path, utc_offset_timezone):
+    feed = [article('recent', ['IBM'], hours_ago(2), title='IBM wins contract'),
+            article('old', ['IBM'], hours_ago(26), title='IBM cuts jobs')]
+    pipeline = NewsPipeline(str(tmp_path / 'news.db'), fetch=lambda *args: feed)
+    pipeline.ingest(['IBM'])
+
+    digest = pipeline.digest('IBM', days=1)
+    assert [item['title'] for item in digest['top_articles']] == ['IBM wins contract']
+    assert pipeline.prune(days=1) == 1
+    assert pipeline.digest('IBM', days=2)['articles'] == 1
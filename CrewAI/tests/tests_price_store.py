@@ -0,0 +1,125 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from alpha_vantage_stub import StubAlphaVantage
+from price_store import COMPACT_BARS, FIELDS, PriceStore
+
+
+def business_days_ago(days):
+    return str(np.busday_offset(np.datetime64(date.today(), 'D'), -days, roll='backward'))
+
+
+@pytest.fixture
+def stub():
+    with StubAlphaVantage(start='2020-01-01') as stub:
+        yield stub
+
+# ------------------------------------------------------------------------------
+# Test: a new symbol is synced with the full history, a second sync the same day is skipped.
+# ------------------------------------------------------------------------------
+def test_first_sync_downloads_full_history(tmp_path, stub):
+    store = PriceStore(str(tmp_path), fetcher=stub.fetch_daily)
+    added = store.sync('AAPL')
+    assert added == len(stub.bars('AAPL')) == store.meta('AAPL')['bars']
+    assert stub.requests[('TIME_SERIES_DAILY', 'full')] == 1
+
+    assert store.sync('aapl') == 0
+    assert sum(stub.requests.values()) == 1
+    series = store.read('AAPL')
+    assert str(series.dates[-1]) == max(stub.bars('AAPL'))
+    assert series.close[-1] == float(stub.bars('AAPL')[max(stub.bars('AAPL'))]['4. close'])
+
+# ------------------------------------------------------------------------------
+# Test: a short gap is filled from the compact response and merged behind the stored bars.
+# ------------------------------------------------------------------------------
+def test_short_gap_uses_compact_and_merges(tmp_path, stub):
+    with StubAlphaVantage(start='2020-01-01', end=business_days_ago(20)) as old:
+        store = PriceStore(str(tmp_path), fetcher=old.fetch_daily)
+        store.sync('MSFT')
+        stored = store.read('MSFT')
+        old_dates, old_close = np.array(stored.dates), np.array(stored.close)
+
+    store.fetcher = stub.fetch_daily
+    added = store.sync('MSFT', force=True)
+    assert stub.requests == {('TIME_SERIES_DAILY', 'compact'): 1}
+    assert added == 20
+
+    merged = store.read('MSFT')
+    assert len(merged) == len(old_dates) + 20
+    assert np.all(np.diff(merged.dates.astype(np.int64)) > 0)
+    # Stored bars are kept, only the newer ones come from the new response
+    assert np.array_equal(merged.close[:len(old_close)], old_close)
+    new_days = [str(day) for day in merged.dates[-20:]]
+    assert new_days == sorted(stub.bars('MSFT'))[-20:]
+
+# ------------------------------------------------------------------------------
+# Test: a gap longer than the compact response falls back to the full history.
+# ------------------------------------------------------------------------------
+def test_long_gap_uses_full_history(tmp_path, stub):
+    with StubAlphaVantage(start='2020-01-01', end=business_days_ago(COMPACT_BARS + 10)) as old:
+        store = PriceStore(str(tmp_path), fetcher=old.fetch_daily)
+        store.sync('IBM')
+
+    store.fetcher = stub.fetch_daily
+    assert store.sync('IBM', force=True) == COMPACT_BARS + 10
+    assert stub.requests == {('TIME_SERIES_DAILY', 'full'): 1}
+    assert store.meta('IBM')['last_date'] == max(stub.bars('IBM'))
+
+# ------------------------------------------------------------------------------
+# Test: on overlapping dates the newer write wins.
+# ------------------------------------------------------------------------------
+def test_write_merges_and_newer_data_wins(tmp_path):
+    store = PriceStore(str(tmp_path))
+    fields = ('open', 'high', 'low', 'close', 'volume')
+    dates = np.array(['2024-01-02', '2024-01-03', '2024-01-04'], dtype='datetime64[D]')
+    assert store.write('XYZ', dates, {field: np.array([1.0, 2.0, 3.0]) for field in fields}) == 3
+
+    newer = np.array(['2024-01-04', '2024-01-05'], dtype='datetime64[D]')
+    assert store.write('XYZ', newer, {field: np.array([30.0, 40.0]) for field in fields}) == 1
+    series = store.read('XYZ')
+    assert [str(day) for day in series.dates] == ['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05']
+    assert list(series.close) == [1.0, 2.0, 30.0, 40.0]
+    assert list(series.between('2024-01-03', '2024-01-04').close) == [2.0, 30.0]
+
+# ------------------------------------------------------------------------------
+# Test: matrices align symbols on the union of their dates, NaN where a bar is missing.
+# ------------------------------------------------------------------------------
+def test_matrices_align_symbols(tmp_path):
+    store = PriceStore(str(tmp_path))
+    fields = ('open', 'high', 'low', 'close', 'volume')
+    store.write('AAA', np.array(['2024-01-02', '2024-01-03'], dtype='datetime64[D]'), {field: np.array([1.0, 2.0]) for field in fields})
+    store.write('BBB', np.array(['2024-01-03', '2024-01-04'], dtype='datetime64[D]'), {field: np.array([5.0, 6.0]) for field in fields})
+
+    dates, values = store.matrices(['AAA', 'BBB', 'MISSING'], ('close', 'volume'))
+    assert [str(day) for day in dates] == ['2024-01-02', '2024-01-03', '2024-01-04']
+    np.testing.assert_array_equal(values['close'], [[1.0, np.nan, np.nan], [2.0, 5.0, np.nan], [np.nan, 6.0, np.nan]])
+    assert set(values) == {'close', 'volume'}
+
+# ------------------------------------------------------------------------------
+# Test: the consolidated panel matches matrices, is reused, and is rebuilt after a symbol changed.
+# ------------------------------------------------------------------------------
+def test_panel_is_reused_until_a_symbol_changes(tmp_path, monkeypatch):
+    store = PriceStore(str(tmp_path))
+    dates = np.arange(np.datetime64('2024-01-01'), np.datetime64('2024-03-01'), dtype='datetime64[D]')
+    for offset, symbol in enumerate(('AAA', 'BBB', 'CCC')):
+        columns = {field: np.arange(len(dates) - offset, dtype=np.float64) + offset for field in FIELDS}
+        store.write(symbol, dates[offset:], columns)
+
+    expected_dates, expected = store.matrices(['CCC', 'AAA'], ('close', 'volume'), '2024-01-02')
+    panel_dates, panel = store.panel(['ccc', 'aaa'], ('close', 'volume'), '2024-01-02')
+    assert store.symbols() == ['AAA', 'BBB', 'CCC']
+    np.testing.assert_array_equal(panel_dates, expected_dates)
+    np.testing.assert_array_equal(panel['close'], expected['close'])
+
+    # A fresh process reads the panel, not the symbols' files; later starts and subsets are covered
+    fresh = PriceStore(str(tmp_path))
+    monkeypatch.setattr(fresh, 'read', lambda *args: pytest.fail('panel was rebuilt'))
+    later_dates, later = fresh.panel(['CCC'], ('close',), '2024-02-01')
+    np.testing.assert_array_equal(later['close'][:, 0], expected['close'][expected_dates >= np.datetime64('2024-02-01'), 0])
+    monkeypatch.undo()
+
+    store.write('AAA', dates[-1:], {field: np.array([99.0]) for field in FIELDS})
+    _, rebuilt = PriceStore(str(tmp_path)).panel(['AAA', 'CCC'], ('close',), '2024-01-02')
+    assert rebuilt['close'][-1, 0] == 99.0
@@ -0,0 +1,63 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from price_store import FIELDS, PriceStore
+from screen import screen
+
+BARS = 300
+DATES = np.busday_offset(np.datetime64(date.today(), 'D'), np.arange(-BARS + 1, 1), roll='backward')
+
+
+def write(store, symbol, close, volume=1_000_000.0, dates=DATES):
+    close = np.asarray(close, dtype=np.float64)
+    columns = {field: close for field in FIELDS}
+    columns['volume'] = np.full(len(close), volume)
+    store.write(symbol, dates[-len(close):], columns)
+
+
+def trend(start, daily, noise=0.01, seed=0):
+    rng = np.random.default_rng(seed)
+    return start * np.exp(np.cumsum(daily + rng.normal(0, noise, BARS)))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PriceStore(str(tmp_path))
+    write(store, 'STRONG', trend(50, 0.003, seed=1))
+    write(store, 'STEADY', trend(50, 0.001, noise=0.005, seed=2))
+    write(store, 'WEAK', trend(50, -0.002, seed=3))
+    # Not eligible: too cheap, too illiquid, stopped trading, too short a history
+    write(store, 'PENNY', trend(1, 0.003, seed=4))
+    write(store, 'THIN', trend(50, 0.003, seed=5), volume=100.0)
+    write(store, 'HALTED', trend(50, 0.003, seed=6)[:-10], dates=DATES[:-10])
+    write(store, 'NEWCO', trend(50, 0.003, seed=7)[-100:])
+    return store
+
+# ------------------------------------------------------------------------------
+# Test: only liquid, current symbols with enough history and price are ranked.
+# ------------------------------------------------------------------------------
+def test_screen_leaves_out_ineligible_symbols(store):
+    candidates = screen(None, store, top_k=10)
+    assert {candidate['symbol'] for candidate in candidates} == {'STRONG', 'STEADY', 'WEAK'}
+
+# ------------------------------------------------------------------------------
+# Test: strong momentum ranks first, a downtrend last; top_k cuts the list.
+# ------------------------------------------------------------------------------
+def test_screen_ranks_by_momentum_and_trend(store):
+    candidates = screen(['strong', 'steady', 'weak', 'penny'], store, top_k=10)
+    assert [candidate['symbol'] for candidate in candidates] == ['STRONG', 'STEADY', 'WEAK']
+    assert candidates[0]['score'] > candidates[1]['score'] > candidates[2]['score']
+    assert 'uptrend' in candidates[0]['signals'] and 'uptrend' not in candidates[2]['signals']
+    assert candidates[0]['momentum_12_1'] > 0 > candidates[2]['momentum_12_1']
+
+    assert [candidate['symbol'] for candidate in screen(None, store, top_k=1)] == ['STRONG']
+
+# ------------------------------------------------------------------------------
+# Test: the liquidity and price thresholds can be changed per call.
+# ------------------------------------------------------------------------------
+def test_screen_thresholds(store):
+    symbols = {candidate['symbol'] for candidate in screen(None, store, top_k=10, min_price=0.5, min_dollar_volume=1_000.0)}
+    assert symbols == {'STRONG', 'STEADY', 'WEAK', 'PENNY', 'THIN'}
+    assert screen(['UNKNOWN'], store) == []
@@ -12,14 +12,22 @@ The interface includes:
 - A text input for the research query
 - A run button to start the research
 - A markdown display area for showing the results
+- A cancel button that stops the running research and its in-flight agent calls
+- An archive tab to search and reopen previously finished reports
+
+Runs are cancelled when the user presses Cancel, resubmits a query, or closes the tab.
 """
 
 # ---------------------------------------------------------------------------
 # Imports
 # ---------------------------------------------------------------------------
+import os
 import gradio as gr
 from dotenv import load_dotenv
 from research_manager import ResearchManager
+from prefetcher import FollowUpPrefetcher
+from research_archive import ResearchArchive
+from research_budget import ResearchBudget
 
 
 # ---------------------------------------------------------------------------
@@ -29,18 +37,42 @@ from research_manager import ResearchManager
 # variables in the shell. This keeps API keys and other secrets out of source.
 load_dotenv(override=True)
 
+# Optional background prefetching of follow-up questions. Set
+# RESEARCH_PREFETCH_TOP_N to the number of follow-ups to warm (0 disables it).
+PREFETCH_TOP_N = int(os.getenv("RESEARCH_PREFETCH_TOP_N", "0"))
+prefetcher = FollowUpPrefetcher(top_n=PREFETCH_TOP_N) if PREFETCH_TOP_N > 0 else None
+
+# Write long reports as an outline plus concurrently written sections.
+SECTIONED_WRITER = os.getenv("RESEARCH_SECTIONED_WRITER", "false").lower() == "true"
+
+# Number of searches on the raw query started while the planner runs (0 disables it).
+SPECULATIVE_SEARCHES = int(os.getenv("RESEARCH_SPECULATIVE_SEARCHES", "0"))
+
+# Maximum number of search waves; above 1 enables iterative deep research.
+MAX_WAVES = int(os.getenv("RESEARCH_MAX_WAVES", "1"))
+
+# Every finished report is archived; old reports are pruned at startup.
+archive = ResearchArchive()
+archive.apply_retention()
+
+# The research run currently in progress for each browser session, so that
+# resubmitting or closing the tab can cancel it.
+active_managers: dict[str, ResearchManager] = {}
+
 
 # ---------------------------------------------------------------------------
 # Core Functionality
 # ---------------------------------------------------------------------------
-async def run(query: str):
+async def run(query: str, request: gr.Request):
     """Execute the research pipeline for a given query.
 
     This coroutine handles the main research workflow by instantiating a
-    ResearchManager and streaming its output to the Gradio interface.
+    ResearchManager and streaming its output to the Gradio interface. A run
+    already in progress for the same browser session is cancelled first.
 
     Args:
         query (str): The research question/topic provided by the user.
+        request (gr.Request): The Gradio request, used to identify the session.
 
     Yields:
         str: Incremental chunks of markdown content produced by ResearchManager.
@@ -48,8 +80,70 @@ async def run(query: str):
     """
     # Instantiate a new ResearchManager and start the research pipeline.
     # We stream the output so the user sees partial results immediately.
-    async for chunk in ResearchManager().run(query):
-        yield chunk
+    manager = ResearchManager(
+        prefetcher=prefetcher,
+        sectioned_writer=SECTIONED_WRITER,
+        speculative_searches=SPECULATIVE_SEARCHES,
+        archive=archive,
+        budget=ResearchBudget(max_waves=MAX_WAVES) if MAX_WAVES > 1 else None,
+    )
+    session = request.session_hash
+    previous = active_managers.get(session)
+    if previous is not None:
+        previous.cancel()
+    active_managers[session] = manager
+    try:
+        async for chunk in manager.run(query):
+            yield chunk
+    finally:
+        if active_managers.get(session) is manager:
+            del active_managers[session]
+
+
+async def cancel_session_run(request: gr.Request) -> None:
+    """Cancel the research run of a session, e.g. when its tab is closed.
+
+    Args:
+        request (gr.Request): The Gradio request, used to identify the session.
+    """
+    manager = active_managers.pop(request.session_hash, None)
+    if manager is not None:
+        manager.cancel()
+
+
+def search_archive(text: str) -> str:
+    """Search the research archive and list the matching reports.
+
+    Args:
+        text (str): Free-text search input provided by the user.
+
+    Returns:
+        str: Markdown list of matching reports, best matches first.
+    """
+    hits = archive.search(text)
+    if not hits:
+        return "No archived reports found."
+    return "\n\n".join(
+        f"**#{hit.id}** · {hit.created_at:%Y-%m-%d} · {hit.query}\n\n{hit.short_summary}"
+        for hit in hits
+    )
+
+
+def open_archived_report(report_id: float | None) -> str:
+    """Load an archived report for display.
+
+    Args:
+        report_id (float | None): Archive id entered by the user (Gradio numbers are floats).
+
+    Returns:
+        str: The archived markdown report, or a message if it does not exist.
+    """
+    if report_id is None:
+        return "Enter a report number."
+    archived = archive.get(int(report_id))
+    if archived is None:
+        return f"Report #{int(report_id)} not found."
+    return archived.markdown_report
 
 
 # ---------------------------------------------------------------------------
@@ -60,28 +154,62 @@ with gr.Blocks(theme=gr.themes.Default(primary_hue="sky")) as ui:
     # Title section
     gr.Markdown("# Deep Research")
 
-    # Input section
-    query_textbox = gr.Textbox(
-        label="What topic would you like to research?"
-    )
-
-    # Action section
-    run_button = gr.Button(
-        "Run",
-        variant="primary"
-    )
-
-    # Output section
-    report = gr.Markdown(
-        label="Report"
-    )
+    with gr.Tab("Research"):
+        # Input section
+        query_textbox = gr.Textbox(
+            label="What topic would you like to research?"
+        )
+
+        # Action section
+        run_button = gr.Button(
+            "Run",
+            variant="primary"
+        )
+        cancel_button = gr.Button(
+            "Cancel"
+        )
+
+        # Output section
+        report = gr.Markdown(
+            label="Report"
+        )
     
-    # Event handlers
-    # Wire the UI widgets to the `run` coroutine:
-    # - Clicking the button triggers the research
-    # - Pressing ENTER inside the textbox does the same
-    run_button.click(fn=run, inputs=query_textbox, outputs=report)
-    query_textbox.submit(fn=run, inputs=query_textbox, outputs=report)
+        # Event handlers
+        # Wire the UI widgets to the `run` coroutine:
+        # - Clicking the button triggers the research
+        # - Pressing ENTER inside the textbox does the same
+        # - Resubmitting starts a new run, which cancels the previous one
+        # - Cancel stops the run and every in-flight agent call
+        run_event = run_button.click(fn=run, inputs=query_textbox, outputs=report, trigger_mode="multiple")
+        submit_event = query_textbox.submit(fn=run, inputs=query_textbox, outputs=report, trigger_mode="multiple")
+        cancel_button.click(fn=cancel_session_run, cancels=[run_event, submit_event])
+
+    with gr.Tab("Archive"):
+        # Search section
+        archive_textbox = gr.Textbox(
+            label="Search previously researched reports"
+        )
+        archive_results = gr.Markdown(
+            label="Matches"
+        )
+
+        # Report section
+        report_id_number = gr.Number(
+            label="Report #",
+            precision=0
+        )
+        open_button = gr.Button(
+            "Open report"
+        )
+        archived_report = gr.Markdown(
+            label="Archived report"
+        )
+
+        archive_textbox.submit(fn=search_archive, inputs=archive_textbox, outputs=archive_results)
+        open_button.click(fn=open_archived_report, inputs=report_id_number, outputs=archived_report)
+
+    # Closing the browser tab cancels the session's research run
+    ui.unload(cancel_session_run)
 
 # Launch the app in the user's default web browser
 ui.launch(inbrowser=True)
@@ -0,0 +1,78 @@
+# ---------------------------------------------------------------------------
+# Description
+# ---------------------------------------------------------------------------
+"""
+Gap Agent Module
+
+This module defines a GapAgent used by iterative deep research. After a search
+wave it reviews the collected summaries, estimates how well they cover the
+query, and plans the next wave of searches for the gaps that remain.
+
+Place in the overall pipeline:
+1. PlannerAgent and SearchAgent produce the first wave of search summaries
+2. GapAgent estimates coverage and proposes follow-up searches
+3. ResearchBudget decides whether the next wave is worth its cost
+"""
+
+# ---------------------------------------------------------------------------
+# Imports
+# ---------------------------------------------------------------------------
+from pydantic import BaseModel, Field
+from agents import Agent
+from llm_model_selector import get_model
+from llm_helper import LLM_MODEL_NAME
+from planner_agent import WebSearchItem
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+# Maximum number of searches proposed for one follow-up wave
+MAX_GAP_SEARCHES = 3
+
+# Model configuration - gap analysis is a cheap, short call
+llm_model_to_use = get_model(LLM_MODEL_NAME.OPENAI)
+
+# System prompt instructions for the language model
+INSTRUCTIONS = (
+    "You are a research lead reviewing the work of a research assistant. You will be provided "
+    "with a query and the summaries of the web searches performed so far.\n"
+    "Estimate how completely the summaries answer the query as a coverage score between 0 and 1. "
+    "Then identify the most important gaps and propose at most "
+    f"{MAX_GAP_SEARCHES} new web searches that would fill them, together with the coverage "
+    "you expect those searches to add. Do not repeat searches that were already performed. "
+    "If the query is already well covered, propose no searches and an expected gain of 0."
+)
+
+
+# ---------------------------------------------------------------------------
+# Data Models
+# ---------------------------------------------------------------------------
+class GapAnalysis(BaseModel):
+    """Assessment of the research so far and the searches that would improve it.
+
+    Attributes:
+        coverage (float): How completely the results answer the query (0-1)
+        expected_gain (float): Coverage the proposed searches are expected to add (0-1)
+        searches (list[WebSearchItem]): Searches that would fill the remaining gaps
+    """
+    coverage: float = Field(
+        description="How completely the search results answer the query, from 0 to 1."
+    )
+    expected_gain: float = Field(
+        description="How much coverage the proposed searches are expected to add, from 0 to 1."
+    )
+    searches: list[WebSearchItem] = Field(
+        description="New web searches that would fill the most important gaps."
+    )
+
+
+# ---------------------------------------------------------------------------
+# Agent Configuration
+# ---------------------------------------------------------------------------
+gap_agent = Agent(
+    name="GapAgent",            # Name used for logging/tracing
+    instructions=INSTRUCTIONS,  # System prompt for the language model
+    model=llm_model_to_use,     # Language model to use
+    output_type=GapAnalysis,    # Output parsed into this type via JSON schema
+)
@@ -0,0 +1,145 @@
+# ---------------------------------------------------------------------------
+# Description
+# ---------------------------------------------------------------------------
+"""
+Follow-Up Prefetcher Module
+
+This module provides an optional background worker that speculatively researches
+the follow-up questions of a finished report. Users frequently click into one of
+the suggested follow-ups, so planning and searching for them ahead of time lets
+the next run hit the plan and search caches and skip straight to writing.
+
+Rules for speculative work:
+- It only runs while no interactive research run is active
+- It issues one agent call at a time, so it never bursts against rate limits
+- It stops once its call budget is spent
+- Any new interactive run cancels it immediately
+"""
+
+# ---------------------------------------------------------------------------
+# Imports
+# ---------------------------------------------------------------------------
+import asyncio
+from contextlib import asynccontextmanager
+
+from research_cache import plan_cache, search_cache
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+# Number of follow-up questions to prefetch per report
+DEFAULT_TOP_N = 2
+
+# Maximum number of agent calls (plans + searches) spent per report
+DEFAULT_MAX_CALLS = 8
+
+# Seconds of idleness required before each speculative call
+DEFAULT_IDLE_DELAY = 2.0
+
+
+# ---------------------------------------------------------------------------
+# Prefetcher Class
+# ---------------------------------------------------------------------------
+class FollowUpPrefetcher:
+    """Warms the plan and search caches for the follow-ups of a delivered report.
+
+    A single prefetcher instance is shared by every ResearchManager so it can
+    see when interactive runs are in progress.
+
+    Attributes:
+        top_n (int): Number of follow-up questions to prefetch
+        max_calls (int): Agent-call budget per scheduled report
+        idle_delay (float): Seconds to wait for idle capacity between calls
+        calls_spent (int): Agent calls made by the current prefetch job
+    """
+
+    def __init__(
+        self,
+        top_n: int = DEFAULT_TOP_N,
+        max_calls: int = DEFAULT_MAX_CALLS,
+        idle_delay: float = DEFAULT_IDLE_DELAY,
+    ):
+        self.top_n = top_n
+        self.max_calls = max_calls
+        self.idle_delay = idle_delay
+        self.calls_spent = 0
+        self._active_runs = 0
+        self._task: asyncio.Task | None = None
+
+    @asynccontextmanager
+    async def interactive(self):
+        """Mark an interactive run as active for the duration of the block.
+
+        Entering the block cancels any speculative work so interactive runs
+        get the full rate-limit capacity.
+        """
+        self._active_runs += 1
+        self.cancel()
+        try:
+            yield
+        finally:
+            self._active_runs -= 1
+
+    def schedule(self, manager, follow_up_questions: list[str]) -> None:
+        """Start prefetching the top follow-up questions in the background.
+
+        Args:
+            manager (ResearchManager): Manager whose plan/search methods fill the caches
+            follow_up_questions (list[str]): Follow-ups suggested by the writer
+        """
+        self.cancel()
+        questions = follow_up_questions[: self.top_n]
+        if not questions or self.max_calls <= 0:
+            return
+        self.calls_spent = 0
+        self._task = asyncio.create_task(self._prefetch(manager, questions))
+
+    def cancel(self) -> None:
+        """Cancel the running prefetch job, if any."""
+        if self._task is not None and not self._task.done():
+            print("Cancelling follow-up prefetch")
+            self._task.cancel()
+        self._task = None
+
+    async def _wait_until_idle(self) -> None:
+        """Block until no interactive run has been active for idle_delay seconds."""
+        await asyncio.sleep(self.idle_delay)
+        while self._active_runs:
+            await asyncio.sleep(self.idle_delay)
+
+    def _has_budget(self) -> bool:
+        return self.calls_spent < self.max_calls
+
+    async def _prefetch(self, manager, questions: list[str]) -> None:
+        """Plan and search each follow-up one call at a time within the budget.
+
+        Args:
+            manager (ResearchManager): Manager used to plan and search
+            questions (list[str]): Follow-up questions to prefetch
+        """
+        try:
+            for question in questions:
+                search_plan = plan_cache.get(question)
+                if search_plan is None:
+                    if not self._has_budget():
+                        break
+                    await self._wait_until_idle()
+                    self.calls_spent += 1
+                    search_plan = await manager.plan_searches(question)
+
+                for item in search_plan.searches:
+                    if item.query in search_cache:
+                        continue
+                    if not self._has_budget():
+                        break
+                    await self._wait_until_idle()
+                    self.calls_spent += 1
+                    await manager.search(item)
+            print(f"Follow-up prefetch finished after {self.calls_spent} calls")
+        except asyncio.CancelledError:
+            print(f"Follow-up prefetch cancelled after {self.calls_spent} calls")
+            raise
+        except Exception as e:
+            # Nobody awaits this task, so report the failure instead of losing it
+            print(f"Follow-up prefetch failed after {self.calls_spent} calls: {e}")
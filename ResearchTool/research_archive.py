@@ -0,0 +1,295 @@
+# ---------------------------------------------------------------------------
+# Description
+# ---------------------------------------------------------------------------
+"""
+Research Archive Module
+
+This module persists every finished report together with its search plan and
+search summaries in a local SQLite database, so questions that were already
+researched can be looked up in milliseconds instead of re-running the pipeline.
+
+Storage layout:
+- reports     → one row per report; the full payload is zlib-compressed JSON
+- reports_fts → a contentless FTS5 index over query, summary and report text
+
+Because the FTS5 table is contentless, the report text is only stored once
+(compressed); the index holds just the search terms. Retention and compaction
+are applied with apply_retention() and compact().
+"""
+
+# ---------------------------------------------------------------------------
+# Imports
+# ---------------------------------------------------------------------------
+import json
+import os
+import re
+import sqlite3
+import time
+import zlib
+from contextlib import closing
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+# Location of the SQLite database file
+ARCHIVE_PATH = os.getenv("RESEARCH_ARCHIVE_PATH", "research_archive.db")
+
+# Retention policy: reports older than this many days are deleted ...
+RETENTION_DAYS = 180
+# ... and only the newest MAX_REPORTS are kept
+MAX_REPORTS = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id            INTEGER PRIMARY KEY,
+    query         TEXT NOT NULL,
+    short_summary TEXT NOT NULL,
+    created_at    REAL NOT NULL,
+    payload       BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_created_at ON reports(created_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(
+    query, short_summary, body, content=''
+);
+"""
+
+
+# ---------------------------------------------------------------------------
+# Data Models
+# ---------------------------------------------------------------------------
+class ArchiveHit(BaseModel):
+    """A single search result from the archive.
+
+    Attributes:
+        id (int): Archive id of the report
+        query (str): The research query the report answered
+        short_summary (str): The report's short summary
+        created_at (datetime): When the report was archived
+    """
+    id: int = Field(description="Archive id of the report.")
+    query: str = Field(description="The research query the report answered.")
+    short_summary: str = Field(description="The report's short summary.")
+    created_at: datetime = Field(description="When the report was archived.")
+
+
+class ArchivedReport(ArchiveHit):
+    """A complete archived report with the material it was written from.
+
+    Attributes:
+        markdown_report (str): The full markdown report
+        follow_up_questions (list[str]): Suggested topics for further research
+        search_plan (list[dict]): The planned searches (query and reason)
+        search_results (list[str]): The search summaries the report was written from
+    """
+    markdown_report: str = Field(description="The full markdown report.")
+    follow_up_questions: list[str] = Field(description="Suggested topics to research further.")
+    search_plan: list[dict] = Field(description="The planned searches.")
+    search_results: list[str] = Field(description="The search summaries used for the report.")
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def to_match_expression(text: str) -> str:
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Every word is quoted so user input cannot inject FTS5 syntax, and words
+    are OR-ed so partially matching reports are still found (ranked by bm25).
+
+    Args:
+        text (str): Free-text search input
+
+    Returns:
+        str: An FTS5 MATCH expression, empty if the text has no words
+    """
+    words = re.findall(r"\w+", text.lower())
+    return " OR ".join(f'"{word}"' for word in words)
+
+
+# ---------------------------------------------------------------------------
+# Archive Class
+# ---------------------------------------------------------------------------
+class ResearchArchive:
+    """Compressed, full-text searchable store of finished research reports.
+
+    Attributes:
+        path (str): Path of the SQLite database file
+    """
+
+    def __init__(self, path: str = ARCHIVE_PATH):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call keeps the archive safe to use from any thread
+        return sqlite3.connect(self.path)
+
+    def save(
+        self,
+        query: str,
+        report,
+        search_plan=None,
+        search_results: list[str] | None = None,
+    ) -> int:
+        """Archive a finished report.
+
+        Args:
+            query (str): The research query
+            report (ReportData): The finished report
+            search_plan (WebSearchPlan | None): The plan the report was based on
+            search_results (list[str] | None): The search summaries used
+
+        Returns:
+            int: The archive id of the stored report
+        """
+        payload = {
+            "markdown_report": report.markdown_report,
+            "follow_up_questions": report.follow_up_questions,
+            "search_plan": [item.model_dump() for item in search_plan.searches] if search_plan else [],
+            "search_results": search_results or [],
+        }
+        compressed = zlib.compress(json.dumps(payload).encode("utf-8"), level=9)
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO reports (query, short_summary, created_at, payload) VALUES (?, ?, ?, ?)",
+                (query, report.short_summary, time.time(), compressed),
+            )
+            report_id = cursor.lastrowid
+            conn.execute(
+                "INSERT INTO reports_fts (rowid, query, short_summary, body) VALUES (?, ?, ?, ?)",
+                (report_id, query, report.short_summary, self._index_body(payload)),
+            )
+        print(f"Archived report {report_id} ({len(compressed)} bytes compressed)")
+        return report_id
+
+    def search(self, text: str, limit: int = 10) -> list[ArchiveHit]:
+        """Find archived reports matching free text, best matches first.
+
+        Args:
+            text (str): Free-text search input
+            limit (int): Maximum number of hits to return
+
+        Returns:
+            list[ArchiveHit]: Matching reports ranked by bm25 relevance
+        """
+        expression = to_match_expression(text)
+        if not expression:
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT r.id, r.query, r.short_summary, r.created_at
+                FROM reports_fts f JOIN reports r ON r.id = f.rowid
+                WHERE reports_fts MATCH ?
+                ORDER BY bm25(reports_fts)
+                LIMIT ?
+                """,
+                (expression, limit),
+            ).fetchall()
+        return [self._to_hit(row) for row in rows]
+
+    def get(self, report_id: int) -> ArchivedReport | None:
+        """Load a complete archived report.
+
+        Args:
+            report_id (int): The archive id of the report
+
+        Returns:
+            ArchivedReport | None: The report, or None if it does not exist
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, query, short_summary, created_at, payload FROM reports WHERE id = ?",
+                (report_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        payload = json.loads(zlib.decompress(row[4]))
+        return ArchivedReport(**self._to_hit(row[:4]).model_dump(), **payload)
+
+    def delete(self, report_ids: list[int]) -> int:
+        """Delete reports and remove them from the full-text index.
+
+        Args:
+            report_ids (list[int]): Archive ids of the reports to delete
+
+        Returns:
+            int: Number of reports deleted
+        """
+        deleted = 0
+        with closing(self._connect()) as conn, conn:
+            for report_id in report_ids:
+                row = conn.execute(
+                    "SELECT query, short_summary, payload FROM reports WHERE id = ?",
+                    (report_id,),
+                ).fetchone()
+                if row is None:
+                    continue
+                # Contentless FTS5 tables need the original values to delete a row
+                payload = json.loads(zlib.decompress(row[2]))
+                conn.execute(
+                    "INSERT INTO reports_fts (reports_fts, rowid, query, short_summary, body) "
+                    "VALUES ('delete', ?, ?, ?, ?)",
+                    (report_id, row[0], row[1], self._index_body(payload)),
+                )
+                conn.execute("DELETE FROM reports WHERE id = ?", (report_id,))
+                deleted += 1
+        return deleted
+
+    def apply_retention(
+        self,
+        max_age_days: float = RETENTION_DAYS,
+        max_reports: int = MAX_REPORTS,
+    ) -> int:
+        """Delete reports that are too old or beyond the newest max_reports.
+
+        Args:
+            max_age_days (float): Maximum age of a report in days
+            max_reports (int): Maximum number of reports to keep
+
+        Returns:
+            int: Number of reports deleted
+        """
+        cutoff = time.time() - max_age_days * 24 * 60 * 60
+        with closing(self._connect()) as conn:
+            expired = conn.execute(
+                """
+                SELECT id FROM reports
+                WHERE created_at < ?
+                   OR id NOT IN (SELECT id FROM reports ORDER BY created_at DESC LIMIT ?)
+                """,
+                (cutoff, max_reports),
+            ).fetchall()
+        deleted = self.delete([row[0] for row in expired])
+        if deleted:
+            print(f"Archive retention removed {deleted} reports")
+            self.compact()
+        return deleted
+
+    def compact(self) -> None:
+        """Merge the FTS5 index segments and reclaim free pages on disk."""
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("INSERT INTO reports_fts (reports_fts) VALUES ('optimize')")
+            conn.execute("VACUUM")
+
+    @staticmethod
+    def _index_body(payload: dict) -> str:
+        # Text indexed for a report; must be reproducible for deletion
+        planned = " ".join(item["query"] for item in payload["search_plan"])
+        return f"{payload['markdown_report']}\n{planned}"
+
+    @staticmethod
+    def _to_hit(row) -> ArchiveHit:
+        report_id, query, short_summary, created_at = row
+        return ArchiveHit(
+            id=report_id,
+            query=query,
+            short_summary=short_summary,
+            created_at=datetime.fromtimestamp(created_at),
+        )
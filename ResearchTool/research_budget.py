@@ -0,0 +1,131 @@
+# ---------------------------------------------------------------------------
+# Description
+# ---------------------------------------------------------------------------
+"""
+Research Budget Module
+
+This module provides the budget controller for iterative deep research. After
+each search wave a gap-analysis step estimates how well the collected results
+cover the query; the controller decides whether another wave is worth paying for.
+
+A further wave is only allowed while:
+- total tokens, wall time and number of waves stay below their caps
+- the previous wave improved coverage by at least min_gain
+- the gap analysis expects the next wave to add at least min_gain
+"""
+
+# ---------------------------------------------------------------------------
+# Imports
+# ---------------------------------------------------------------------------
+import time
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+DEFAULT_MAX_TOKENS = 250_000
+DEFAULT_MAX_SECONDS = 10 * 60
+DEFAULT_MAX_WAVES = 3
+
+# Minimum coverage improvement (0-1 scale) that justifies another wave
+DEFAULT_MIN_GAIN = 0.1
+
+
+# ---------------------------------------------------------------------------
+# Budget Controller Class
+# ---------------------------------------------------------------------------
+class ResearchBudget:
+    """Caps tokens, wall time and search waves of an iterative research run.
+
+    Attributes:
+        max_tokens (int): Maximum total tokens spent by the run
+        max_seconds (float): Maximum wall time of the run
+        max_waves (int): Maximum number of search waves, including the first
+        min_gain (float): Minimum coverage gain per wave to keep going
+        waves (int): Number of search waves completed so far
+        coverage (float): Latest coverage estimate between 0 and 1
+        stop_reason (str | None): Why the controller stopped the run, if it did
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        max_seconds: float = DEFAULT_MAX_SECONDS,
+        max_waves: int = DEFAULT_MAX_WAVES,
+        min_gain: float = DEFAULT_MIN_GAIN,
+    ):
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.max_waves = max_waves
+        self.min_gain = min_gain
+        self.start()
+
+    def start(self) -> None:
+        """Reset the controller at the beginning of a run."""
+        self.started_at = time.monotonic()
+        self.waves = 0
+        self.coverage = 0.0
+        self.stop_reason = None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the run started."""
+        return time.monotonic() - self.started_at
+
+    def record_wave(self) -> None:
+        """Record that a search wave has completed."""
+        self.waves += 1
+
+    def allows_gap_analysis(self, tokens_used: int) -> bool:
+        """Check the hard caps before spending a call on gap analysis.
+
+        Args:
+            tokens_used (int): Total tokens spent by the run so far
+
+        Returns:
+            bool: True if another wave is still possible within the caps
+        """
+        if self.waves >= self.max_waves:
+            self.stop_reason = f"reached {self.max_waves} waves"
+        elif tokens_used >= self.max_tokens:
+            self.stop_reason = f"used {tokens_used} of {self.max_tokens} tokens"
+        elif self.elapsed >= self.max_seconds:
+            self.stop_reason = f"ran {self.elapsed:.0f}s of {self.max_seconds:.0f}s"
+        return self.stop_reason is None
+
+    def remaining_searches(self, tokens_used: int, searches_done: int) -> int:
+        """Estimate how many more searches the remaining tokens pay for.
+
+        The estimate uses the average tokens spent per search so far, including
+        planning and gap analysis, so it errs on the side of fewer searches.
+
+        Args:
+            tokens_used (int): Total tokens spent by the run so far
+            searches_done (int): Number of searches performed so far
+
+        Returns:
+            int: Number of further searches that fit into max_tokens
+        """
+        if tokens_used <= 0 or searches_done <= 0:
+            # Nothing spent yet, so there is no cost to extrapolate from
+            return self.max_tokens
+        per_search = tokens_used / searches_done
+        return max(0, int((self.max_tokens - tokens_used) / per_search))
+
+    def allows_next_wave(self, coverage: float, expected_gain: float) -> bool:
+        """Decide from a gap analysis whether the next wave is worth running.
+
+        Args:
+            coverage (float): Estimated coverage of the results so far (0-1)
+            expected_gain (float): Estimated coverage the next wave would add (0-1)
+
+        Returns:
+            bool: True if the next wave should run
+        """
+        gain = coverage - self.coverage
+        self.coverage = coverage
+        if self.waves > 1 and gain < self.min_gain:
+            self.stop_reason = f"last wave only improved coverage by {gain:.2f}"
+        elif expected_gain < self.min_gain:
+            self.stop_reason = f"next wave expected to add only {expected_gain:.2f}"
+        return self.stop_reason is None
@@ -0,0 +1,151 @@
+# ---------------------------------------------------------------------------
+# Description
+# ---------------------------------------------------------------------------
+"""
+Research Cache Module
+
+This module provides small in-process caches shared by every ResearchManager
+instance. Because the Gradio app creates a fresh ResearchManager per query,
+the caches live at module level so that work done by one run (or by the
+background prefetcher) can be reused by the next one.
+
+Two caches are exposed:
+- plan_cache   → research query  → WebSearchPlan
+- search_cache → search term     → search summary (str)
+
+Keys are normalized with normalize_query() so trivial differences in case and
+whitespace still hit the same entry. query_similarity() compares search terms
+so near-duplicate searches can be dropped before they are paid for.
+"""
+
+# ---------------------------------------------------------------------------
+# Imports
+# ---------------------------------------------------------------------------
+import re
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+# How long cached plans and search summaries stay valid (seconds)
+PLAN_CACHE_TTL = 60 * 60
+SEARCH_CACHE_TTL = 60 * 60
+
+# Upper bound on entries per cache; the least recently used entry is evicted
+MAX_CACHE_ENTRIES = 512
+
+# Search terms at least this similar are treated as the same search
+SIMILARITY_THRESHOLD = 0.6
+
+# Filler words ignored when comparing search terms
+STOPWORDS = frozenset(
+    "a an and are for how in is of on the to what which who why with".split()
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def normalize_query(text: str) -> str:
+    """Normalize a query so equivalent inputs map to the same cache key.
+
+    Args:
+        text (str): The raw query or search term
+
+    Returns:
+        str: Lower-cased text with punctuation stripped and whitespace collapsed
+    """
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def query_similarity(first: str, second: str) -> float:
+    """Jaccard similarity of the significant words of two search terms.
+
+    Args:
+        first (str): A search term
+        second (str): Another search term
+
+    Returns:
+        float: Similarity between 0.0 (disjoint) and 1.0 (same words)
+    """
+    first_words = set(normalize_query(first).split()) - STOPWORDS
+    second_words = set(normalize_query(second).split()) - STOPWORDS
+    if not first_words or not second_words:
+        return float(first_words == second_words)
+    return len(first_words & second_words) / len(first_words | second_words)
+
+
+def is_similar_query(first: str, second: str) -> bool:
+    """Return True if two search terms would most likely return the same results."""
+    return query_similarity(first, second) >= SIMILARITY_THRESHOLD
+
+
+# ---------------------------------------------------------------------------
+# Cache Class
+# ---------------------------------------------------------------------------
+class TTLCache:
+    """A small LRU cache whose entries expire after a fixed time-to-live.
+
+    Attributes:
+        ttl_seconds (float): Lifetime of an entry in seconds
+        max_entries (int): Maximum number of entries kept before evicting
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = MAX_CACHE_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value for a key, or None if missing or expired.
+
+        Args:
+            key (str): The raw (un-normalized) key
+
+        Returns:
+            Any | None: The cached value if present and fresh
+        """
+        key = normalize_query(key)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value under a key, evicting the oldest entry if full.
+
+        Args:
+            key (str): The raw (un-normalized) key
+            value (Any): The value to cache
+        """
+        key = normalize_query(key)
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        self._entries.clear()
+
+
+# ---------------------------------------------------------------------------
+# Shared Instances
+# ---------------------------------------------------------------------------
+plan_cache = TTLCache(PLAN_CACHE_TTL)
+search_cache = TTLCache(SEARCH_CACHE_TTL)
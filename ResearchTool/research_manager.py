@@ -9,6 +9,8 @@ components to perform an end-to-end research workflow. It coordinates:
 
 1. PlannerAgent → turns a user query into targeted web-searches
 2. SearchAgent  → executes each search and returns concise summaries
+   (optionally in several waves: GapAgent plans each further wave and
+   ResearchBudget decides whether it is worth its cost)
 3. WriterAgent  → synthesizes the summaries into a long-form markdown report
 4. EmailAgent   → sends the finished report via email
 
@@ -21,13 +23,58 @@ asynchronously to maximize throughput.
 # Imports
 # ---------------------------------------------------------------------------
 import asyncio
-from agents import Runner, trace, gen_trace_id
+from contextlib import nullcontext
+from agents import Runner, RunHooks, Usage, trace, gen_trace_id
 
 from search_agent import get_search_agent
 from planner_agent import planner_agent, WebSearchItem, WebSearchPlan
-from writer_agent import writer_agent, ReportData
+from writer_agent import (
+    writer_agent, outline_agent, section_writer_agent, editor_agent,
+    ReportData, ReportOutline, ReportSection, ReportFraming, SectionEdit,
+)
 from email_agent import email_agent
 from llm_helper import LLM_MODEL_NAME
+from research_cache import plan_cache, search_cache, is_similar_query
+from prefetcher import FollowUpPrefetcher
+from research_archive import ResearchArchive
+from gap_agent import gap_agent, GapAnalysis, MAX_GAP_SEARCHES
+from research_budget import ResearchBudget
+
+
+# ---------------------------------------------------------------------------
+# Usage Tracking
+# ---------------------------------------------------------------------------
+class UsageHooks(RunHooks):
+    """Adds the usage of every model response to a shared Usage as it arrives.
+
+    Recording per response instead of per finished agent run keeps the usage of
+    runs that are cancelled half-way, e.g. a search agent after its first turn.
+
+    Attributes:
+        usage (Usage): The usage every response is added to
+        in_flight (int): Estimated input tokens of the model request in progress, 0 if none
+    """
+
+    def __init__(self, usage: Usage):
+        self.usage = usage
+        self.in_flight = 0
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        # Rough estimate (4 characters per token), only used if the request is aborted
+        self.in_flight = max(1, (len(system_prompt or "") + len(str(input_items))) // 4)
+
+    async def on_llm_end(self, context, agent, response) -> None:
+        self.in_flight = 0
+        self.usage.add(response.usage)
+
+    def record_aborted(self) -> None:
+        """Count a request that was cancelled before its response arrived.
+
+        Its prompt was already sent, so the estimated input tokens are added.
+        """
+        if self.in_flight:
+            self.usage.add(Usage(requests=1, input_tokens=self.in_flight, total_tokens=self.in_flight))
+            self.in_flight = 0
 
 
 # ---------------------------------------------------------------------------
@@ -39,8 +86,39 @@ class ResearchManager:
     This class coordinates the interaction between different agents to perform
     comprehensive research on a given query. It handles the complete pipeline from
     planning searches to sending the final report via email.
+
+    Attributes:
+        prefetcher (FollowUpPrefetcher | None): Optional background prefetcher that
+            researches the report's follow-up questions once the run is finished
+        sectioned_writer (bool): Write the report as an outline plus concurrently
+            written sections instead of a single writer call
+        speculative_searches (int): Number of searches derived from the raw query
+            that are started while the planner is still running (0 disables it)
+        archive (ResearchArchive | None): Optional archive every finished report,
+            with its plan and search summaries, is saved to
+        budget (ResearchBudget | None): Enables iterative research; further search
+            waves are planned from a gap analysis while the budget allows it
+        usage (Usage): Token usage of every model call in this run, including the
+            completed turns and aborted requests of cancelled agent calls
     """
 
+    def __init__(
+        self,
+        prefetcher: FollowUpPrefetcher | None = None,
+        sectioned_writer: bool = False,
+        speculative_searches: int = 0,
+        archive: ResearchArchive | None = None,
+        budget: ResearchBudget | None = None,
+    ):
+        self.prefetcher = prefetcher
+        self.sectioned_writer = sectioned_writer
+        self.speculative_searches = speculative_searches
+        self.archive = archive
+        self.budget = budget
+        self.usage = Usage()
+        self._run_task: asyncio.Task | None = None
+        self._pending_tasks: set[asyncio.Task] = set()
+
     async def run(self, query: str):
         """Execute the complete research process.
 
@@ -51,25 +129,129 @@ class ResearchManager:
             str: Status updates and the final markdown report as they become available
         """
         trace_id = gen_trace_id()  # Generate a unique trace ID for the research process
-        with trace("Research trace", trace_id=trace_id):
-            # Print the trace link and yield initial status
-            print(f"View trace: https://platform.openai.com/traces/trace?trace_id={trace_id}")
-            yield f"View trace: https://platform.openai.com/traces/trace?trace_id={trace_id}"
-            
-            # Execute the research pipeline
-            print("Starting research...")
-            search_plan = await self.plan_searches(query)
-            yield "Searches planned, starting to search..."  
-            self.search_agent = get_search_agent(LLM_MODEL_NAME.GEMINI)
-            search_results = await self.perform_searches(search_plan)
-            yield "Searches complete, writing report..."
-            
-            report = await self.write_report(query, search_results)
-            yield "Report written, sending email..."
-            
-            await self.send_email(report)
-            yield "Email sent, research complete"
-            yield report.markdown_report
+        # Remember the task driving this generator so cancel() can stop it
+        self._run_task = asyncio.current_task()
+        if self.budget:
+            self.budget.start()
+        # Interactive runs pause any speculative prefetching for their duration
+        async with self.prefetcher.interactive() if self.prefetcher else nullcontext():
+            with trace("Research trace", trace_id=trace_id):
+                try:
+                    # Print the trace link and yield initial status
+                    print(f"View trace: https://platform.openai.com/traces/trace?trace_id={trace_id}")
+                    yield f"View trace: https://platform.openai.com/traces/trace?trace_id={trace_id}"
+                    
+                    # Execute the research pipeline
+                    print("Starting research...")
+                    search_plan, speculative_tasks = await self.plan_with_speculation(query)
+                    yield "Searches planned, starting to search..."  
+                    self.search_agent = get_search_agent(LLM_MODEL_NAME.GEMINI)
+                    search_results = await self.perform_searches(search_plan, speculative_tasks)
+                    # Every search of every wave, so the archive holds the full plan
+                    searched = list(search_plan.searches)
+
+                    # Iterative mode: keep searching for gaps while it pays off
+                    if self.budget:
+                        self.budget.record_wave()
+                        while self.budget.allows_gap_analysis(self.usage.total_tokens):
+                            next_plan = await self.plan_next_wave(query, search_results, searched)
+                            if next_plan is None:
+                                break
+                            yield (
+                                f"Coverage {self.budget.coverage:.0%}, "
+                                f"searching {len(next_plan.searches)} gaps..."
+                            )
+                            search_results += await self.perform_searches(next_plan)
+                            searched += next_plan.searches
+                            self.budget.record_wave()
+                        print(f"Stopped after {self.budget.waves} waves: {self.budget.stop_reason}")
+                    yield "Searches complete, writing report..."
+                    
+                    report = await self.write_report(query, search_results)
+                    if self.archive:
+                        await asyncio.to_thread(
+                            self.archive.save, query, report, WebSearchPlan(searches=searched), search_results
+                        )
+                    yield "Report written, sending email..."
+                    
+                    await self.send_email(report)
+                    yield "Email sent, research complete"
+
+                    # Warm the caches for likely follow-ups once this run is idle
+                    if self.prefetcher:
+                        self.prefetcher.schedule(self, report.follow_up_questions)
+                    yield report.markdown_report
+                except asyncio.CancelledError:
+                    # The user cancelled: stop every in-flight call and wait until their usage is recorded
+                    await asyncio.gather(*self.cancel_pending_tasks(), return_exceptions=True)
+                    print(
+                        f"Research cancelled after {self.usage.requests} requests, "
+                        f"{self.usage.total_tokens} tokens"
+                    )
+                    raise
+                except GeneratorExit:
+                    # The UI went away: stop every in-flight call
+                    self.cancel_pending_tasks()
+                    print(
+                        f"Research cancelled after {self.usage.requests} requests, "
+                        f"{self.usage.total_tokens} tokens"
+                    )
+                    raise
+                finally:
+                    self._run_task = None
+
+    def cancel(self) -> None:
+        """Cancel the running research, including every in-flight agent call.
+
+        Cancelling the asyncio tasks also aborts their HTTP requests, since the
+        model clients are async. Usage of the model calls that already finished,
+        and an estimate for the aborted ones, is kept in self.usage.
+        """
+        self.cancel_pending_tasks()
+        if self._run_task is not None and not self._run_task.done():
+            self._run_task.cancel()
+
+    def cancel_pending_tasks(self) -> list[asyncio.Task]:
+        """Cancel every search task started by this manager that is still running.
+
+        Returns:
+            list[asyncio.Task]: The cancelled tasks
+        """
+        tasks = list(self._pending_tasks)
+        for task in tasks:
+            task.cancel()
+        return tasks
+
+    def start_task(self, coro) -> asyncio.Task:
+        """Start a tracked task so it can be cancelled together with the run.
+
+        Args:
+            coro: The coroutine to run
+
+        Returns:
+            asyncio.Task: The running task
+        """
+        task = asyncio.create_task(coro)
+        self._pending_tasks.add(task)
+        task.add_done_callback(self._pending_tasks.discard)
+        return task
+
+    async def run_agent(self, agent, input: str):
+        """Run an agent and add its token usage to this run's usage, also when cancelled.
+
+        Args:
+            agent (Agent): The agent to run
+            input (str): The input for the agent
+
+        Returns:
+            RunResult: The result of the agent run
+        """
+        hooks = UsageHooks(self.usage)
+        try:
+            return await Runner.run(agent, input, hooks=hooks)
+        except asyncio.CancelledError:
+            hooks.record_aborted()
+            raise
 
     async def plan_searches(self, query: str) -> WebSearchPlan:
         """Plan the set of searches to perform for the given query.
@@ -80,19 +262,143 @@ class ResearchManager:
         Returns:
             WebSearchPlan: A structured plan containing multiple search queries
         """
+        cached_plan = plan_cache.get(query)
+        if cached_plan is not None:
+            print(f"Using cached plan with {len(cached_plan.searches)} searches")
+            return cached_plan
+
         print("Planning searches...")
-        result = await Runner.run(
+        result = await self.run_agent(
             planner_agent,
             f"Query: {query}",
         )
         print(f"Will perform {len(result.final_output.searches)} searches")
-        return result.final_output_as(WebSearchPlan)
+        search_plan = result.final_output_as(WebSearchPlan)
+        plan_cache.set(query, search_plan)
+        return search_plan
+
+    async def plan_with_speculation(self, query: str) -> tuple[WebSearchPlan, list[asyncio.Task]]:
+        """Plan searches while a first wave of searches on the raw query already runs.
+
+        The speculative searches are started before the planner is called, so
+        planning latency overlaps with searching. When the plan arrives, planned
+        searches that are similar to a speculative one are dropped.
+
+        Args:
+            query (str): The research question to plan searches for
+
+        Returns:
+            tuple[WebSearchPlan, list[asyncio.Task]]: The reconciled plan and the
+                already running speculative search tasks
+        """
+        if not self.speculative_searches or query in plan_cache:
+            return await self.plan_searches(query), []
+
+        speculative_items = self.speculative_items(query)
+        print(f"Starting {len(speculative_items)} speculative searches while planning")
+        speculative_tasks = [self.start_task(self.search(item)) for item in speculative_items]
+        try:
+            search_plan = await self.plan_searches(query)
+        except BaseException:
+            for task in speculative_tasks:
+                task.cancel()
+            raise
+        return self.reconcile_plan(search_plan, speculative_items), speculative_tasks
+
+    def speculative_items(self, query: str) -> list[WebSearchItem]:
+        """Derive first-wave searches directly from the raw query.
+
+        Args:
+            query (str): The research question
+
+        Returns:
+            list[WebSearchItem]: Up to speculative_searches search items
+        """
+        items = [
+            WebSearchItem(query=query, reason="Speculative search on the original query."),
+            WebSearchItem(
+                query=f"{query} latest developments",
+                reason="Speculative search for recent developments on the original query.",
+            ),
+        ]
+        return items[: self.speculative_searches]
+
+    def reconcile_plan(self, search_plan: WebSearchPlan, already_searched: list[WebSearchItem]) -> WebSearchPlan:
+        """Drop planned searches that duplicate a search already started.
 
-    async def perform_searches(self, search_plan: WebSearchPlan) -> list[str]:
+        Args:
+            search_plan (WebSearchPlan): The plan returned by the planner
+            already_searched (list[WebSearchItem]): Searches already in flight
+
+        Returns:
+            WebSearchPlan: The plan without near-duplicate searches
+        """
+        kept = []
+        seen = list(already_searched)
+        for item in search_plan.searches:
+            if any(is_similar_query(item.query, other.query) for other in seen):
+                print(f"Skipping duplicate search: {item.query}")
+                continue
+            kept.append(item)
+            seen.append(item)
+        return WebSearchPlan(searches=kept)
+
+    async def plan_next_wave(
+        self,
+        query: str,
+        search_results: list[str],
+        searched: list[WebSearchItem],
+    ) -> WebSearchPlan | None:
+        """Run a gap analysis and plan the next search wave if the budget allows it.
+
+        Args:
+            query (str): The research question
+            search_results (list[str]): Search summaries collected so far
+            searched (list[WebSearchItem]): Searches already performed
+
+        Returns:
+            WebSearchPlan | None: The next wave, or None if research should stop
+        """
+        print("Analyzing gaps...")
+        input = (
+            f"Query: {query}\nSearches performed: {[item.query for item in searched]}\n"
+            f"Summarized search results: {search_results}"
+        )
+        result = await self.run_agent(
+            gap_agent,
+            input,
+        )
+        gaps = result.final_output_as(GapAnalysis)
+        if not self.budget.allows_next_wave(gaps.coverage, gaps.expected_gain):
+            return None
+        next_plan = self.reconcile_plan(WebSearchPlan(searches=gaps.searches), searched)
+        if not next_plan.searches:
+            self.budget.stop_reason = "no new searches proposed"
+            return None
+        # The prompt asks for at most MAX_GAP_SEARCHES, but the model may propose more
+        limit = min(
+            MAX_GAP_SEARCHES,
+            self.budget.remaining_searches(self.usage.total_tokens, len(searched)),
+        )
+        if limit <= 0:
+            self.budget.stop_reason = "no tokens left for further searches"
+            return None
+        if len(next_plan.searches) > limit:
+            print(f"Keeping {limit} of {len(next_plan.searches)} proposed gap searches")
+            next_plan = WebSearchPlan(searches=next_plan.searches[:limit])
+        return next_plan
+
+    async def perform_searches(
+        self,
+        search_plan: WebSearchPlan,
+        started_tasks: list[asyncio.Task] | None = None,
+    ) -> list[str]:
         """Execute all searches from the plan concurrently.
 
         Args:
             search_plan (WebSearchPlan): The plan containing search queries to execute
+            started_tasks (list[asyncio.Task] | None): Search tasks that are already
+                running (e.g. speculative searches) and whose results are collected too
 
         Returns:
             list[str]: List of search result summaries
@@ -104,7 +410,8 @@ class ResearchManager:
 
 
         num_completed = 0
-        tasks = [asyncio.create_task(self.search(item)) for item in search_plan.searches]
+        tasks = list(started_tasks or [])
+        tasks += [self.start_task(self.search(item)) for item in search_plan.searches]
         results = []
         
         for task in asyncio.as_completed(tasks):
@@ -126,13 +433,20 @@ class ResearchManager:
         Returns:
             str | None: Search result summary if successful, None if failed
         """
+        cached_summary = search_cache.get(item.query)
+        if cached_summary is not None:
+            print(f"Using cached search result for: {item.query}")
+            return cached_summary
+
         input = f"Search term: {item.query}\nReason for searching: {item.reason}"
         try:
-            result = await Runner.run(
+            result = await self.run_agent(
                 get_search_agent(LLM_MODEL_NAME.GEMINI),
                 input,
             )
-            return str(result.final_output)
+            summary = str(result.final_output)
+            search_cache.set(item.query, summary)
+            return summary
         except Exception:
             return None
     
@@ -146,17 +460,146 @@ class ResearchManager:
         Returns:
             ReportData: The complete report with summary and follow-up questions
         """
+        if self.sectioned_writer:
+            return await self.write_report_in_sections(query, search_results)
+
         print("Thinking about report...")
         input = f"Original query: {query}\nSummarized search results: {search_results}"
         print(f"writer_agent: {writer_agent}")
         print(f"writer_agent: {writer_agent.model.model}")
-        result = await Runner.run(
+        result = await self.run_agent(
             writer_agent,
             input,
         )
         print("Finished writing report")
         return result.final_output_as(ReportData)
+
+    async def write_report_in_sections(self, query: str, search_results: list[str]) -> ReportData:
+        """Generate a report from an outline whose sections are written concurrently.
+
+        One fast call produces the outline, every section is then written by its
+        own agent call in parallel, and a final consistency pass adds the
+        introduction, conclusion, summary and follow-up questions and returns
+        edits that reconcile the sections. Wall-clock time scales with the
+        longest section rather than the whole report. A section whose call fails
+        falls back to its assigned search results instead of failing the report.
+
+        Args:
+            query (str): The original research question
+            search_results (list[str]): List of search result summaries
+
+        Returns:
+            ReportData: The complete report with summary and follow-up questions
+        """
+        print("Outlining report...")
+        numbered_results = "\n\n".join(
+            f"[{index}] {summary}" for index, summary in enumerate(search_results)
+        )
+        result = await self.run_agent(
+            outline_agent,
+            f"Original query: {query}\nNumbered search results:\n{numbered_results}",
+        )
+        outline = result.final_output_as(ReportOutline)
+        print(f"Writing {len(outline.sections)} sections concurrently...")
+
+        # gather() keeps the sections in outline order regardless of finish order
+        sections = await asyncio.gather(
+            *(self.write_section(query, outline, section, search_results) for section in outline.sections),
+            return_exceptions=True,
+        )
+        for index, (section, written) in enumerate(zip(outline.sections, sections)):
+            if isinstance(written, BaseException):
+                if not isinstance(written, Exception):
+                    raise written
+                print(f"Section '{section.title}' failed ({written!r}), using its search results instead")
+                sections[index] = self.fallback_section(section, search_results)
+        draft = "\n\n".join(sections)
+
+        print("Editing report for consistency...")
+        result = await self.run_agent(
+            editor_agent,
+            f"Original query: {query}\nDraft report:\n{draft}",
+        )
+        framing = result.final_output_as(ReportFraming)
+        draft = self.apply_edits(draft, framing.edits)
+        print("Finished writing report")
+        return ReportData(
+            short_summary=framing.short_summary,
+            markdown_report=(
+                f"# {outline.title}\n\n{framing.introduction}\n\n{draft}"
+                f"\n\n## Conclusion\n\n{framing.conclusion}"
+            ),
+            follow_up_questions=framing.follow_up_questions,
+        )
+
+    async def write_section(
+        self,
+        query: str,
+        outline: ReportOutline,
+        section: ReportSection,
+        search_results: list[str],
+    ) -> str:
+        """Write a single report section from the search results assigned to it.
+
+        Args:
+            query (str): The original research question
+            outline (ReportOutline): The full outline, for context
+            section (ReportSection): The section to write
+            search_results (list[str]): List of all search result summaries
+
+        Returns:
+            str: The section in markdown, starting with its heading
+        """
+        assigned_results = [
+            search_results[index] for index in section.search_result_ids
+            if 0 <= index < len(search_results)
+        ]
+        section_titles = "\n".join(f"- {item.title}" for item in outline.sections)
+        input = (
+            f"Original query: {query}\nReport outline:\n{section_titles}\n"
+            f"Your section: {section.title}\nBrief: {section.brief}\n"
+            f"Assigned search results: {assigned_results}"
+        )
+        result = await self.run_agent(
+            section_writer_agent,
+            input,
+        )
+        return str(result.final_output)
     
+    def fallback_section(self, section: ReportSection, search_results: list[str]) -> str:
+        """Build a section from its assigned search results when writing it failed.
+
+        Args:
+            section (ReportSection): The section that could not be written
+            search_results (list[str]): List of all search result summaries
+
+        Returns:
+            str: The section in markdown, starting with its heading
+        """
+        assigned_results = [
+            search_results[index] for index in section.search_result_ids
+            if 0 <= index < len(search_results)
+        ]
+        body = "\n\n".join(assigned_results) or section.brief
+        return f"## {section.title}\n\n{body}"
+
+    def apply_edits(self, draft: str, edits: list[SectionEdit]) -> str:
+        """Apply the editor's corrections to the stitched sections.
+
+        Args:
+            draft (str): The stitched sections
+            edits (list[SectionEdit]): Passages to replace
+
+        Returns:
+            str: The draft with every edit whose passage was found applied once
+        """
+        for edit in edits:
+            if not edit.original or edit.original not in draft:
+                print(f"Skipping edit, passage not found: {edit.original[:60]!r}")
+                continue
+            draft = draft.replace(edit.original, edit.replacement, 1)
+        return draft
+
     async def send_email(self, report: ReportData) -> None:
         """Send the final report via email.
 
@@ -168,7 +611,7 @@ class ResearchManager:
         """
         print("Writing email...")
         print(f"email_agent: {email_agent.model.model}")
-        result = await Runner.run(
+        result = await self.run_agent(
             email_agent,
             report.markdown_report,
         )
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from research_cache import plan_cache, search_cache
+from prefetcher import FollowUpPrefetcher
+
+# ------------------------------------------------------------------------------
+# Fake manager: mimics ResearchManager.plan_searches/search and fills the caches
+# the same way the real methods do, without calling any model.
+# ------------------------------------------------------------------------------
+class FakeManager:
+    def __init__(self):
+        self.calls = []
+
+    async def plan_searches(self, query):
+        self.calls.append(("plan", query))
+        plan = SimpleNamespace(searches=[
+            SimpleNamespace(query=f"{query} a", reason="r"),
+            SimpleNamespace(query=f"{query} b", reason="r"),
+        ])
+        plan_cache.set(query, plan)
+        return plan
+
+    async def search(self, item):
+        self.calls.append(("search", item.query))
+        search_cache.set(item.query, f"summary of {item.query}")
+        return f"summary of {item.query}"
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    plan_cache.clear()
+    search_cache.clear()
+    yield
+    plan_cache.clear()
+    search_cache.clear()
+
+# ------------------------------------------------------------------------------
+# Test: prefetch plans and searches only the top-N follow-ups and warms caches.
+# ------------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_prefetch_warms_caches_for_top_n():
+    manager = FakeManager()
+    prefetcher = FollowUpPrefetcher(top_n=1, max_calls=10, idle_delay=0)
+    prefetcher.schedule(manager, ["first follow-up", "second follow-up"])
+    await prefetcher._task
+    assert "first follow-up" in plan_cache
+    assert "first follow-up a" in search_cache
+    assert "second follow-up" not in plan_cache
+    assert prefetcher.calls_spent == 3
+
+# ------------------------------------------------------------------------------
+# Test: the call budget caps how many agent calls speculative work may spend.
+# ------------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_prefetch_respects_call_budget():
+    manager = FakeManager()
+    prefetcher = FollowUpPrefetcher(top_n=2, max_calls=2, idle_delay=0)
+    prefetcher.schedule(manager, ["q1", "q2"])
+    await prefetcher._task
+    assert len(manager.calls) == 2
+
+# ------------------------------------------------------------------------------
+# Test: starting an interactive run cancels speculative work.
+# ------------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_interactive_run_cancels_prefetch():
+    manager = FakeManager()
+    prefetcher = FollowUpPrefetcher(top_n=2, idle_delay=0.05)
+    prefetcher.schedule(manager, ["q1"])
+    task = prefetcher._task
+    async with prefetcher.interactive():
+        await asyncio.sleep(0)
+        assert task.cancelled() or task.done()
+    assert manager.calls == []
+
+# ------------------------------------------------------------------------------
+# Test: a failing planner ends the prefetch quietly and the failure is logged.
+# ------------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_prefetch_logs_planner_failure(capsys):
+    manager = FakeManager()
+
+    async def failing_plan(query):
+        raise RuntimeError("planner down")
+
+    manager.plan_searches = failing_plan
+    prefetcher = FollowUpPrefetcher(top_n=1, idle_delay=0)
+    prefetcher.schedule(manager, ["q1"])
+    task = prefetcher._task
+    await task
+    assert task.exception() is None
+    assert "Follow-up prefetch failed after 1 calls: planner down" in capsys.readouterr().out
+    assert "q1" not in plan_cache
@@ -0,0 +1,64 @@
+import time
+import pytest
+from types import SimpleNamespace
+from research_archive import ResearchArchive, to_match_expression
+
+# ------------------------------------------------------------------------------
+# Helpers: minimal stand-ins for ReportData and WebSearchPlan.
+# ------------------------------------------------------------------------------
+def make_report(summary, body):
+    return SimpleNamespace(
+        short_summary=summary,
+        markdown_report=body,
+        follow_up_questions=["What next?"],
+    )
+
+def make_plan(*queries):
+    return SimpleNamespace(searches=[
+        SimpleNamespace(model_dump=lambda q=q: {"query": q, "reason": "because"}) for q in queries
+    ])
+
+@pytest.fixture
+def archive(tmp_path):
+    return ResearchArchive(str(tmp_path / "archive.db"))
+
+# ------------------------------------------------------------------------------
+# Test: user input is quoted so it cannot inject FTS5 syntax.
+# ------------------------------------------------------------------------------
+def test_to_match_expression_quotes_words():
+    assert to_match_expression('agentic "AI" OR -x') == '"agentic" OR "ai" OR "or" OR "x"'
+    assert to_match_expression("?!") == ""
+
+# ------------------------------------------------------------------------------
+# Test: a saved report can be found by full-text search and loaded back.
+# ------------------------------------------------------------------------------
+def test_save_search_and_get(archive):
+    report_id = archive.save(
+        "What is agentic AI?",
+        make_report("Agents act autonomously.", "# Agentic AI\nAgents plan and use tools."),
+        make_plan("agentic ai definition"),
+        ["summary one"],
+    )
+    archive.save("Quantum computing", make_report("Qubits.", "# Quantum\nSuperposition."))
+
+    hits = archive.search("agents tools")
+    assert [hit.id for hit in hits] == [report_id]
+
+    archived = archive.get(report_id)
+    assert archived.markdown_report.startswith("# Agentic AI")
+    assert archived.search_plan == [{"query": "agentic ai definition", "reason": "because"}]
+    assert archived.search_results == ["summary one"]
+    assert archive.get(report_id + 100) is None
+
+# ------------------------------------------------------------------------------
+# Test: retention keeps only the newest reports and removes them from the index.
+# ------------------------------------------------------------------------------
+def test_apply_retention_by_count(archive):
+    first = archive.save("old topic", make_report("old", "old body"))
+    time.sleep(0.01)
+    second = archive.save("new topic", make_report("new", "new body"))
+
+    assert archive.apply_retention(max_reports=1) == 1
+    assert archive.get(first) is None
+    assert archive.search("old") == []
+    assert [hit.id for hit in archive.search("new")] == [second]
@@ -0,0 +1,50 @@
+from unittest.mock import patch
+from research_budget import ResearchBudget
+
+# ------------------------------------------------------------------------------
+# Test: the wave cap stops research once max_waves waves are done.
+# ------------------------------------------------------------------------------
+def test_stops_at_max_waves():
+    budget = ResearchBudget(max_waves=2)
+    budget.record_wave()
+    assert budget.allows_gap_analysis(tokens_used=0)
+    budget.record_wave()
+    assert not budget.allows_gap_analysis(tokens_used=0)
+    assert "2 waves" in budget.stop_reason
+
+# ------------------------------------------------------------------------------
+# Test: the token cap stops research before another gap analysis is paid for.
+# ------------------------------------------------------------------------------
+def test_stops_at_token_cap():
+    budget = ResearchBudget(max_tokens=1000)
+    budget.record_wave()
+    assert not budget.allows_gap_analysis(tokens_used=1000)
+
+# ------------------------------------------------------------------------------
+# Test: the wall-time cap stops research.
+# ------------------------------------------------------------------------------
+def test_stops_at_time_cap():
+    with patch("research_budget.time.monotonic", return_value=0.0):
+        budget = ResearchBudget(max_seconds=60)
+    budget.record_wave()
+    with patch("research_budget.time.monotonic", return_value=61.0):
+        assert not budget.allows_gap_analysis(tokens_used=0)
+
+# ------------------------------------------------------------------------------
+# Test: research stops early when the marginal gain drops.
+# ------------------------------------------------------------------------------
+def test_stops_when_marginal_gain_drops():
+    budget = ResearchBudget(max_waves=5, min_gain=0.1)
+    budget.record_wave()
+    assert budget.allows_next_wave(coverage=0.5, expected_gain=0.3)
+    budget.record_wave()
+    assert not budget.allows_next_wave(coverage=0.55, expected_gain=0.3)
+    assert "improved coverage" in budget.stop_reason
+
+# ------------------------------------------------------------------------------
+# Test: a simple, well-covered question never pays for a second wave.
+# ------------------------------------------------------------------------------
+def test_skips_second_wave_when_expected_gain_is_low():
+    budget = ResearchBudget()
+    budget.record_wave()
+    assert not budget.allows_next_wave(coverage=0.95, expected_gain=0.02)
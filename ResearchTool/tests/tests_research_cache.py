@@ -0,0 +1,46 @@
+from unittest.mock import patch
+from research_cache import TTLCache, normalize_query, query_similarity, is_similar_query
+
+# ------------------------------------------------------------------------------
+# Test: normalize_query ignores case, punctuation and extra whitespace.
+# ------------------------------------------------------------------------------
+def test_normalize_query():
+    assert normalize_query("  What is   Agentic AI? ") == "what is agentic ai"
+
+# ------------------------------------------------------------------------------
+# Test: cache keys are normalized, so equivalent queries hit the same entry.
+# ------------------------------------------------------------------------------
+def test_cache_hits_on_normalized_key():
+    cache = TTLCache(ttl_seconds=60)
+    cache.set("Agentic AI market", "summary")
+    assert cache.get("agentic ai market!") == "summary"
+
+# ------------------------------------------------------------------------------
+# Test: entries expire after their time-to-live.
+# ------------------------------------------------------------------------------
+def test_cache_entries_expire():
+    cache = TTLCache(ttl_seconds=10)
+    with patch("research_cache.time.monotonic", return_value=100.0):
+        cache.set("query", "summary")
+    with patch("research_cache.time.monotonic", return_value=111.0):
+        assert cache.get("query") is None
+
+# ------------------------------------------------------------------------------
+# Test: the least recently used entry is evicted when the cache is full.
+# ------------------------------------------------------------------------------
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+
+# ------------------------------------------------------------------------------
+# Test: similarity ignores filler words and detects near-duplicate searches.
+# ------------------------------------------------------------------------------
+def test_query_similarity():
+    assert query_similarity("the agentic AI market", "Agentic AI market") == 1.0
+    assert is_similar_query("agentic AI market size 2025", "agentic AI market size")
+    assert not is_similar_query("agentic AI market size", "quantum computing hardware")
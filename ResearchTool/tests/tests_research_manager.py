@@ -0,0 +1,151 @@
+import asyncio
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from agents import Usage, set_tracing_disabled
+
+# The agent modules build their model clients at import time
+with patch.dict(os.environ, {"OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "test-key")}):
+    import research_manager
+    from research_manager import ResearchManager
+    from planner_agent import planner_agent, WebSearchItem, WebSearchPlan
+    from gap_agent import gap_agent, GapAnalysis
+    from writer_agent import writer_agent, ReportData
+    from research_archive import ResearchArchive
+    from research_budget import ResearchBudget
+    from research_cache import plan_cache, search_cache
+
+set_tracing_disabled(True)
+
+# ------------------------------------------------------------------------------
+# Helpers: canned agent outputs, so a whole run works without any model.
+# ------------------------------------------------------------------------------
+SEARCH_AGENT = SimpleNamespace(model="fake-search-model")
+
+def make_run_agent(calls):
+    async def run_agent(agent, input):
+        calls.append(agent)
+        if agent is planner_agent:
+            output = WebSearchPlan(searches=[WebSearchItem(query="first wave", reason="plan")])
+        elif agent is gap_agent:
+            output = GapAnalysis(
+                coverage=0.5, expected_gain=0.4,
+                searches=[WebSearchItem(query="gap wave", reason="gap")],
+            )
+        elif agent is writer_agent:
+            output = ReportData(short_summary="Summary.", markdown_report="# Report", follow_up_questions=[])
+        elif agent is SEARCH_AGENT:
+            output = f"summary of {input.splitlines()[0]}"
+        else:
+            output = "sent"
+        return SimpleNamespace(final_output=output, final_output_as=lambda _type: output)
+    return run_agent
+
+@pytest.fixture(autouse=True)
+def fake_agents():
+    plan_cache.clear()
+    search_cache.clear()
+    with patch.object(research_manager, "get_search_agent", return_value=SEARCH_AGENT):
+        yield
+    plan_cache.clear()
+    search_cache.clear()
+
+# ------------------------------------------------------------------------------
+# Test: the archive stores the searches of every wave, not only the first plan.
+# ------------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_archive_holds_searches_of_all_waves(tmp_path):
+    archive = ResearchArchive(str(tmp_path / "archive.db"))
+    manager = ResearchManager(archive=archive, budget=ResearchBudget(max_waves=2))
+    manager.run_agent = make_run_agent([])
+    async for _ in manager.run("batteries"):
+        pass
+
+    archived = archive.get(archive.search("batteries")[0].id)
+    assert [item["query"] for item in archived.search_plan] == ["first wave", "gap wave"]
+    assert len(archived.search_results) == 2
+
+# ------------------------------------------------------------------------------
+# Fake Runner: the planner answers at once, every search agent finishes one
+# model turn and then hangs in its second request until it is cancelled.
+# ------------------------------------------------------------------------------
+class HangingRunner:
+    def __init__(self):
+        self.hanging = 0
+        self.cancelled = 0
+
+    async def run(self, agent, input, hooks):
+        await hooks.on_llm_start(None, agent, "system prompt", [input])
+        await hooks.on_llm_end(None, agent, SimpleNamespace(
+            usage=Usage(requests=1, input_tokens=10, output_tokens=5, total_tokens=15)
+        ))
+        if agent is planner_agent:
+            output = WebSearchPlan(searches=[
+                WebSearchItem(query="search a", reason="plan"),
+                WebSearchItem(query="search b", reason="plan"),
+            ])
+            return SimpleNamespace(final_output=output, final_output_as=lambda _type: output)
+        await hooks.on_llm_start(None, agent, "system prompt", [input, "tool output"])
+        self.hanging += 1
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+# ------------------------------------------------------------------------------
+# Test: cancelling mid-run stops the pending searches and keeps their partial usage.
+# ------------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_cancel_stops_pending_searches_and_records_partial_usage():
+    runner = HangingRunner()
+    manager = ResearchManager()
+
+    async def consume():
+        async for _ in manager.run("batteries"):
+            pass
+
+    with patch.object(research_manager, "Runner", runner):
+        task = asyncio.create_task(consume())
+        while runner.hanging < 2:
+            await asyncio.sleep(0.01)
+        searches = list(manager._pending_tasks)
+        manager.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert len(searches) == 2 and all(search.cancelled() for search in searches)
+    assert runner.cancelled == 2
+    # Planner and two first search turns completed, two second turns were aborted
+    assert manager.usage.requests == 5
+    assert manager.usage.total_tokens > 3 * 15
+
+# ------------------------------------------------------------------------------
+# Test: gap searches beyond MAX_GAP_SEARCHES or the remaining token budget are dropped.
+# ------------------------------------------------------------------------------
+TOPICS = ["solid state cells", "lithium prices", "recycling plants", "grid storage", "sodium chemistry"]
+
+@pytest.mark.asyncio
+async def test_gap_searches_are_capped_in_code():
+    async def run_agent(agent, input):
+        output = GapAnalysis(
+            coverage=0.5, expected_gain=0.4,
+            searches=[WebSearchItem(query=topic, reason="gap") for topic in TOPICS],
+        )
+        return SimpleNamespace(final_output=output, final_output_as=lambda _type: output)
+
+    manager = ResearchManager(budget=ResearchBudget(max_tokens=10_000, max_waves=3))
+    manager.run_agent = run_agent
+    searched = [WebSearchItem(query="first wave", reason="plan")]
+    next_plan = await manager.plan_next_wave("batteries", ["summary"], searched)
+    assert [item.query for item in next_plan.searches] == TOPICS[:3]
+
+    # Two searches cost 8000 tokens, so the 2000 left pay for half a search at most
+    manager.budget.start()
+    manager.usage = Usage(total_tokens=4_000)
+    assert await manager.plan_next_wave("batteries", ["summary"], searched) is not None
+    manager.budget.start()
+    manager.usage = Usage(total_tokens=8_000)
+    assert await manager.plan_next_wave("batteries", ["summary"], searched * 2) is None
+    assert manager.budget.stop_reason == "no tokens left for further searches"
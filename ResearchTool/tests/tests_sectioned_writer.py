@@ -0,0 +1,70 @@
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# The agent modules build their model clients at import time
+with patch.dict(os.environ, {"OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "test-key")}):
+    from research_manager import ResearchManager
+    from writer_agent import (
+        outline_agent, section_writer_agent, editor_agent,
+        ReportOutline, ReportSection, ReportFraming, SectionEdit,
+    )
+
+# ------------------------------------------------------------------------------
+# Helpers: a manager whose agent calls return canned outputs.
+# ------------------------------------------------------------------------------
+OUTLINE = ReportOutline(title="Batteries", sections=[
+    ReportSection(title="Chemistry", brief="cell chemistry", search_result_ids=[0]),
+    ReportSection(title="Market", brief="market size", search_result_ids=[1]),
+])
+
+def make_manager(framing, failing_sections=()):
+    manager = ResearchManager(sectioned_writer=True)
+
+    async def run_agent(agent, input):
+        if agent is outline_agent:
+            output = OUTLINE
+        elif agent is section_writer_agent:
+            title = input.split("Your section: ")[1].split("\n")[0]
+            if title in failing_sections:
+                raise RuntimeError("model timeout")
+            output = f"## {title}\n\nThe market grew 10% in 2024." if title == "Market" else f"## {title}\n\nLithium cells."
+        elif agent is editor_agent:
+            output = framing
+        return SimpleNamespace(final_output=output, final_output_as=lambda _type: output)
+
+    manager.run_agent = run_agent
+    return manager
+
+def make_framing(edits=()):
+    return ReportFraming(
+        introduction="Intro.", conclusion="Done.", short_summary="Summary.",
+        follow_up_questions=["Next?"], edits=list(edits),
+    )
+
+# ------------------------------------------------------------------------------
+# Test: a failed section falls back to its search results instead of failing the report.
+# ------------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_failed_section_uses_fallback():
+    manager = make_manager(make_framing(), failing_sections={"Chemistry"})
+    report = await manager.write_report("batteries", ["result about cells", "result about market"])
+    assert "## Chemistry\n\nresult about cells" in report.markdown_report
+    assert "The market grew 10% in 2024." in report.markdown_report
+
+# ------------------------------------------------------------------------------
+# Test: the editor's edits are applied to the stitched sections.
+# ------------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_editor_edits_are_applied():
+    edits = [
+        SectionEdit(original="grew 10% in 2024", replacement="grew 12% in 2024"),
+        SectionEdit(original="not in the draft", replacement="ignored"),
+    ]
+    manager = make_manager(make_framing(edits))
+    report = await manager.write_report("batteries", ["a", "b"])
+    assert "grew 12% in 2024" in report.markdown_report
+    assert "grew 10%" not in report.markdown_report
+    assert "ignored" not in report.markdown_report
+    assert report.markdown_report.startswith("# Batteries\n\nIntro.")
@@ -12,6 +12,12 @@ The agent's output includes:
 - A short summary of findings
 - A detailed markdown report (5-10 pages)
 - Suggested follow-up research topics
+
+For long reports a sectioned mode is also available:
+1. outline_agent        → a fast outline with search results assigned to each section
+2. section_writer_agent → writes one section; sections are written concurrently
+3. editor_agent         → consistency pass producing the framing of the stitched report
+                           and edits that reconcile the sections
 """
 
 # ---------------------------------------------------------------------------
@@ -42,6 +48,34 @@ INSTRUCTIONS = (
     "for 5-10 pages of content, at least 1000 words."
 )
 
+OUTLINE_INSTRUCTIONS = (
+    "You are a senior researcher planning a cohesive report for a research query. "
+    "You will be provided with the original query and a numbered list of search result summaries.\n"
+    "Produce an outline of 4-8 sections that describes the structure and flow of the report. "
+    "For each section give a title, a short brief of what it must cover, and the numbers of the "
+    "search results that are relevant to it. Every search result should be used at least once. "
+    "Do not write the report itself."
+)
+
+SECTION_INSTRUCTIONS = (
+    "You are a senior researcher writing one section of a larger report. "
+    "You will be provided with the original query, the full outline of the report, the section "
+    "you are responsible for and the search results assigned to it.\n"
+    "Write only your section in markdown, starting with a level-2 heading of the section title. "
+    "Stay within the brief, do not repeat material that belongs to other sections, and be "
+    "detailed: aim for 300-600 words."
+)
+
+EDITOR_INSTRUCTIONS = (
+    "You are the editor of a research report whose sections were written independently. "
+    "You will be provided with the original query and the stitched draft.\n"
+    "Write a short introduction that ties the sections together, a conclusion that synthesizes "
+    "them, a 2-3 sentence summary of the findings and suggested follow-up topics.\n"
+    "Where sections contradict or repeat each other, return edits that reconcile them: for each "
+    "edit quote the exact passage from the draft and give its replacement. Keep edits minimal and "
+    "do not return whole sections."
+)
+
 
 # ---------------------------------------------------------------------------
 # Data Models
@@ -70,6 +104,91 @@ class ReportData(BaseModel):
     )
 
 
+class ReportSection(BaseModel):
+    """A single section of a report outline.
+
+    Attributes:
+        title (str): The section heading
+        brief (str): What the section has to cover
+        search_result_ids (list[int]): Numbers of the search results assigned to the section
+    """
+    title: str = Field(
+        description="The heading of the section."
+    )
+
+    brief: str = Field(
+        description="A short description of what this section must cover."
+    )
+
+    search_result_ids: list[int] = Field(
+        description="The numbers of the search results relevant to this section."
+    )
+
+
+class ReportOutline(BaseModel):
+    """Outline of a report, used to write its sections concurrently.
+
+    Attributes:
+        title (str): The title of the report
+        sections (list[ReportSection]): The ordered sections of the report
+    """
+    title: str = Field(
+        description="The title of the report."
+    )
+
+    sections: list[ReportSection] = Field(
+        description="The ordered sections of the report."
+    )
+
+
+class SectionEdit(BaseModel):
+    """A targeted correction of the stitched draft proposed by the editor.
+
+    Attributes:
+        original (str): An exact passage of the draft
+        replacement (str): The text that replaces the passage
+    """
+    original: str = Field(
+        description="An exact passage copied from the draft."
+    )
+
+    replacement: str = Field(
+        description="The corrected text for the passage."
+    )
+
+
+class ReportFraming(BaseModel):
+    """Output of the consistency pass over a stitched, sectioned report.
+
+    Attributes:
+        introduction (str): Opening paragraphs tying the sections together
+        conclusion (str): Closing synthesis of all sections
+        short_summary (str): A brief 2-3 sentence summary of the findings
+        follow_up_questions (list[str]): List of suggested topics for further research
+        edits (list[SectionEdit]): Corrections that reconcile contradictions between sections
+    """
+    introduction: str = Field(
+        description="An introduction that ties the sections together."
+    )
+
+    conclusion: str = Field(
+        description="A conclusion that synthesizes the sections."
+    )
+
+    short_summary: str = Field(
+        description="A short 2-3 sentence summary of the findings."
+    )
+
+    follow_up_questions: list[str] = Field(
+        description="Suggested topics to research further"
+    )
+
+    edits: list[SectionEdit] = Field(
+        default_factory=list,
+        description="Edits that reconcile contradictions or repetitions between sections."
+    )
+
+
 # ---------------------------------------------------------------------------
 # Agent Configuration
 # ---------------------------------------------------------------------------
@@ -78,4 +197,24 @@ writer_agent = Agent(
     instructions=INSTRUCTIONS,      # System prompt for the language model
     model=llm_model_to_use,         # Language model to use
     output_type=ReportData,         # Output parsed into this type via JSON schema
-)
\ No newline at end of file
+)
+
+outline_agent = Agent(
+    name="OutlineAgent",            # Name used for logging/tracing
+    instructions=OUTLINE_INSTRUCTIONS,
+    model=llm_model_to_use,
+    output_type=ReportOutline,      # Sections with their assigned search results
+)
+
+section_writer_agent = Agent(
+    name="SectionWriterAgent",      # One instance call per section, run concurrently
+    instructions=SECTION_INSTRUCTIONS,
+    model=llm_model_to_use,
+)
+
+editor_agent = Agent(
+    name="EditorAgent",             # Consistency pass over the stitched sections
+    instructions=EDITOR_INSTRUCTIONS,
+    model=llm_model_to_use,
+    output_type=ReportFraming,
+)